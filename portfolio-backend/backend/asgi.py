@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Read by settings, e.g. to turn off persistent database connections
+os.environ['PORTFOLIO_ASGI'] = '1'
+# Serve the read endpoints with the async views (set to 0 to keep the sync ones)
+os.environ.setdefault('PORTFOLIO_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
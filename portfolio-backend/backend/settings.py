@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Inert unless PORTFOLIO_PROFILING is on
+    'portfoliobuilder.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -80,12 +85,70 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# PORTFOLIO_DB_PROFILE picks the database: 'sqlite' (default) or 'postgres'.
+
+DB_PROFILE = os.environ.get('PORTFOLIO_DB_PROFILE', 'sqlite')
+
+# Set by backend/asgi.py. Persistent connections are per thread, and async views
+# run their ORM calls on short-lived threads whose connections would never be
+# reused or closed, so ASGI deployments close them after each request.
+ASGI = os.environ.get('PORTFOLIO_ASGI') == '1'
+
+if DB_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('PORTFOLIO_DB_NAME', 'portfolio'),
+            'USER': os.environ.get('PORTFOLIO_DB_USER', 'portfolio'),
+            'PASSWORD': os.environ.get('PORTFOLIO_DB_PASSWORD', ''),
+            'HOST': os.environ.get('PORTFOLIO_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('PORTFOLIO_DB_PORT', '5432'),
+            # Keep connections open between requests (WSGI only, see ASGI above);
+            # health checks drop ones the server closed instead of failing the
+            # next request with them
+            'CONN_MAX_AGE': 0 if ASGI else int(os.environ.get('PORTFOLIO_DB_CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('PORTFOLIO_DB_CONNECT_TIMEOUT', '5')),
+            },
+        }
     }
-}
+    # Optional streaming replica for the read-only views (see portfoliobuilder.db_router)
+    if os.environ.get('PORTFOLIO_DB_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': os.environ['PORTFOLIO_DB_REPLICA_HOST'],
+            'PORT': os.environ.get('PORTFOLIO_DB_REPLICA_PORT', DATABASES['default']['PORT']),
+            # Tests run against default only; the replica alias reads the same test database
+            'TEST': {'MIRROR': 'default'},
+        }
+        DATABASE_ROUTERS = ['portfoliobuilder.db_router.ReplicaRouter']
+elif DB_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('PORTFOLIO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # WAL lets readers run alongside the writer; NORMAL sync is safe
+                # with WAL and skips an fsync per commit; mmap and an in-memory
+                # temp store cut syscalls on reads and sorts
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    f"PRAGMA mmap_size={int(os.environ.get('PORTFOLIO_SQLITE_MMAP_SIZE', 128 * 1024 * 1024))};"
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA cache_size=-20000;'
+                ),
+                # Seconds a connection waits on a locked database (busy_timeout)
+                'timeout': int(os.environ.get('PORTFOLIO_SQLITE_BUSY_TIMEOUT', '20')),
+                # Take the write lock when a transaction starts, so concurrent
+                # writers queue on busy_timeout instead of failing to upgrade
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown PORTFOLIO_DB_PROFILE {DB_PROFILE!r}; expected 'sqlite' or 'postgres'")
 
 
 # Password validation
@@ -155,12 +218,67 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
+    # Header-based auth first: API clients send tokens, so most requests stop
+    # at the first class instead of loading an empty session
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'portfoliobuilder.authentication.SignedTokenAuthentication',
+        'portfoliobuilder.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
     ],
 }
 
+# Rendered portfolio HTML cache used by exports. Swap the backend for
+# FileSystemRenderCache (OPTIONS: LOCATION) or DjangoRenderCache (OPTIONS: ALIAS)
+# to share renders between worker processes.
+PORTFOLIO_RENDER_CACHE = {
+    'BACKEND': 'portfoliobuilder.render_cache.LocMemRenderCache',
+    'OPTIONS': {
+        'MAX_ENTRIES': 512,
+    },
+}
+
+# Directory that published portfolios are written to as static files on save
+# (see the publish_static command). None disables static publishing.
+PORTFOLIO_STATIC_ROOT = None
+
+# Seconds a pre-rendered public page is kept. Pages are checked against the
+# portfolio's version (re-read at most once a minute) on every request, so this
+# only bounds memory. Point PORTFOLIO_PAGE_CACHE_ALIAS at a shared cache to
+# render each page once for all workers.
+PORTFOLIO_PAGE_TIMEOUT = 24 * 60 * 60
+
+# Minify the HTML/CSS of published pages and static sites
+PORTFOLIO_MINIFY_PUBLISHED = True
+
+# Where run_render_worker writes finished export files
+PORTFOLIO_JOB_RESULT_ROOT = BASE_DIR / 'job_results'
+
+# Template edits re-render affected published portfolios right after commit up
+# to this many; larger fan-outs are queued as a background rerender job.
+PORTFOLIO_SYNC_RERENDER_LIMIT = 20
+
+# Bulk exports of more portfolios than this are queued as a background job
+# (answered with 202) instead of being streamed in the request
+PORTFOLIO_SYNC_ARCHIVE_LIMIT = 100
+
+# Mount the async (ASGI-native) read views; backend/asgi.py turns this on
+PORTFOLIO_ASYNC_VIEWS = os.environ.get('PORTFOLIO_ASYNC_VIEWS') == '1'
+
+# Seconds a token -> user lookup is cached per process, and how many are kept
+PORTFOLIO_TOKEN_CACHE_TTL = 60
+PORTFOLIO_TOKEN_CACHE_SIZE = 10000
+
+# Lifetime in seconds of the database-free "Signed" tokens returned at login
+PORTFOLIO_SIGNED_TOKEN_MAX_AGE = 300
+# Cache recording logouts that revoke signed tokens; only a shared backend
+# revokes them in every worker process
+PORTFOLIO_TOKEN_REVOCATION_CACHE_ALIAS = 'default'
+
+# Time requests per view (Server-Timing headers and the /metrics endpoint).
+# /metrics answers staff users and INTERNAL_IPS only.
+PORTFOLIO_PROFILING = os.environ.get('PORTFOLIO_PROFILING') == '1'
+INTERNAL_IPS = ['127.0.0.1']
+
 # Custom User Model
 AUTH_USER_MODEL = 'portfoliobuilder.User'
 
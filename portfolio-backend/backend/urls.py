@@ -14,10 +14,19 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from portfoliobuilder import async_views, views as portfolio_views
+
+public_views = async_views if getattr(settings, 'PORTFOLIO_ASYNC_VIEWS', False) else portfolio_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('portfoliobuilder.urls')),
+    # Published portfolios
+    path('p/<slug:slug>/', public_views.public_portfolio, name='public_portfolio'),
+    # Prometheus scrape target (PORTFOLIO_PROFILING)
+    path('metrics', portfolio_views.metrics, name='metrics'),
 ]
@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
-from .models import User, Template, Portfolio, Project, Skill, Experience
+from .models import User, Template, Portfolio, Project, Skill, Experience, RenderJob, Technology
+from .technologies import normalize_technology
 
 
 @admin.register(User)
@@ -76,9 +77,23 @@ class PortfolioAdmin(admin.ModelAdmin):
 class ProjectAdmin(admin.ModelAdmin):
 	list_display = ("title", "portfolio", "is_featured", "order", "created_at")
 	list_filter = ("is_featured",)
-	search_fields = ("title", "technology_stack", "portfolio__title")
+	search_fields = ("title", "portfolio__title")
 	autocomplete_fields = ("portfolio",)
 
+	def get_search_results(self, request, queryset, search_term):
+		"""Also match projects using a technology, via the indexed technology table"""
+		results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+		if search_term:
+			results |= queryset.filter(technologies__normalized_name=normalize_technology(search_term))
+			may_have_duplicates = True
+		return results, may_have_duplicates
+
+
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+	list_display = ("name", "normalized_name")
+	search_fields = ("^normalized_name",)
+
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
@@ -96,6 +111,14 @@ class ExperienceAdmin(admin.ModelAdmin):
 	autocomplete_fields = ("portfolio",)
 
 
+@admin.register(RenderJob)
+class RenderJobAdmin(admin.ModelAdmin):
+	list_display = ("id", "kind", "status", "user", "attempts", "created_at", "finished_at")
+	list_filter = ("kind", "status")
+	search_fields = ("id", "user__email")
+	readonly_fields = ("created_at", "started_at", "finished_at")
+
+
 # Optional: tweak the admin site titles
 admin.site.site_header = "Portfolio Builder Admin"
 admin.site.site_title = "Portfolio Builder Admin"
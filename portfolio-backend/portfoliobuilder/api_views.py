@@ -1,22 +1,55 @@
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.response import Response
 from rest_framework import status, generics, permissions
 from rest_framework.authtoken.models import Token
+from django.conf import settings
 from django.contrib.auth import login, logout
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse
+from django.urls import reverse
 from django.template.loader import render_to_string
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 import json
 
-from .models import User, Portfolio, Project, Skill, Experience, Template
+from .models import User, Portfolio, Project, Skill, Experience, Template, RenderJob
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserSerializer,
-    PortfolioSerializer, PortfolioCreateSerializer, ProjectSerializer,
-    SkillSerializer, ExperienceSerializer, TemplateSerializer,
-    PortfolioExportSerializer
+    PortfolioSerializer, PortfolioSummarySerializer, PortfolioCreateSerializer, ProjectSerializer,
+    SkillSerializer, ExperienceSerializer, TemplateSerializer, TemplateCatalogSerializer,
+    PortfolioExportSerializer, PortfolioPreviewSerializer, RenderJobSerializer, ReorderSerializer,
+    ResumeImportSerializer
 )
+from .rendering import render_portfolio
+from .render_cache import render_portfolio_cached
+from .preview import apply_patch, preview_document, preview_sections
+from .bulk import BULK_SECTIONS, BulkError, bulk_create_items, bulk_update_items, reorder_items
+from .resume_import import ImportFormatError, guess_format, import_resume
+from .technologies import portfolios_using, technology_facets
+from .search import search_portfolios
+from .postprocess import choose_encoding
+from .archive import portfolio_archive_response
+from .jobs import enqueue, result_file_path, wait_for_job
+from .authentication import issue_signed_token, signed_token_max_age
+from .db_router import use_replica
+from .catalog import catalog_etag, catalog_last_modified
+from .pagination import list_response, PORTFOLIO_ORDERING, PROJECT_ORDERING, TEMPLATE_ORDERING
+
+# Seconds browsers may reuse template catalog responses before revalidating
+CATALOG_MAX_AGE = 60
+# Seconds clients are asked to wait before polling an unfinished job again
+JOB_POLL_INTERVAL = 1
+# Longest ?wait= a job status request may hold its worker thread for
+MAX_JOB_WAIT = 10
+# Largest ?limit= accepted by the technology facet endpoint
+MAX_FACETS = 200
+# Search results per page (default and ?page_size= cap)
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
 
 @api_view(['GET'])
 def api_health_check(request):
@@ -56,10 +89,21 @@ def login_view(request):
         return Response({
             'user': UserSerializer(user).data,
             'token': token.key,
+            'signed_token': issue_signed_token(user),
+            'signed_token_max_age': signed_token_max_age(),
             'message': 'Login successful'
         })
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def signed_token(request):
+    """Issue a fresh short-lived signed token for the current user"""
+    return Response({
+        'signed_token': issue_signed_token(request.user),
+        'signed_token_max_age': signed_token_max_age(),
+    })
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def logout_view(request):
@@ -78,21 +122,29 @@ def user_profile(request):
     return Response(UserSerializer(request.user).data)
 
 # Template Views
+@use_replica
+@condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
+@cache_control(public=True, max_age=CATALOG_MAX_AGE)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def templates_list(request):
-    """Get all available templates"""
-    templates = Template.objects.all()
-    serializer = TemplateSerializer(templates, many=True)
-    return Response(serializer.data)
+    """Get the template catalog (without HTML/CSS/JS bodies unless expanded)"""
+    context = {'request': request}
+    templates = TemplateCatalogSerializer.setup_eager_loading(
+        Template.objects.all(), TemplateCatalogSerializer.requested_fields(context)
+    )
+    return list_response(request, templates, TemplateCatalogSerializer, TEMPLATE_ORDERING, context)
 
+@use_replica
+@condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
+@cache_control(public=True, max_age=CATALOG_MAX_AGE)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def template_detail(request, template_id):
     """Get specific template details"""
     try:
         template = Template.objects.get(id=template_id)
-        serializer = TemplateSerializer(template)
+        serializer = TemplateSerializer(template, context={'request': request})
         return Response(serializer.data)
     except Template.DoesNotExist:
         return Response({'error': 'Template not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -103,9 +155,12 @@ def template_detail(request, template_id):
 def portfolios_list(request):
     """Get user's portfolios or create new one"""
     if request.method == 'GET':
-        portfolios = Portfolio.objects.filter(user=request.user)
-        serializer = PortfolioSerializer(portfolios, many=True)
-        return Response(serializer.data)
+        context = {'request': request}
+        portfolios = PortfolioSummarySerializer.setup_eager_loading(
+            Portfolio.objects.filter(user=request.user),
+            PortfolioSummarySerializer.requested_fields(context)
+        )
+        return list_response(request, portfolios, PortfolioSummarySerializer, PORTFOLIO_ORDERING, context)
     
     elif request.method == 'POST':
         serializer = PortfolioCreateSerializer(data=request.data)
@@ -118,17 +173,23 @@ def portfolios_list(request):
 @permission_classes([permissions.IsAuthenticated])
 def portfolio_detail(request, portfolio_id):
     """Get, update, or delete specific portfolio"""
+    context = {'request': request}
+    portfolios = Portfolio.objects.all()
+    if request.method in ('GET', 'PUT'):
+        portfolios = PortfolioSerializer.setup_eager_loading(
+            portfolios, PortfolioSerializer.requested_fields(context)
+        )
     try:
-        portfolio = Portfolio.objects.get(id=portfolio_id, user=request.user)
+        portfolio = portfolios.get(id=portfolio_id, user=request.user)
     except Portfolio.DoesNotExist:
         return Response({'error': 'Portfolio not found'}, status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = PortfolioSerializer(portfolio)
+        serializer = PortfolioSerializer(portfolio, context=context)
         return Response(serializer.data)
     
     elif request.method == 'PUT':
-        serializer = PortfolioSerializer(portfolio, data=request.data, partial=True)
+        serializer = PortfolioSerializer(portfolio, data=request.data, partial=True, context=context)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -138,6 +199,61 @@ def portfolio_detail(request, portfolio_id):
         portfolio.delete()
         return Response({'message': 'Portfolio deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
 
+# Technology Views
+@use_replica
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def technologies_list(request):
+    """Technologies used by published portfolios with portfolio counts; ?q= filters by prefix"""
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 50)), MAX_FACETS))
+    except ValueError:
+        limit = 50
+    facets = technology_facets(prefix=request.query_params.get('q'), limit=limit)
+    return Response([
+        {'name': facet['technology__name'], 'portfolio_count': facet['portfolio_count']}
+        for facet in facets
+    ])
+
+@use_replica
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def technology_portfolios(request, name):
+    """Published portfolios with at least one project using a technology"""
+    context = {'request': request}
+    portfolios = PortfolioSummarySerializer.setup_eager_loading(
+        portfolios_using(name, Portfolio.objects.filter(is_published=True)),
+        PortfolioSummarySerializer.requested_fields(context)
+    )
+    return list_response(request, portfolios, PortfolioSummarySerializer, PORTFOLIO_ORDERING, context)
+
+# Search Views
+@use_replica
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def search(request):
+    """Full-text search over published portfolios, best matches first; ?q=, ?page=, ?page_size="""
+    try:
+        page = max(1, int(request.query_params.get('page', 1)))
+        page_size = max(1, min(int(request.query_params.get('page_size', SEARCH_PAGE_SIZE)), MAX_SEARCH_PAGE_SIZE))
+    except ValueError:
+        return Response({'error': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # One extra row tells whether another page exists without counting every match
+    matches = search_portfolios(request.query_params.get('q', ''), page_size + 1, (page - 1) * page_size)
+    ranks = dict(matches[:page_size])
+    portfolios = Portfolio.objects.filter(id__in=ranks, is_published=True).select_related('template')
+    data = PortfolioSummarySerializer(
+        sorted(portfolios, key=lambda portfolio: -ranks[portfolio.id]), many=True, context={'request': request}
+    ).data
+    for row in data:
+        row['rank'] = ranks[row['id']]
+
+    next_url = None
+    if len(matches) > page_size:
+        next_url = replace_query_param(request.build_absolute_uri(), 'page', page + 1)
+    return Response({'next': next_url, 'results': data})
+
 # Project Views
 @api_view(['GET', 'POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -150,8 +266,7 @@ def portfolio_projects(request, portfolio_id):
     
     if request.method == 'GET':
         projects = Project.objects.filter(portfolio=portfolio)
-        serializer = ProjectSerializer(projects, many=True)
-        return Response(serializer.data)
+        return list_response(request, projects, ProjectSerializer, PROJECT_ORDERING)
     
     elif request.method == 'POST':
         serializer = ProjectSerializer(data=request.data)
@@ -160,21 +275,125 @@ def portfolio_projects(request, portfolio_id):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+# Bulk Section Views
+@api_view(['POST', 'PATCH'])
+@permission_classes([permissions.IsAuthenticated])
+def section_items_bulk(request, portfolio_id, section):
+    """Create (POST) or update (PATCH) a list of projects, skills or experiences in one transaction"""
+    try:
+        portfolio = Portfolio.objects.get(id=portfolio_id, user=request.user)
+    except Portfolio.DoesNotExist:
+        return Response({'error': 'Portfolio not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        if request.method == 'POST':
+            items = bulk_create_items(portfolio, section, request.data)
+            response_status = status.HTTP_201_CREATED
+        else:
+            items = bulk_update_items(portfolio, section, request.data)
+            response_status = status.HTTP_200_OK
+    except BulkError as e:
+        return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
+    _, serializer_class = BULK_SECTIONS[section]
+    return Response(serializer_class(items, many=True).data, status=response_status)
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def section_items_reorder(request, portfolio_id, section):
+    """Set the order of a section's items; unlisted items keep their relative order after the listed ones.
+
+    Answers with the resulting display order (see bulk.reorder_items for the limits on skills and experiences).
+    """
+    try:
+        portfolio = Portfolio.objects.get(id=portfolio_id, user=request.user)
+    except Portfolio.DoesNotExist:
+        return Response({'error': 'Portfolio not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    serializer = ReorderSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        ids = reorder_items(portfolio, section, serializer.validated_data['ids'])
+    except BulkError as e:
+        return Response(e.errors, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'ids': ids})
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def portfolio_import(request, portfolio_id):
+    """Import projects, skills and experiences from an uploaded resume (JSON Resume, LinkedIn CSV or JSON lines)"""
+    try:
+        portfolio = Portfolio.objects.get(id=portfolio_id, user=request.user)
+    except Portfolio.DoesNotExist:
+        return Response({'error': 'Portfolio not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    serializer = ResumeImportSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    upload = serializer.validated_data['file']
+    file_format = serializer.validated_data.get('format') or guess_format(upload.name)
+    try:
+        report = import_resume(portfolio, upload, file_format)
+    except ImportFormatError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report.as_dict())
+
+# Live Preview View
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def portfolio_preview(request, portfolio_id):
+    """Render the sections changed by unsaved edits; known section hashes are skipped.
+
+    With ``document`` the full document is returned too, but only when a section changed.
+    """
+    serializer = PortfolioPreviewSerializer(data=request.data, partial=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        portfolio = Portfolio.objects.select_related('template').get(id=portfolio_id, user=request.user)
+    except Portfolio.DoesNotExist:
+        return Response({'error': 'Portfolio not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    options = serializer.validated_data
+    apply_patch(portfolio, options.get('patch', {}))
+    data = {'sections': preview_sections(portfolio, options.get('sections'))}
+    if options.get('document') and data['sections']:
+        data['document'] = preview_document(portfolio)
+    return Response(data)
+
 # HTML Export View
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def export_portfolio(request):
     """Export portfolio as HTML file"""
+    serializer = PortfolioExportSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    options = serializer.validated_data
+    if options['background']:
+        return queue_export_job(request, options, serializer.is_bulk)
+    if serializer.is_bulk:
+        return export_portfolio_archive(request, options)
+
     try:
-        portfolio_id = request.data.get('portfolio_id')
-        portfolio = Portfolio.objects.get(id=portfolio_id, user=request.user)
+        portfolio = Portfolio.objects.select_related('template').get(id=options['portfolio_id'], user=request.user)
         
-        # Generate HTML content
-        html_content = generate_portfolio_html(portfolio)
+        # Generate HTML content, reusing the last render when nothing changed
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        html_content = render_portfolio_cached(
+            portfolio,
+            include_css=options['include_css'],
+            include_js=options['include_js'],
+            minify=options['minify'],
+            encoding=encoding,
+        )
         
         # Create HTTP response with HTML file
-        response = HttpResponse(html_content, content_type='text/html')
+        response = HttpResponse(html_content, content_type='text/html; charset=utf-8')
         response['Content-Disposition'] = f'attachment; filename="{portfolio.slug}.html"'
+        if encoding:
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ['Accept-Encoding'])
         return response
         
     except Portfolio.DoesNotExist:
@@ -182,96 +401,114 @@ def export_portfolio(request):
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def missing_portfolios_response(request, portfolio_ids):
+    """404 response naming the ids that do not belong to the user, or None if all do"""
+    requested = set(portfolio_ids)
+    found = Portfolio.objects.filter(user=request.user, id__in=requested).values_list('id', flat=True)
+    missing = requested - set(found)
+    if missing:
+        return Response(
+            {'error': 'Portfolio not found', 'portfolio_ids': sorted(missing)},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return None
+
+def export_portfolio_archive(request, options):
+    """Stream several of the user's portfolios as one ZIP archive.
+
+    Archives of more than PORTFOLIO_SYNC_ARCHIVE_LIMIT portfolios are queued as a background job instead.
+    """
+    portfolios = Portfolio.objects.filter(user=request.user)
+    if not options['all']:
+        error_response = missing_portfolios_response(request, options['portfolio_ids'])
+        if error_response is not None:
+            return error_response
+        portfolios = portfolios.filter(id__in=options['portfolio_ids'])
+    if portfolios.count() > getattr(settings, 'PORTFOLIO_SYNC_ARCHIVE_LIMIT', 100):
+        return queue_export_job(request, options, is_bulk=True)
+    portfolios = portfolios.select_related('template').prefetch_related(
+        'projects', 'skills', 'experiences'
+    ).order_by('id')
+    return portfolio_archive_response(
+        portfolios.iterator(chunk_size=20),
+        include_css=options['include_css'],
+        include_js=options['include_js'],
+        minify=options['minify'],
+    )
+
+# Background Job Views
+def queue_export_job(request, options, is_bulk):
+    """Queue an export for the render workers and answer 202 with the job"""
+    if options.get('portfolio_id') is not None:
+        portfolio_ids = [options['portfolio_id']]
+    else:
+        portfolio_ids = options.get('portfolio_ids') or []
+    error_response = missing_portfolios_response(request, portfolio_ids)
+    if error_response is not None:
+        return error_response
+
+    payload = {key: value for key, value in options.items() if key != 'background'}
+    job = enqueue('archive' if is_bulk else 'export', payload, user=request.user)
+    serializer = RenderJobSerializer(job, context={'request': request})
+    response = Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+    response['Location'] = request.build_absolute_uri(reverse('render_job_detail', args=[job.pk]))
+    response['Retry-After'] = str(JOB_POLL_INTERVAL)
+    return response
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def render_jobs(request):
+    """Queue an export job; accepts the same options as the export endpoint"""
+    serializer = PortfolioExportSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return queue_export_job(request, serializer.validated_data, serializer.is_bulk)
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def render_job_detail(request, job_id):
+    """Get job status: 202 with Location and Retry-After while the job runs, 200 once it finished.
+
+    ?wait=<seconds> long-polls, up to MAX_JOB_WAIT, until the job finishes.
+    """
+    try:
+        job = RenderJob.objects.get(pk=job_id, user=request.user)
+    except RenderJob.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        wait = min(float(request.query_params.get('wait', 0)), MAX_JOB_WAIT)
+    except ValueError:
+        wait = 0
+    if wait > 0:
+        job = wait_for_job(job, wait)
+
+    serializer = RenderJobSerializer(job, context={'request': request})
+    if job.is_finished:
+        return Response(serializer.data)
+    response = Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+    response['Location'] = request.build_absolute_uri(reverse('render_job_detail', args=[job.pk]))
+    response['Retry-After'] = str(JOB_POLL_INTERVAL)
+    return response
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def render_job_download(request, job_id):
+    """Download the result of a finished export job"""
+    try:
+        job = RenderJob.objects.exclude(result_path='').get(
+            pk=job_id, user=request.user, status=RenderJob.STATUS_SUCCEEDED
+        )
+        result = open(result_file_path(job), 'rb')
+    except (RenderJob.DoesNotExist, FileNotFoundError):
+        return Response({'error': 'Job result not found'}, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(
+        result, as_attachment=True, filename=job.result_filename, content_type=job.result_content_type
+    )
+
 def generate_portfolio_html(portfolio):
     """Generate complete HTML for portfolio export"""
-    template = portfolio.template
-    projects = portfolio.projects.all()
-    skills = portfolio.skills.all()
-    experiences = portfolio.experiences.all()
-    
-    # Basic HTML template structure
-    html_template = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{portfolio.title}</title>
-    <style>
-        {template.css_content}
-        {portfolio.custom_css}
-    </style>
-</head>
-<body>
-    <header>
-        <h1>{portfolio.hero_title}</h1>
-        <h2>{portfolio.hero_subtitle}</h2>
-    </header>
-    
-    <section id="about">
-        <h3>About</h3>
-        <p>{portfolio.about_content}</p>
-    </section>
-    
-    <section id="projects">
-        <h3>Projects</h3>
-        <div class="projects-grid">
-            {"".join([f'''
-            <div class="project">
-                <h4>{project.title}</h4>
-                <p>{project.description}</p>
-                <p><strong>Technologies:</strong> {project.technology_stack}</p>
-                {f'<a href="{project.project_url}" target="_blank">View Project</a>' if project.project_url else ''}
-                {f'<a href="{project.github_url}" target="_blank">GitHub</a>' if project.github_url else ''}
-            </div>
-            ''' for project in projects])}
-        </div>
-    </section>
-    
-    <section id="skills">
-        <h3>Skills</h3>
-        <div class="skills-grid">
-            {"".join([f'''
-            <div class="skill">
-                <span>{skill.name}</span>
-                <div class="skill-bar">
-                    <div class="skill-progress" style="width: {skill.proficiency}%"></div>
-                </div>
-            </div>
-            ''' for skill in skills])}
-        </div>
-    </section>
-    
-    <section id="experience">
-        <h3>Experience</h3>
-        {"".join([f'''
-        <div class="experience">
-            <h4>{exp.position} at {exp.company}</h4>
-            <p class="duration">{exp.start_date} - {"Present" if exp.is_current else exp.end_date}</p>
-            <p>{exp.description}</p>
-        </div>
-        ''' for exp in experiences])}
-    </section>
-    
-    <section id="contact">
-        <h3>Contact</h3>
-        <p>Email: {portfolio.contact_email}</p>
-        {f'<p>Phone: {portfolio.contact_phone}</p>' if portfolio.contact_phone else ''}
-        {f'<a href="{portfolio.social_linkedin}" target="_blank">LinkedIn</a>' if portfolio.social_linkedin else ''}
-        {f'<a href="{portfolio.social_github}" target="_blank">GitHub</a>' if portfolio.social_github else ''}
-        {f'<a href="{portfolio.social_twitter}" target="_blank">Twitter</a>' if portfolio.social_twitter else ''}
-    </section>
-    
-    {portfolio.custom_html}
-    
-    <script>
-        {template.js_content}
-    </script>
-</body>
-</html>
-    """
-    
-    return html_template.strip()
+    return render_portfolio(portfolio)
 
 # Legacy endpoint for backward compatibility
 @api_view(['GET', 'POST'])
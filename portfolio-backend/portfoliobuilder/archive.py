@@ -0,0 +1,85 @@
+"""
+Streamed ZIP archives of several portfolios.
+
+The archive is produced incrementally: zipfile writes into a small in-memory
+sink that is drained after every entry, so memory stays bounded by the largest
+single page no matter how many portfolios are exported. The layout matches the
+static site publisher: ``<slug>/index.html`` pages sharing content-addressed
+``assets/`` files, plus a ``manifest.json``.
+"""
+import json
+import zipfile
+
+from django.http import StreamingHttpResponse
+
+from .postprocess import minify_css, minify_html
+from .render_cache import render_sections
+from .rendering import render_portfolio
+from .static_site import asset_name
+
+
+class _ZipSink:
+    """Write-only file object that hands written bytes back to the generator"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_portfolio_archive(portfolios, include_css=True, include_js=True, minify=False):
+    """Yield the bytes of a ZIP archive containing every portfolio in ``portfolios``"""
+    sink = _ZipSink()
+    written_assets = set()
+    manifest = {}
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for portfolio in portfolios:
+            template = portfolio.template
+            links = {}
+            for extension, content, included in (
+                ('css', template.css_content, include_css),
+                ('js', template.js_content, include_js),
+            ):
+                if not included or not content.strip():
+                    continue
+                if minify and extension == 'css':
+                    content = minify_css(content)
+                name = asset_name(content, extension)
+                if name not in written_assets:
+                    archive.writestr(name, content)
+                    written_assets.add(name)
+                links[extension] = name
+
+            html = render_portfolio(
+                portfolio,
+                stylesheet_href='../' + links['css'] if 'css' in links else '',
+                script_src='../' + links['js'] if 'js' in links else '',
+                include_css=include_css,
+                include_js=include_js,
+                sections=render_sections(portfolio),
+            )
+            if minify:
+                html = minify_html(html)
+            page = f'{portfolio.slug}/index.html'
+            archive.writestr(page, html)
+            manifest[portfolio.slug] = {'path': page, 'title': portfolio.title, 'assets': sorted(links.values())}
+            yield sink.drain()
+
+        archive.writestr('manifest.json', json.dumps({'portfolios': manifest}, indent=2, sort_keys=True))
+    yield sink.drain()
+
+
+def portfolio_archive_response(portfolios, filename='portfolios.zip', **options):
+    response = StreamingHttpResponse(iter_portfolio_archive(portfolios, **options), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,171 @@
+"""
+ASGI-native versions of the read-heavy endpoints.
+
+These views use the async ORM (``aget``/``async for``) and async cache calls so
+an ASGI worker can serve many concurrent reads without a thread-pool hop per
+request. They return the same payloads as their api_views/views counterparts,
+which they fall back to (via sync_to_async) for writes and for the paginated or
+streamed list modes. The URLconfs mount them when PORTFOLIO_ASYNC_VIEWS is on,
+which backend/asgi.py enables by default.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_safe
+from rest_framework.authentication import get_authorization_header
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import api_views, views
+from .authentication import SIGNED_TOKEN_KEYWORD, SignedTokenAuthentication, cache_token, cached_token
+from .catalog import aget_catalog_version, etag_for_version
+from .db_router import use_replica
+from .models import Portfolio, Template
+from .publishing import aget_published_page
+from .serializers import PortfolioSerializer, TemplateCatalogSerializer, TemplateSerializer
+
+# Query parameters handled by pagination.list_response in the sync view
+SYNC_LIST_PARAMS = ('stream', 'cursor', 'page_size')
+NOT_AUTHENTICATED = 'Authentication credentials were not provided.'
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+def not_authenticated_response(request, detail=NOT_AUTHENTICATED):
+    """401 with the challenge of the first authentication class, as DRF answers the sync views"""
+    response = json_response({'detail': str(detail)}, status=401)
+    response['WWW-Authenticate'] = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]().authenticate_header(request)
+    return response
+
+
+async def catalog_response(request, build_data):
+    """Conditional GET for catalog endpoints, mirroring @condition on the sync views"""
+    version = await aget_catalog_version()
+    etag = quote_etag(etag_for_version(version, request))
+    last_modified = version['last_modified']
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = await build_data()
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=api_views.CATALOG_MAX_AGE)
+    return response
+
+
+async def authenticate(request):
+    """Resolve the user from a signed or DRF token header or the session, like the DRF authenticators.
+
+    Returns None for anonymous requests; bad credentials raise AuthenticationFailed with DRF's message.
+    """
+    # Honour APIClient.force_authenticate() the way rest_framework.request.Request does
+    forced_user = getattr(request, '_force_auth_user', None)
+    if forced_user is not None:
+        return forced_user
+    auth = get_authorization_header(request).split()
+    keyword = auth[0].lower() if auth else b''
+    if keyword == SIGNED_TOKEN_KEYWORD.lower().encode():
+        return SignedTokenAuthentication().authenticate(request)[0]
+    if keyword == b'token':
+        if len(auth) == 1:
+            raise AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        if len(auth) > 2:
+            raise AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed(_('Invalid token header. Token string should not contain invalid characters.'))
+        token = cached_token(key)
+        if token is not None:
+            return token.user
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            raise AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        cache_token(token)
+        return token.user
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+@require_GET
+async def api_health_check(request):
+    """Simple health check endpoint for the API"""
+    return json_response({
+        'status': 'healthy',
+        'message': 'Portfolio Builder API is running',
+        'version': '2.0.0',
+        'features': ['Authentication', 'Templates', 'HTML Export']
+    })
+
+
+@use_replica
+@require_GET
+async def templates_list(request):
+    """Get the template catalog (without HTML/CSS/JS bodies unless expanded)"""
+    if any(param in request.GET for param in SYNC_LIST_PARAMS):
+        return await sync_to_async(api_views.templates_list)(request)
+
+    async def build_data():
+        context = {'request': request}
+        templates = TemplateCatalogSerializer.setup_eager_loading(
+            Template.objects.order_by('id'), TemplateCatalogSerializer.requested_fields(context)
+        )
+        rows = [template async for template in templates]
+        return json_response(TemplateCatalogSerializer(rows, many=True, context=context).data)
+
+    return await catalog_response(request, build_data)
+
+
+@use_replica
+@require_GET
+async def template_detail(request, template_id):
+    """Get specific template details"""
+    async def build_data():
+        try:
+            template = await Template.objects.aget(id=template_id)
+        except Template.DoesNotExist:
+            return json_response({'error': 'Template not found'}, status=404)
+        return json_response(TemplateSerializer(template, context={'request': request}).data)
+
+    return await catalog_response(request, build_data)
+
+
+@csrf_exempt
+async def portfolio_detail(request, portfolio_id):
+    """Get a portfolio asynchronously; updates and deletes go through the sync view"""
+    if request.method != 'GET':
+        return await sync_to_async(api_views.portfolio_detail)(request, portfolio_id)
+
+    try:
+        user = await authenticate(request)
+    except AuthenticationFailed as e:
+        return not_authenticated_response(request, e.detail)
+    if user is None:
+        return not_authenticated_response(request)
+    context = {'request': request}
+    portfolios = PortfolioSerializer.setup_eager_loading(
+        Portfolio.objects.all(), PortfolioSerializer.requested_fields(context)
+    )
+    try:
+        portfolio = await portfolios.aget(id=portfolio_id, user=user)
+    except Portfolio.DoesNotExist:
+        return json_response({'error': 'Portfolio not found'}, status=404)
+    return json_response(PortfolioSerializer(portfolio, context=context).data)
+
+
+@require_safe
+async def public_portfolio(request, slug):
+    """Serve the pre-rendered page of a published portfolio"""
+    return views.published_page_response(request, await aget_published_page(slug))
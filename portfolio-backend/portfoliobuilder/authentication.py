@@ -0,0 +1,157 @@
+"""
+DRF authentication classes that keep the database off the hot read paths.
+
+CachedTokenAuthentication remembers tokens, with their user, in a bounded,
+per-process TTL cache, so only the first request of a token within the TTL runs the token/user
+join. Token deletion (logout) and changes to the user, deactivation included,
+drop the entry in this process (see signals); other worker processes notice
+within PORTFOLIO_TOKEN_CACHE_TTL seconds.
+
+SignedTokenAuthentication accepts short-lived ``Signed <token>`` headers minted
+by issue_signed_token(). The user is rebuilt from the signed payload without any
+query, as a read-only SignedTokenUser. Logout and deactivation record a
+revocation time in the PORTFOLIO_TOKEN_REVOCATION_CACHE_ALIAS cache and tokens
+issued before it are refused. With a shared cache (Redis, Memcached) that holds
+for every process; with the default per-process LocMemCache only the process
+that handled the logout refuses them, and elsewhere they stay valid until they
+expire after PORTFOLIO_SIGNED_TOKEN_MAX_AGE seconds.
+"""
+import copy
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.dateparse import parse_datetime
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+from .lru import LRUCache
+from .models import SignedTokenUser
+
+SIGNED_TOKEN_SALT = 'portfoliobuilder.signed-token'
+SIGNED_TOKEN_KEYWORD = 'Signed'
+# User fields carried in a signed token, enough for permission checks and the profile payload
+SIGNED_USER_FIELDS = ('email', 'username', 'first_name', 'last_name', 'is_staff', 'is_superuser')
+SIGNED_USER_DATETIME_FIELDS = ('created_at',)
+REVOKED_KEY = 'signed-token-revoked:{user_id}'
+
+
+def token_cache_ttl():
+    return getattr(settings, 'PORTFOLIO_TOKEN_CACHE_TTL', 60)
+
+
+def signed_token_max_age():
+    return getattr(settings, 'PORTFOLIO_SIGNED_TOKEN_MAX_AGE', 300)
+
+
+# Token key -> token of an active user, with the user loaded; built on first use
+_tokens = None
+
+
+def _token_cache():
+    global _tokens
+    if _tokens is None:
+        _tokens = LRUCache(maxsize=getattr(settings, 'PORTFOLIO_TOKEN_CACHE_SIZE', 10000), ttl=token_cache_ttl())
+    return _tokens
+
+
+@receiver(setting_changed)
+def _reset_token_cache(setting, **kwargs):
+    global _tokens
+    if setting in ('PORTFOLIO_TOKEN_CACHE_SIZE', 'PORTFOLIO_TOKEN_CACHE_TTL'):
+        _tokens = None
+
+
+def _revocation_cache():
+    return caches[getattr(settings, 'PORTFOLIO_TOKEN_REVOCATION_CACHE_ALIAS', 'default')]
+
+
+def _copy_token(token):
+    copied = copy.copy(token)
+    copied.user = copy.copy(token.user)
+    return copied
+
+
+def cached_token(key):
+    """Copy of the cached token for ``key`` and its user, or None; each request gets its own instances"""
+    token = _token_cache().get(key)
+    return None if token is None else _copy_token(token)
+
+
+def cache_token(token):
+    _token_cache().set(token.key, _copy_token(token))
+
+
+def invalidate_token(key):
+    _token_cache().delete(key)
+
+
+def invalidate_user(user_id):
+    """Drop the cached token of a user, e.g. after a profile change"""
+    for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+        invalidate_token(key)
+
+
+def revoke_signed_tokens(user_id):
+    """Refuse the signed tokens issued to a user so far (in every process only with a shared cache)"""
+    _revocation_cache().set(REVOKED_KEY.format(user_id=user_id), time.time(), signed_token_max_age())
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication with a per-process TTL cache of tokens and their users"""
+
+    def authenticate_credentials(self, key):
+        token = cached_token(key)
+        if token is not None:
+            return token.user, token
+        user, token = super().authenticate_credentials(key)
+        cache_token(token)
+        return user, token
+
+
+def issue_signed_token(user):
+    """Short-lived token that SignedTokenAuthentication verifies without the database"""
+    payload = {'id': user.pk, 'iat': time.time()}
+    payload.update({field: getattr(user, field) for field in SIGNED_USER_FIELDS})
+    payload.update({field: getattr(user, field).isoformat() for field in SIGNED_USER_DATETIME_FIELDS})
+    return signing.TimestampSigner(salt=SIGNED_TOKEN_SALT).sign_object(payload, compress=True)
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """Authenticate ``Authorization: Signed <token>`` headers from issue_signed_token()"""
+
+    keyword = SIGNED_TOKEN_KEYWORD
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid signed token header.')
+        try:
+            payload = signing.TimestampSigner(salt=SIGNED_TOKEN_SALT).unsign_object(
+                auth[1].decode(), max_age=signed_token_max_age(),
+            )
+        except (signing.BadSignature, UnicodeError):
+            raise exceptions.AuthenticationFailed('Invalid or expired signed token.')
+
+        revoked_at = _revocation_cache().get(REVOKED_KEY.format(user_id=payload['id']))
+        if revoked_at is not None and payload['iat'] <= revoked_at:
+            raise exceptions.AuthenticationFailed('Invalid or expired signed token.')
+        fields = {field: payload[field] for field in SIGNED_USER_FIELDS}
+        fields.update({
+            field: parse_datetime(payload[field]) if field in payload else None
+            for field in SIGNED_USER_DATETIME_FIELDS
+        })
+        user = SignedTokenUser(id=payload['id'], is_active=True, **fields)
+        user._state.adding = False
+        user._state.db = 'default'
+        return user, None
+
+    def authenticate_header(self, request):
+        return self.keyword
+
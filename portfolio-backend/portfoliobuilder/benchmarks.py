@@ -0,0 +1,392 @@
+"""
+Synthetic data and repeatable benchmarks for the renderer, serializers and API.
+
+seed_benchmark_data() fills the database with benchmark users whose portfolios
+use the create_templates templates. The number of portfolios, projects, skills
+and experiences and the length of their text are drawn from lognormal
+distributions, and technologies follow a Zipf-like popularity curve. So most
+portfolios are small and a long tail is large, as in real data. A fixed seed
+always produces the same data set.
+
+run_benchmarks() times the renderer, the response serializers and every
+read/idempotent endpoint (through the Django test client) on the smallest,
+median and largest seeded portfolios. For each benchmark it records latency
+percentiles and queries per iteration. Results are plain JSON-ready dicts;
+compare_results() diffs two runs to catch regressions.
+"""
+import io
+import json
+import math
+import platform
+import random
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from .api_views import generate_portfolio_html
+from .models import Experience, Portfolio, Project, Skill, Template, User
+from .render_cache import evict_portfolio, render_portfolio_cached
+from .search import update_search_document
+from .serializers import PortfolioSerializer, PortfolioSummarySerializer, TemplateCatalogSerializer
+from .technologies import sync_project_technologies
+
+BENCHMARK_EMAIL_DOMAIN = 'benchmark.invalid'
+BENCHMARK_PASSWORD = 'benchmark-password'
+SEED_BATCH_SIZE = 500
+
+# (median, sigma, minimum, maximum) of the lognormal size distributions
+SIZE_DISTRIBUTIONS = {
+    'portfolios': (1, 0.6, 1, 8),
+    'projects': (6, 0.7, 0, 60),
+    'skills': (12, 0.5, 0, 60),
+    'experiences': (3, 0.6, 0, 20),
+    'description_words': (60, 0.8, 5, 1500),
+    'about_words': (120, 0.7, 10, 3000),
+    'stack_size': (4, 0.5, 1, 15),
+}
+PUBLISHED_RATIO = 0.6
+
+WORDS = (
+    'built', 'designed', 'led', 'shipped', 'scalable', 'platform', 'service', 'team', 'users', 'data',
+    'pipeline', 'dashboard', 'api', 'mobile', 'web', 'application', 'performance', 'latency', 'cloud',
+    'migration', 'open', 'source', 'library', 'customers', 'analytics', 'realtime', 'secure', 'payments',
+    'search', 'frontend', 'backend', 'infrastructure', 'monitoring', 'automated', 'testing', 'release',
+    'product', 'design', 'system', 'feature', 'improved', 'reduced', 'costs', 'growth', 'experience',
+    'with', 'and', 'for', 'the', 'a', 'to', 'of', 'in', 'on', 'across', 'using',
+)
+# Most popular first; picked with 1/rank weights
+TECHNOLOGIES = (
+    'JavaScript', 'Python', 'React', 'TypeScript', 'Node.js', 'PostgreSQL', 'Docker', 'AWS', 'Django',
+    'HTML', 'CSS', 'Git', 'Java', 'Kubernetes', 'Redis', 'GraphQL', 'Vue', 'Go', 'MongoDB', 'Flask',
+    'Tailwind CSS', 'Next.js', 'C#', 'Rust', 'Terraform', 'Figma', 'Swift', 'Kotlin', 'Elasticsearch',
+    'Kafka', 'Angular', 'Svelte', 'Ruby on Rails', 'PHP', 'MySQL', 'SQLite', 'FastAPI', 'Spring',
+    'TensorFlow', 'PyTorch', 'Pandas', 'Celery', 'RabbitMQ', 'Nginx', 'Linux', 'Azure', 'GCP', 'Sass',
+)
+TECHNOLOGY_WEIGHTS = [1 / rank for rank in range(1, len(TECHNOLOGIES) + 1)]
+SKILL_CATEGORIES = [category for category, _ in Skill.SKILL_CATEGORIES]
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _size(rng, distribution):
+    median, sigma, minimum, maximum = SIZE_DISTRIBUTIONS[distribution]
+    return max(minimum, min(maximum, round(rng.lognormvariate(math.log(median), sigma))))
+
+
+def _text(rng, distribution):
+    words = rng.choices(WORDS, k=_size(rng, distribution))
+    sentences = [' '.join(words[i:i + 12]).capitalize() + '.' for i in range(0, len(words), 12)]
+    return ' '.join(sentences)
+
+
+def clear_benchmark_data():
+    """Delete every benchmark user with their portfolios; returns the number of users"""
+    users = User.objects.filter(email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}')
+    count = users.count()
+    users.delete()
+    return count
+
+
+def seed_benchmark_data(users=50, seed=0, published_ratio=PUBLISHED_RATIO):
+    """Replace the benchmark data set with ``users`` users and their portfolios; returns row counts"""
+    rng = random.Random(seed)
+    call_command('create_templates', stdout=io.StringIO())
+    templates = list(Template.objects.order_by('id'))
+    password = make_password(BENCHMARK_PASSWORD)
+
+    with transaction.atomic():
+        clear_benchmark_data()
+        created_users = User.objects.bulk_create([
+            User(
+                email=f'bench{index}@{BENCHMARK_EMAIL_DOMAIN}', username=f'bench{index}',
+                first_name='Bench', last_name=f'User {index}', password=password,
+            )
+            for index in range(users)
+        ], batch_size=SEED_BATCH_SIZE)
+        Token.objects.bulk_create(
+            [Token(user=user, key=Token.generate_key()) for user in created_users], batch_size=SEED_BATCH_SIZE,
+        )
+
+        portfolios = []
+        for user in created_users:
+            for number in range(_size(rng, 'portfolios')):
+                portfolios.append(Portfolio(
+                    user=user,
+                    template=rng.choice(templates),
+                    title=f'{user.first_name} {user.last_name} portfolio {number + 1}',
+                    slug=f'{user.username}-{number + 1}',
+                    hero_title=f'{user.first_name} {user.last_name}',
+                    hero_subtitle=_text(rng, 'stack_size'),
+                    about_content=_text(rng, 'about_words'),
+                    contact_email=user.email,
+                    social_github=f'https://github.com/{user.username}',
+                    is_published=rng.random() < published_ratio,
+                ))
+        portfolios = Portfolio.objects.bulk_create(portfolios, batch_size=SEED_BATCH_SIZE)
+
+        projects, skills, experiences = [], [], []
+        for portfolio in portfolios:
+            for order in range(_size(rng, 'projects')):
+                stack = dict.fromkeys(rng.choices(TECHNOLOGIES, TECHNOLOGY_WEIGHTS, k=_size(rng, 'stack_size')))
+                projects.append(Project(
+                    portfolio=portfolio, title=f'Project {order + 1}', description=_text(rng, 'description_words'),
+                    technology_stack=', '.join(stack), github_url=f'https://github.com/example/project-{order}',
+                    order=order, is_featured=order < 2,
+                ))
+            for order in range(_size(rng, 'skills')):
+                skills.append(Skill(
+                    portfolio=portfolio, name=rng.choices(TECHNOLOGIES, TECHNOLOGY_WEIGHTS)[0],
+                    category=rng.choice(SKILL_CATEGORIES), proficiency=rng.randint(30, 100), order=order,
+                ))
+            start = date(2024, 1, 1)
+            for order in range(_size(rng, 'experiences')):
+                end = start
+                start = end - timedelta(days=rng.randint(180, 1500))
+                experiences.append(Experience(
+                    portfolio=portfolio, company=f'Company {rng.randint(1, 500)}', position='Software Engineer',
+                    description=_text(rng, 'description_words'), start_date=start,
+                    end_date=None if order == 0 else end, is_current=order == 0, order=order,
+                ))
+        projects = Project.objects.bulk_create(projects, batch_size=SEED_BATCH_SIZE)
+        Skill.objects.bulk_create(skills, batch_size=SEED_BATCH_SIZE)
+        Experience.objects.bulk_create(experiences, batch_size=SEED_BATCH_SIZE)
+        for start in range(0, len(projects), SEED_BATCH_SIZE):
+            sync_project_technologies(projects[start:start + SEED_BATCH_SIZE])
+
+    # bulk_create sends no signals, so index the published portfolios explicitly
+    for portfolio in portfolios:
+        if portfolio.is_published:
+            update_search_document(portfolio.pk)
+    return {
+        'users': len(created_users), 'portfolios': len(portfolios), 'projects': len(projects),
+        'skills': len(skills), 'experiences': len(experiences),
+    }
+
+
+class QueryCounter:
+    """Connection execute wrapper counting queries"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class BenchmarkError(Exception):
+    """A benchmarked request did not succeed"""
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: object
+    # Called before every iteration, outside the timing (e.g. to empty a cache)
+    setup: object = None
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def measure(benchmark, iterations, warmup):
+    """Run one benchmark and summarise its latency (ms) and queries per iteration"""
+    timings, queries = [], []
+    for iteration in range(warmup + iterations):
+        if benchmark.setup is not None:
+            benchmark.setup()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            result = benchmark.run()
+            elapsed = time.perf_counter() - start
+        status_code = getattr(result, 'status_code', 200)
+        if status_code >= 400:
+            raise BenchmarkError(f'{benchmark.name} responded with {status_code}')
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(counter.count)
+
+    timings.sort()
+    summary = {
+        'iterations': iterations,
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'min_ms': round(timings[0], 3),
+        'max_ms': round(timings[-1], 3),
+        'queries': statistics.median_low(queries),
+        'max_queries': max(queries),
+    }
+    for pct in PERCENTILES:
+        summary[f'p{pct}_ms'] = round(percentile(timings, pct), 3)
+    return summary
+
+
+def benchmark_subjects():
+    """The smallest, median and largest benchmark portfolios by project count"""
+    portfolios = list(
+        Portfolio.objects.filter(user__email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}')
+        .annotate(project_count=Count('projects')).order_by('project_count', 'id')
+        .values_list('id', flat=True)
+    )
+    if not portfolios:
+        raise BenchmarkError('No benchmark data; run seed_benchmark_data first')
+    subjects = {
+        'small': portfolios[0],
+        'median': portfolios[len(portfolios) // 2],
+        'large': portfolios[-1],
+    }
+    return {size: Portfolio.objects.select_related('user', 'template').get(pk=pk) for size, pk in subjects.items()}
+
+
+def build_benchmarks(subjects):
+    """Every benchmark, keyed by name, run against the seeded subject portfolios"""
+    owner = subjects['median'].user
+    client = Client(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=owner).key}')
+    published = (
+        Portfolio.objects.filter(user__email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}', is_published=True)
+        .order_by('id').first()
+    )
+    benchmarks = []
+
+    for size, portfolio in subjects.items():
+        def load(pk=portfolio.pk):
+            return Portfolio.objects.select_related('template').get(pk=pk)
+
+        def serialize(pk=portfolio.pk):
+            queryset = PortfolioSerializer.setup_eager_loading(Portfolio.objects.all())
+            return PortfolioSerializer(queryset.get(pk=pk)).data
+
+        benchmarks += [
+            Benchmark(f'render.generate_portfolio_html.{size}', lambda load=load: generate_portfolio_html(load())),
+            Benchmark(
+                f'render.render_portfolio_cached.cold.{size}', lambda load=load: render_portfolio_cached(load()),
+                setup=lambda load=load: evict_portfolio(load()),
+            ),
+            Benchmark(f'render.render_portfolio_cached.warm.{size}', lambda load=load: render_portfolio_cached(load())),
+            Benchmark(f'serializer.portfolio.{size}', serialize),
+        ]
+
+    def serialize_summaries():
+        queryset = PortfolioSummarySerializer.setup_eager_loading(
+            Portfolio.objects.filter(user=owner), PortfolioSummarySerializer.requested_fields(),
+        )
+        return PortfolioSummarySerializer(queryset, many=True).data
+
+    def serialize_catalog():
+        queryset = TemplateCatalogSerializer.setup_eager_loading(
+            Template.objects.all(), TemplateCatalogSerializer.requested_fields(),
+        )
+        return TemplateCatalogSerializer(queryset, many=True).data
+
+    benchmarks += [
+        Benchmark('serializer.portfolio_summary_list', serialize_summaries),
+        Benchmark('serializer.template_catalog', serialize_catalog),
+    ]
+
+    median = subjects['median']
+    template = median.template
+    endpoints = [
+        ('health', 'get', reverse('api_health_check'), None),
+        ('profile', 'get', reverse('user_profile'), None),
+        ('templates_list', 'get', reverse('templates_list'), None),
+        ('template_detail', 'get', reverse('template_detail', args=[template.pk]), None),
+        ('portfolios_list', 'get', reverse('portfolios_list'), None),
+        ('portfolio_detail', 'get', reverse('portfolio_detail', args=[median.pk]), None),
+        ('portfolio_update', 'put', reverse('portfolio_detail', args=[median.pk]), {'hero_title': median.hero_title}),
+        ('portfolio_projects', 'get', reverse('portfolio_projects', args=[median.pk]), None),
+        ('portfolio_preview', 'post', reverse('portfolio_preview', args=[median.pk]),
+         {'patch': {'hero_title': 'Preview'}, 'sections': {}}),
+        ('export', 'post', reverse('export_portfolio'), {'portfolio_id': median.pk}),
+        ('technologies_list', 'get', reverse('technologies_list'), None),
+        ('technology_portfolios', 'get', reverse('technology_portfolios', args=[TECHNOLOGIES[0].lower()]), None),
+        ('search', 'get', f"{reverse('search')}?q=platform", None),
+    ]
+    if published is not None:
+        endpoints.append(('public_portfolio', 'get', reverse('public_portfolio', args=[published.slug]), None))
+
+    for name, method, url, data in endpoints:
+        if data is None:
+            run = lambda method=method, url=url: getattr(client, method)(url)
+        else:
+            run = lambda method=method, url=url, data=json.dumps(data): getattr(client, method)(
+                url, data, content_type='application/json',
+            )
+        benchmarks.append(Benchmark(f'endpoint.{name}', run))
+    return {benchmark.name: benchmark for benchmark in benchmarks}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(iterations=20, warmup=3, only=None, progress=None):
+    """Run the benchmarks (those whose name starts with one of ``only``) and return the results document"""
+    # The test client's default host is not in ALLOWED_HOSTS outside the test runner
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        benchmarks = build_benchmarks(benchmark_subjects())
+        results = {}
+        for name, benchmark in benchmarks.items():
+            if only and not name.startswith(tuple(only)):
+                continue
+            results[name] = measure(benchmark, iterations, warmup)
+            if progress is not None:
+                progress(name, results[name])
+
+    return {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': iterations,
+            'warmup': warmup,
+            'data': {
+                'portfolios': Portfolio.objects.filter(user__email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}').count(),
+                'projects': Project.objects.filter(
+                    portfolio__user__email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}'
+                ).count(),
+            },
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline, current, threshold=0.1):
+    """Per-benchmark p50 change and query delta; a benchmark regressed if p50 grew by more than ``threshold`` or it runs more queries"""
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] if before['p50_ms'] else 0.0
+        rows.append({
+            'name': name,
+            'baseline_p50_ms': before['p50_ms'],
+            'p50_ms': result['p50_ms'],
+            'change': change,
+            'baseline_queries': before['queries'],
+            'queries': result['queries'],
+            'regressed': change > threshold or result['queries'] > before['queries'],
+        })
+    return rows
@@ -0,0 +1,153 @@
+"""
+Batch writes for the projects, skills and experiences of a portfolio.
+
+A batch is validated as a whole and written with bulk_create/bulk_update (or a
+single CASE UPDATE for reordering) inside one transaction. Bulk writes do not
+send model signals, so every operation invalidates the portfolio's cached
+renders and public page itself.
+"""
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, Value, When
+from rest_framework import serializers
+
+from .models import Experience, Project, Skill
+from .serializers import ExperienceItemSerializer, ProjectItemSerializer, SkillItemSerializer
+from .signals import portfolio_content_changed
+from .technologies import sync_project_technologies
+
+# URL section name -> (model, item serializer)
+BULK_SECTIONS = {
+    'projects': (Project, ProjectItemSerializer),
+    'skills': (Skill, SkillItemSerializer),
+    'experiences': (Experience, ExperienceItemSerializer),
+}
+MAX_BULK_ITEMS = 500
+
+
+class BulkError(Exception):
+    """Raised with per-item errors (aligned with the request list) when a batch is rejected"""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def validate_items(serializer_class, items, instances=None):
+    """Validate every item, collecting errors per index; raises BulkError if any fail"""
+    if not isinstance(items, list) or not items:
+        raise BulkError({'non_field_errors': ['Expected a non-empty list of items']})
+    if len(items) > MAX_BULK_ITEMS:
+        raise BulkError({'non_field_errors': [f'At most {MAX_BULK_ITEMS} items per request']})
+
+    validated, errors = [], []
+    for index, item in enumerate(items):
+        instance = instances[index] if instances else None
+        serializer = serializer_class(instance, data=item, partial=instance is not None)
+        if serializer.is_valid():
+            validated.append(serializer.validated_data)
+            errors.append({})
+        else:
+            validated.append(None)
+            errors.append(serializer.errors)
+    if any(errors):
+        raise BulkError(errors)
+    return validated
+
+
+def validate_item_ids(items):
+    """The integer ``id`` of every item, with errors per index; raises BulkError if any is invalid"""
+    if not isinstance(items, list):
+        raise BulkError({'non_field_errors': ['Expected a non-empty list of items']})
+    id_field = serializers.IntegerField(min_value=1)
+    ids, errors = [], []
+    for item in items:
+        if not isinstance(item, dict):
+            ids.append(None)
+            errors.append({'non_field_errors': ['Expected an object']})
+            continue
+        try:
+            ids.append(id_field.run_validation(item.get('id', serializers.empty)))
+            errors.append({})
+        except serializers.ValidationError as e:
+            ids.append(None)
+            errors.append({'id': e.detail})
+    if any(errors):
+        raise BulkError(errors)
+    if len(set(ids)) != len(ids):
+        raise BulkError({'non_field_errors': ['Every item needs a distinct id']})
+    return ids
+
+
+def first_free_order(model, portfolio):
+    """Order value that places a new row after every existing one"""
+    last = model.objects.filter(portfolio=portfolio).aggregate(last=Max('order'))['last']
+    return 0 if last is None else last + 1
+
+
+def bulk_create_items(portfolio, section, items):
+    """Create ``items`` under ``portfolio``; items without an order are appended"""
+    model, serializer_class = BULK_SECTIONS[section]
+    validated = validate_items(serializer_class, items)
+    with transaction.atomic():
+        next_order = first_free_order(model, portfolio)
+        objects = []
+        for attrs in validated:
+            if 'order' not in attrs:
+                attrs = {**attrs, 'order': next_order}
+                next_order += 1
+            objects.append(model(portfolio=portfolio, **attrs))
+        created = model.objects.bulk_create(objects)
+        if model is Project:
+            sync_project_technologies(created)
+        portfolio_content_changed(portfolio.pk)
+    return created
+
+
+def bulk_update_items(portfolio, section, items):
+    """Apply partial updates; every item names the ``id`` of a row in ``portfolio``"""
+    model, serializer_class = BULK_SECTIONS[section]
+    ids = validate_item_ids(items)
+
+    with transaction.atomic():
+        rows = model.objects.select_for_update().in_bulk(ids)
+        missing = [pk for pk in ids if pk not in rows or rows[pk].portfolio_id != portfolio.pk]
+        if missing:
+            raise BulkError({'id': [f'Not found: {missing}']})
+        instances = [rows[pk] for pk in ids]
+        validated = validate_items(serializer_class, items, instances)
+        fields = set()
+        for instance, attrs in zip(instances, validated):
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+            fields.update(attrs)
+        if fields:
+            model.objects.bulk_update(instances, sorted(fields))
+            if model is Project and 'technology_stack' in fields:
+                sync_project_technologies(instances)
+            portfolio_content_changed(portfolio.pk)
+    return instances
+
+
+def reorder_items(portfolio, section, ids):
+    """Rewrite the order column in one statement: ``ids`` first, then the rest as they were.
+
+    Returns the ids in the order the section is displayed, which is the model's
+    Meta.ordering: skills stay grouped by category, so ``ids`` only reorders
+    skills within a category, and experiences are always listed by start date.
+    """
+    model, _ = BULK_SECTIONS[section]
+    with transaction.atomic():
+        current = list(
+            model.objects.select_for_update().filter(portfolio=portfolio).values_list('pk', flat=True)
+        )
+        missing = sorted(set(ids) - set(current))
+        if missing:
+            raise BulkError({'ids': [f'Not found: {missing}']})
+        listed = set(ids)
+        final = list(ids) + [pk for pk in current if pk not in listed]
+        model.objects.filter(portfolio=portfolio).update(order=Case(
+            *[When(pk=pk, then=Value(position)) for position, pk in enumerate(final)],
+            output_field=IntegerField(),
+        ))
+        portfolio_content_changed(portfolio.pk)
+        return list(model.objects.filter(portfolio=portfolio).values_list('pk', flat=True))
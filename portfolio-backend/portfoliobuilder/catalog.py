@@ -0,0 +1,58 @@
+"""
+Template catalog versioning for conditional GETs.
+
+The catalog version (template count and newest ``updated_at``) is kept in the
+cache so the ETag/Last-Modified checks of the template endpoints cost no queries.
+Template signals refresh it; the timeout bounds staleness for per-process caches.
+"""
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+
+from .models import Template
+
+CATALOG_VERSION_KEY = 'portfoliobuilder:template-catalog-version'
+CATALOG_VERSION_TIMEOUT = 60
+
+
+def _cache():
+    return caches[getattr(settings, 'PORTFOLIO_CATALOG_CACHE_ALIAS', 'default')]
+
+
+def refresh_catalog_version():
+    """Recompute the catalog version from the database and store it"""
+    stats = Template.objects.aggregate(count=Count('id'), last_modified=Max('updated_at'))
+    digest = hashlib.sha256(f"{stats['count']}:{stats['last_modified']}".encode()).hexdigest()
+    version = {'etag': digest[:32], 'last_modified': stats['last_modified']}
+    _cache().set(CATALOG_VERSION_KEY, version, CATALOG_VERSION_TIMEOUT)
+    return version
+
+
+def get_catalog_version():
+    version = _cache().get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = refresh_catalog_version()
+    return version
+
+
+async def aget_catalog_version():
+    version = await _cache().aget(CATALOG_VERSION_KEY)
+    if version is None:
+        version = await sync_to_async(refresh_catalog_version)()
+    return version
+
+
+def etag_for_version(version, request):
+    """Strong ETag for a catalog response; varies with the path and query string"""
+    return hashlib.sha256(f"{version['etag']}:{request.get_full_path()}".encode()).hexdigest()[:32]
+
+
+def catalog_etag(request, *args, **kwargs):
+    return etag_for_version(get_catalog_version(), request)
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    return get_catalog_version()['last_modified']
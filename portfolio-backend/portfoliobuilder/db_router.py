@@ -0,0 +1,62 @@
+"""
+Read-replica routing for the read-only views.
+
+When settings define a ``replica`` database (the postgres profile does when
+PORTFOLIO_DB_REPLICA_HOST is set), views wrapped in ``use_replica`` send their
+reads there; everything else, including every write, stays on ``default``.
+Routing is opt-in per view because replicas lag: an editor re-reading their
+own portfolio right after a save must not see the previous version.
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+_reading_from_replica = ContextVar('portfolio_reading_from_replica', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Route ORM reads made inside the block to the replica, if one is configured"""
+    token = _reading_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _reading_from_replica.reset(token)
+
+
+def use_replica(view):
+    """Decorator for read-only (sync or async) views whose reads may go to the replica"""
+    if iscoroutinefunction(view):
+        async def wrapper(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+        markcoroutinefunction(wrapper)
+    else:
+        def wrapper(*args, **kwargs):
+            with replica_reads():
+                return view(*args, **kwargs)
+    return functools.wraps(view)(wrapper)
+
+
+class ReplicaRouter:
+    """Send reads to the replica inside replica_reads(), everything else to default"""
+
+    def db_for_read(self, model, **hints):
+        if _reading_from_replica.get() and REPLICA_ALIAS in settings.DATABASES:
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so rows read from either may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,190 @@
+"""
+Database-backed job queue for exports and renders.
+
+Jobs are RenderJob rows; the run_render_worker command claims them with a
+conditional UPDATE (portable across SQLite and Postgres, no broker needed),
+runs them and writes results under PORTFOLIO_JOB_RESULT_ROOT, where they are
+kept for JOB_RESULT_TTL. Web requests only enqueue and poll (optionally
+long-polling for a few seconds), so long renders never occupy a request worker.
+"""
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .archive import iter_portfolio_archive
+from .models import Portfolio, RenderJob
+from .render_cache import render_portfolio_cached
+from .render_pool import rerender_portfolios
+from .static_site import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Jobs left running longer than this are assumed to belong to a dead worker
+STALE_JOB_TIMEOUT = timedelta(minutes=30)
+MAX_ATTEMPTS = 3
+# Result files of jobs finished longer ago than this are deleted
+JOB_RESULT_TTL = timedelta(days=1)
+# Seconds between a worker's housekeeping passes (stale jobs, expired results)
+MAINTENANCE_INTERVAL = 60
+
+
+def get_result_root():
+    return os.fspath(getattr(settings, 'PORTFOLIO_JOB_RESULT_ROOT', os.path.join(settings.BASE_DIR, 'job_results')))
+
+
+def result_file_path(job):
+    return os.path.join(get_result_root(), job.result_path)
+
+
+def enqueue(kind, payload, user=None):
+    """Queue a job and return its RenderJob row"""
+    return RenderJob.objects.create(kind=kind, payload=payload, user=user)
+
+
+def default_worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_next_job(worker_name=None):
+    """Atomically move the oldest queued job to running and return it, or None"""
+    worker_name = worker_name or default_worker_name()
+    while True:
+        candidate = RenderJob.objects.filter(status=RenderJob.STATUS_QUEUED).order_by('created_at').first()
+        if candidate is None:
+            return None
+        claimed = RenderJob.objects.filter(pk=candidate.pk, status=RenderJob.STATUS_QUEUED).update(
+            status=RenderJob.STATUS_RUNNING,
+            worker=worker_name,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            candidate.refresh_from_db()
+            return candidate
+        # Another worker took it first; try the next one
+
+
+def requeue_stale_jobs(timeout=STALE_JOB_TIMEOUT):
+    """Return jobs abandoned by crashed workers to the queue (or fail them after MAX_ATTEMPTS)"""
+    stale = RenderJob.objects.filter(
+        status=RenderJob.STATUS_RUNNING, started_at__lt=timezone.now() - timeout
+    )
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=RenderJob.STATUS_FAILED, error='Worker stopped responding', finished_at=timezone.now()
+    )
+    return stale.update(status=RenderJob.STATUS_QUEUED, worker='')
+
+
+def purge_expired_results(ttl=JOB_RESULT_TTL):
+    """Delete the result files of jobs that finished more than ``ttl`` ago; returns how many"""
+    expired = RenderJob.objects.filter(finished_at__lt=timezone.now() - ttl).exclude(result_path='')
+    purged = 0
+    for job in expired.only('pk', 'result_path'):
+        try:
+            os.remove(result_file_path(job))
+        except FileNotFoundError:
+            pass
+        purged += RenderJob.objects.filter(pk=job.pk, result_path=job.result_path).update(result_path='')
+    return purged
+
+
+def run_maintenance():
+    """Requeue jobs of dead workers and purge expired results; returns (requeued, purged)"""
+    return requeue_stale_jobs(), purge_expired_results()
+
+
+def _export_options(payload):
+    return {
+        'include_css': payload.get('include_css', True),
+        'include_js': payload.get('include_js', True),
+        'minify': payload.get('minify', False),
+    }
+
+
+def _user_portfolios(job):
+    return Portfolio.objects.filter(user=job.user).select_related('template').prefetch_related(
+        'projects', 'skills', 'experiences'
+    )
+
+
+def run_export(job):
+    portfolio = _user_portfolios(job).get(pk=job.payload['portfolio_id'])
+    data = render_portfolio_cached(portfolio, **_export_options(job.payload))
+    path = f'{job.pk}.html'
+    write_atomic(os.path.join(get_result_root(), path), data)
+    return path, 'text/html; charset=utf-8', f'{portfolio.slug}.html'
+
+
+def run_archive(job):
+    portfolios = _user_portfolios(job).order_by('id')
+    if not job.payload.get('all'):
+        portfolios = portfolios.filter(id__in=job.payload['portfolio_ids'])
+    path = f'{job.pk}.zip'
+    full_path = os.path.join(get_result_root(), path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    tmp_path = f'{full_path}.part'
+    with open(tmp_path, 'wb') as f:
+        for chunk in iter_portfolio_archive(portfolios.iterator(chunk_size=20), **_export_options(job.payload)):
+            f.write(chunk)
+    os.replace(tmp_path, full_path)
+    return path, 'application/zip', 'portfolios.zip'
+
+
+def run_rerender(job):
+    portfolios = Portfolio.objects.all()
+    if job.payload.get('template_ids'):
+        portfolios = portfolios.filter(template_id__in=job.payload['template_ids'])
+    if job.payload.get('published_only'):
+        portfolios = portfolios.filter(is_published=True)
+    report = rerender_portfolios(portfolios, workers=job.payload.get('workers', 0))
+    if report.failed:
+        raise RuntimeError(f'{len(report.failed)} of {report.total} portfolios failed to render')
+    return '', '', ''
+
+
+JOB_HANDLERS = {
+    'export': run_export,
+    'archive': run_archive,
+    'rerender': run_rerender,
+}
+
+
+def run_job(job):
+    """Execute a claimed job and record its outcome"""
+    try:
+        path, content_type, filename = JOB_HANDLERS[job.kind](job)
+    except Exception as e:
+        logger.exception('Render job %s failed', job.pk)
+        job.status = RenderJob.STATUS_FAILED
+        job.error = str(e)
+    else:
+        job.status = RenderJob.STATUS_SUCCEEDED
+        job.result_path = path
+        job.result_content_type = content_type
+        job.result_filename = filename
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'error', 'result_path', 'result_content_type', 'result_filename', 'finished_at',
+    ])
+    return job
+
+
+def wait_for_job(job, timeout, poll_interval=0.5):
+    """Reload ``job`` until it finishes or ``timeout`` seconds pass; callers keep ``timeout`` short"""
+    deadline = time.monotonic() + timeout
+    while not job.is_finished and time.monotonic() < deadline:
+        time.sleep(min(poll_interval, max(deadline - time.monotonic(), 0)))
+        job.refresh_from_db()
+    return job
+
+
+def enqueue_on_commit(kind, payload, user=None):
+    """Queue a job from inside a signal handler without holding up the transaction"""
+    transaction.on_commit(lambda: enqueue(kind, payload, user))
@@ -0,0 +1,252 @@
+"""
+Concurrent load test replaying editor and viewer traffic.
+
+Virtual clients run in threads, each signed in as one of the seed_benchmark_data
+users, and issue a weighted mix of requests for a fixed duration:
+
+* ``login``     - POST auth/login/ (password hashing included)
+* ``dashboard`` - GET portfolios/, the editor's portfolio list
+* ``autosave``  - PUT portfolios/<id>/ with a changed about text
+* ``export``    - POST export/ of one of the client's portfolios
+* ``public``    - GET a random published page at p/<slug>/
+
+Requests go over real HTTP, either to a threaded WSGI server started in this
+process on the configured database (the ceiling of one process) or to an
+external ASGI/WSGI deployment given by URL. Per action the report has
+throughput, p50/p95/p99 latency and the error rate.
+"""
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
+
+from .benchmarks import BENCHMARK_EMAIL_DOMAIN, BENCHMARK_PASSWORD, percentile
+from .models import Portfolio
+
+ACTIONS = ('login', 'dashboard', 'autosave', 'export', 'public')
+DEFAULT_MIX = {'login': 1, 'dashboard': 30, 'autosave': 20, 'export': 5, 'public': 44}
+REQUEST_TIMEOUT = 30
+# Error messages kept per action in the report
+MAX_REPORTED_ERRORS = 5
+
+
+class LoadTestError(Exception):
+    """The load test cannot start"""
+
+
+def parse_mix(value):
+    """Parse ``login=1,dashboard=30,...`` into action weights; omitted actions get weight 0"""
+    mix = dict.fromkeys(ACTIONS, 0)
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in mix:
+            raise LoadTestError(f'Unknown action {name!r}; expected one of {", ".join(ACTIONS)}')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise LoadTestError(f'Invalid weight for {name}: {weight!r}')
+    if not any(weight > 0 for weight in mix.values()):
+        raise LoadTestError('The mix needs at least one action with a positive weight')
+    return mix
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class LoadTestServer(ThreadedWSGIServer):
+    # Room for every client to connect at once without refusals
+    request_queue_size = 256
+
+
+def start_server(host='127.0.0.1', port=0):
+    """Serve the project's WSGI application from a background thread; returns (server, base URL)"""
+    server = LoadTestServer((host, port), QuietWSGIRequestHandler, allow_reuse_address=True)
+    server.set_app(get_wsgi_application())
+    threading.Thread(target=server.serve_forever, name='loadtest-server', daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+@dataclass
+class Sample:
+    action: str
+    seconds: float
+    ok: bool
+    error: str = ''
+
+
+@dataclass
+class Account:
+    email: str
+    portfolio_ids: list
+
+
+def load_accounts():
+    """Benchmark users with their portfolio ids, and the slugs of published benchmark portfolios"""
+    portfolios = Portfolio.objects.filter(
+        user__email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}'
+    ).values_list('user__email', 'pk', 'slug', 'is_published')
+    accounts, slugs = {}, []
+    for email, pk, slug, is_published in portfolios:
+        accounts.setdefault(email, Account(email, [])).portfolio_ids.append(pk)
+        if is_published:
+            slugs.append(slug)
+    if not accounts:
+        raise LoadTestError('No benchmark users; run seed_benchmark_data first')
+    return list(accounts.values()), slugs
+
+
+class VirtualClient:
+    """One simulated user issuing mix-weighted requests until the deadline"""
+
+    def __init__(self, base_url, account, slugs, mix, rng, think_time=0.0):
+        self.base_url = base_url.rstrip('/')
+        self.account = account
+        self.slugs = slugs
+        # Without published portfolios there is no public page to request
+        self.actions = [action for action in ACTIONS if mix[action] > 0 and (action != 'public' or slugs)]
+        self.weights = [mix[action] for action in self.actions]
+        self.rng = rng
+        self.think_time = think_time
+        self.token = None
+        self.samples = []
+
+    def request(self, method, path, data=None):
+        headers = {'Accept': 'application/json'}
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers['Content-Type'] = 'application/json'
+        if self.token:
+            headers['Authorization'] = f'Token {self.token}'
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            return response.read()
+
+    def login(self):
+        response = self.request('POST', reverse('login'), {
+            'email': self.account.email, 'password': BENCHMARK_PASSWORD,
+        })
+        self.token = json.loads(response)['token']
+
+    def dashboard(self):
+        self.request('GET', reverse('portfolios_list'))
+
+    def autosave(self):
+        portfolio_id = self.rng.choice(self.account.portfolio_ids)
+        self.request('PUT', reverse('portfolio_detail', args=[portfolio_id]), {
+            'about_content': f'Autosaved draft {self.rng.getrandbits(32):08x}. ' * self.rng.randint(1, 40),
+        })
+
+    def export(self):
+        self.request('POST', reverse('export_portfolio'), {
+            'portfolio_id': self.rng.choice(self.account.portfolio_ids),
+        })
+
+    def public(self):
+        self.request('GET', reverse('public_portfolio', args=[self.rng.choice(self.slugs)]))
+
+    def run(self, deadline):
+        # Every editor session starts by signing in
+        self.timed('login')
+        while time.monotonic() < deadline:
+            action = self.rng.choices(self.actions, self.weights)[0]
+            if self.token is None and action != 'public':
+                action = 'login'
+            self.timed(action)
+            if self.think_time:
+                time.sleep(self.rng.expovariate(1 / self.think_time))
+
+    def timed(self, action):
+        started = time.monotonic()
+        try:
+            getattr(self, action)()
+        except urllib.error.HTTPError as e:
+            self.samples.append(Sample(action, time.monotonic() - started, False, f'HTTP {e.code}'))
+        except (OSError, ValueError, KeyError, http.client.HTTPException) as e:
+            self.samples.append(Sample(action, time.monotonic() - started, False, repr(e)))
+        else:
+            self.samples.append(Sample(action, time.monotonic() - started, True))
+
+
+@dataclass
+class LoadTestReport:
+    clients: int
+    elapsed: float
+    actions: dict = field(default_factory=dict)
+
+    def as_dict(self):
+        return {'clients': self.clients, 'elapsed': self.elapsed, 'actions': self.actions}
+
+
+def summarize(samples, elapsed):
+    """Per-action (plus ``total``) throughput, latency percentiles (ms) and error rate"""
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample.action, []).append(sample)
+    groups['total'] = samples
+
+    summary = {}
+    for action, group in groups.items():
+        latencies = sorted(sample.seconds * 1000 for sample in group)
+        errors = [sample.error for sample in group if not sample.ok]
+        summary[action] = {
+            'requests': len(group),
+            'throughput': round(len(group) / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+            'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+            'errors': len(errors),
+            'error_rate': round(len(errors) / len(group), 4) if group else 0.0,
+            'error_samples': sorted(set(errors))[:MAX_REPORTED_ERRORS],
+        }
+    return summary
+
+
+def run_load_test(clients=10, duration=30.0, mix=None, base_url=None, think_time=0.0, seed=0):
+    """Drive ``clients`` concurrent virtual clients for ``duration`` seconds and return a LoadTestReport.
+
+    Without ``base_url`` the project is served by a threaded WSGI server in this process.
+    """
+    mix = mix or DEFAULT_MIX
+    accounts, slugs = load_accounts()
+    if not slugs and not any(weight > 0 for action, weight in mix.items() if action != 'public'):
+        raise LoadTestError('The mix only requests public pages, but no benchmark portfolio is published')
+    server = None
+    if base_url is None:
+        server, base_url = start_server()
+    try:
+        rng = random.Random(seed)
+        workers = [
+            VirtualClient(base_url, accounts[index % len(accounts)], slugs, mix, random.Random(rng.random()),
+                          think_time=think_time)
+            for index in range(clients)
+        ]
+        started = time.monotonic()
+        deadline = started + duration
+        threads = [
+            threading.Thread(target=worker.run, args=(deadline,), name=f'loadtest-client-{index}')
+            for index, worker in enumerate(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    samples = [sample for worker in workers for sample in worker.samples]
+    return LoadTestReport(clients=clients, elapsed=round(elapsed, 3), actions=summarize(samples, elapsed))
@@ -20,6 +20,14 @@ class Command(BaseCommand):
                 <h2>Projects</h2>
                 <div class="projects-grid">{{projects}}</div>
             </section>
+            <section class="skills">
+                <h2>Skills</h2>
+                <div class="skills-grid">{{skills}}</div>
+            </section>
+            <section class="experience">
+                <h2>Experience</h2>
+                <div class="experience-list">{{experience}}</div>
+            </section>
             <section class="contact">
                 <h2>Contact</h2>
                 <div class="contact-info">{{contact}}</div>
@@ -39,6 +47,11 @@ class Command(BaseCommand):
         .projects-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 2rem; }
         .project { background: white; padding: 1.5rem; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
         .contact-info { background: #ecf0f1; padding: 2rem; border-radius: 8px; }
+        .skills-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; }
+        .skill-bar { height: 8px; background: #ecf0f1; border-radius: 4px; margin-top: 0.25rem; }
+        .skill-progress { height: 100%; background: #3498db; border-radius: 4px; }
+        .experience { margin-bottom: 1.5rem; }
+        .duration { color: #7f8c8d; font-size: 0.9rem; }
         @media (max-width: 768px) { .hero h1 { font-size: 2rem; } .portfolio-container { padding: 1rem; } }
         """
 
@@ -50,6 +63,7 @@ class Command(BaseCommand):
                 <ul class="nav-links">
                     <li><a href="#about">About</a></li>
                     <li><a href="#experience">Experience</a></li>
+                    <li><a href="#skills">Skills</a></li>
                     <li><a href="#projects">Projects</a></li>
                     <li><a href="#contact">Contact</a></li>
                 </ul>
@@ -82,6 +96,12 @@ class Command(BaseCommand):
                     <div class="projects-showcase">{{projects}}</div>
                 </div>
             </section>
+            <section id="skills" class="section bg-light">
+                <div class="container">
+                    <h2>Skills</h2>
+                    <div class="skills-grid">{{skills}}</div>
+                </div>
+            </section>
             <footer id="contact" class="footer">
                 <div class="container">
                     <h2>Let's Connect</h2>
@@ -113,6 +133,9 @@ class Command(BaseCommand):
         h2 { font-size: 2.5rem; margin-bottom: 2rem; text-align: center; color: #2c3e50; }
         .projects-showcase { display: grid; grid-template-columns: repeat(auto-fit, minmax(350px, 1fr)); gap: 2rem; }
         .footer { background: #2c3e50; color: white; padding: 3rem 0; }
+        .skills-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 1.5rem; }
+        .skill-bar { height: 8px; background: #e1e5e9; border-radius: 4px; margin-top: 0.5rem; }
+        .skill-progress { height: 100%; background: linear-gradient(90deg, #667eea, #764ba2); border-radius: 4px; }
         @media (max-width: 768px) { .hero-content h1 { font-size: 2.5rem; } .hero-cta { flex-direction: column; align-items: center; } }
         """
 
@@ -129,6 +152,8 @@ class Command(BaseCommand):
                     <a href="#home">Home</a>
                     <a href="#about">About</a>
                     <a href="#portfolio">Portfolio</a>
+                    <a href="#skills">Skills</a>
+                    <a href="#experience">Experience</a>
                     <a href="#contact">Contact</a>
                 </nav>
             </div>
@@ -143,6 +168,14 @@ class Command(BaseCommand):
                     <h2>My Work</h2>
                     <div class="creative-grid">{{projects}}</div>
                 </section>
+                <section id="skills" class="section">
+                    <h2>Skills</h2>
+                    <div class="skills-grid">{{skills}}</div>
+                </section>
+                <section id="experience" class="section">
+                    <h2>Experience</h2>
+                    <div class="experience-list">{{experience}}</div>
+                </section>
                 <section id="contact" class="section">
                     <h2>Get In Touch</h2>
                     <div class="contact-creative">{{contact}}</div>
@@ -169,6 +202,10 @@ class Command(BaseCommand):
         .creative-grid .project { background: #2a2a2a; padding: 2rem; border-radius: 15px; transform: rotate(-2deg); transition: all 0.3s; }
         .creative-grid .project:nth-child(even) { transform: rotate(2deg); }
         .creative-grid .project:hover { transform: rotate(0deg) scale(1.05); }
+        .skills-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1.5rem; }
+        .skill-bar { height: 8px; background: #2a2a2a; border-radius: 4px; margin-top: 0.5rem; }
+        .skill-progress { height: 100%; background: linear-gradient(45deg, #ff6b6b, #feca57); border-radius: 4px; }
+        .experience { background: #2a2a2a; padding: 1.5rem; border-radius: 15px; margin-bottom: 1.5rem; }
         @media (max-width: 768px) { .sidebar { width: 100%; position: relative; height: auto; } .main-content { margin-left: 0; } }
         """
 
@@ -0,0 +1,42 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfoliobuilder.models import Portfolio
+from portfoliobuilder.resume_import import (
+    IMPORT_BATCH_SIZE, IMPORT_FORMATS, ImportFormatError, guess_format, import_resume,
+)
+
+
+class Command(BaseCommand):
+    help = 'Import projects, skills and experiences into a portfolio from a resume file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('portfolio_id', type=int)
+        parser.add_argument('path', help='JSON Resume, LinkedIn export CSV or JSON lines file')
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help='File format; guessed from the extension by default')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Rows written per bulk insert')
+
+    def handle(self, *args, **options):
+        try:
+            portfolio = Portfolio.objects.get(pk=options['portfolio_id'])
+        except Portfolio.DoesNotExist:
+            raise CommandError(f"Portfolio {options['portfolio_id']} does not exist")
+        file_format = options['format'] or guess_format(options['path'])
+
+        try:
+            with open(options['path'], 'rb') as f:
+                report = import_resume(portfolio, f, file_format, batch_size=options['batch_size'])
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        for error in report.errors:
+            self.stderr.write(self.style.ERROR(f"{error['record']}: {json.dumps(error['errors'])}"))
+        created = ', '.join(f'{count} {section}' for section, count in report.created.items())
+        message = f'Imported {created} into "{portfolio.title}"'
+        if report.error_count:
+            self.stdout.write(self.style.WARNING(f'{message}; {report.error_count} records skipped'))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfoliobuilder.loadtest import DEFAULT_MIX, LoadTestError, parse_mix, run_load_test
+
+
+class Command(BaseCommand):
+    help = 'Replay a mix of concurrent editor and viewer traffic and report latency and errors per action'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=10,
+                            help='Concurrent virtual clients (threads)')
+        parser.add_argument('--duration', type=float, default=30,
+                            help='Seconds to run for')
+        parser.add_argument('--mix', default=','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items()),
+                            help='Relative action weights, e.g. "dashboard=30,autosave=20,public=50"')
+        parser.add_argument('--url',
+                            help='Base URL of a running server; by default a threaded WSGI server is started here')
+        parser.add_argument('--think-time', type=float, default=0,
+                            help='Mean pause in seconds between a client\'s requests')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed for the request mix')
+        parser.add_argument('--output',
+                            help='Also write the report to this JSON file')
+
+    def handle(self, *args, **options):
+        try:
+            report = run_load_test(
+                clients=options['clients'],
+                duration=options['duration'],
+                mix=parse_mix(options['mix']),
+                base_url=options['url'],
+                think_time=options['think_time'],
+                seed=options['seed'],
+            )
+        except LoadTestError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{report.clients} clients for {report.elapsed:.1f}s")
+        self.stdout.write(
+            f"{'action':<12}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>10}"
+        )
+        for action, row in report.actions.items():
+            if not row['requests']:
+                continue
+            self.stdout.write(
+                f"{action:<12}{row['requests']:>10}{row['throughput']:>10.1f}{row['p50_ms']:>10.1f}"
+                f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['error_rate']:>10.1%}"
+            )
+            for error in row['error_samples']:
+                self.stderr.write(self.style.ERROR(f'  {action}: {error}'))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report.as_dict(), f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Saved report to {options['output']}"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from portfoliobuilder.publishing import published_portfolios
+from portfoliobuilder.static_site import StaticSitePublisher, get_static_root
+
+
+class Command(BaseCommand):
+    help = 'Write every published portfolio to a static directory tree with a manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', help='Output directory (defaults to PORTFOLIO_STATIC_ROOT)')
+        parser.add_argument(
+            '--no-prune', action='store_true',
+            help='Keep pages and assets that are no longer referenced',
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Rewrite every page, including those unchanged since the last build',
+        )
+
+    def handle(self, *args, **options):
+        root = options['root'] or get_static_root()
+        if not root:
+            raise CommandError('Pass --root or set PORTFOLIO_STATIC_ROOT')
+
+        publisher = StaticSitePublisher(root)
+        manifest, written = publisher.build(
+            published_portfolios().iterator(chunk_size=200),
+            prune=not options['no_prune'],
+            force=options['force'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Published {len(manifest['portfolios'])} portfolios ({written} written, "
+            f"{len(manifest['portfolios']) - written} unchanged) "
+            f"with {len(manifest['assets'])} shared assets to {root}"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from portfoliobuilder.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents of every published portfolio'
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} published portfolios'))
@@ -0,0 +1,58 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from portfoliobuilder.models import Portfolio
+from portfoliobuilder.render_pool import rerender_portfolios
+
+
+class Command(BaseCommand):
+    help = 'Re-render portfolios in parallel (e.g. after a template change)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', type=int, action='append', dest='templates',
+                            help='Only portfolios using this template id (repeatable)')
+        parser.add_argument('--published-only', action='store_true',
+                            help='Skip unpublished portfolios')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Worker processes; 0 renders in this process')
+        parser.add_argument('--chunk-size', type=int, default=100,
+                            help='Portfolios fetched and rendered per task')
+        parser.add_argument('--state-file', default=os.path.join(settings.BASE_DIR, '.rerender-state.json'),
+                            help='Checkpoint file used to resume an interrupted run')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip portfolios rendered by a previous interrupted or partly failed run')
+
+    def handle(self, *args, **options):
+        portfolios = Portfolio.objects.all()
+        if options['templates']:
+            portfolios = portfolios.filter(template_id__in=options['templates'])
+        if options['published_only']:
+            portfolios = portfolios.filter(is_published=True)
+
+        def progress(report):
+            done = report.rendered + len(report.failed) + report.skipped
+            self.stdout.write(
+                f'{done}/{report.total} portfolios, {report.throughput:.1f} renders/s'
+            )
+
+        report = rerender_portfolios(
+            portfolios,
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            state_path=options['state_file'],
+            resume=options['resume'],
+            progress=progress,
+        )
+
+        for portfolio_id, error in report.failed.items():
+            self.stderr.write(self.style.ERROR(f'Portfolio {portfolio_id}: {error}'))
+        message = (
+            f'Rendered {report.rendered} of {report.total} portfolios '
+            f'({report.skipped} resumed) in {report.elapsed:.2f}s, {report.throughput:.1f} renders/s'
+        )
+        if report.failed:
+            self.stdout.write(self.style.WARNING(f'{message}; {len(report.failed)} failed, run again with --resume'))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
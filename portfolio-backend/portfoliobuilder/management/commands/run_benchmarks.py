@@ -0,0 +1,74 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from portfoliobuilder.benchmarks import BenchmarkError, compare_results, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the renderer, serializers and API endpoints on the seed_benchmark_data data set'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20,
+                            help='Timed iterations per benchmark')
+        parser.add_argument('--warmup', type=int, default=3,
+                            help='Untimed iterations run first to warm caches')
+        parser.add_argument('--only', action='append',
+                            help='Only benchmarks whose name starts with this prefix (repeatable)')
+        parser.add_argument('--output',
+                            help='Results file; defaults to a timestamped file in benchmark_results/')
+        parser.add_argument('--compare', metavar='BASELINE',
+                            help='Results file of an earlier run to compare against')
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help='p50 slowdown (fraction) reported as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error when a benchmark regressed')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline: {e}')
+
+        def progress(name, result):
+            self.stdout.write(
+                f"{name:<50} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+                f"p99 {result['p99_ms']:>9.2f}ms  {result['queries']:>3} queries"
+            )
+
+        try:
+            results = run_benchmarks(
+                iterations=options['iterations'], warmup=options['warmup'], only=options['only'], progress=progress,
+            )
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmark_results', f"{results['meta']['created_at'].replace(':', '')}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Saved {len(results["results"])} results to {output}'))
+
+        if baseline is None:
+            return
+        rows = compare_results(baseline, results, options['threshold'])
+        for row in rows:
+            line = (
+                f"{row['name']:<50} {row['baseline_p50_ms']:>9.2f}ms -> {row['p50_ms']:>9.2f}ms "
+                f"({row['change']:+.1%})  queries {row['baseline_queries']} -> {row['queries']}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row['regressed'] else line)
+        regressed = [row['name'] for row in rows if row['regressed']]
+        if regressed and options['fail_on_regression']:
+            raise CommandError(f'{len(regressed)} benchmarks regressed: {", ".join(regressed)}')
+        if regressed:
+            self.stdout.write(self.style.WARNING(f'{len(regressed)} benchmarks regressed'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No regressions'))
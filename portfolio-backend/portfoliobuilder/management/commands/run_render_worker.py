@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from portfoliobuilder.jobs import MAINTENANCE_INTERVAL, claim_next_job, default_worker_name, run_job, run_maintenance
+
+
+class Command(BaseCommand):
+    help = 'Process queued export and render jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs (0 = no limit)')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when idle')
+        parser.add_argument('--name', default=None, help='Worker name recorded on claimed jobs')
+
+    def handle(self, *args, **options):
+        worker_name = options['name'] or default_worker_name()
+        processed = 0
+        self.stdout.write(f'Render worker {worker_name} started')
+        next_maintenance = 0
+
+        try:
+            while not options['max_jobs'] or processed < options['max_jobs']:
+                close_old_connections()
+                if time.monotonic() >= next_maintenance:
+                    self.maintain()
+                    next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+                job = claim_next_job(worker_name)
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                started = time.monotonic()
+                run_job(job)
+                processed += 1
+                elapsed = time.monotonic() - started
+                if job.status == job.STATUS_SUCCEEDED:
+                    self.stdout.write(self.style.SUCCESS(f'{job.kind} job {job.pk} finished in {elapsed:.2f}s'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'{job.kind} job {job.pk} failed: {job.error}'))
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Render worker {worker_name} processed {processed} jobs')
+
+    def maintain(self):
+        """Requeue jobs of crashed workers and delete expired results, at start and then periodically"""
+        requeued, purged = run_maintenance()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale jobs'))
+        if purged:
+            self.stdout.write(f'Deleted {purged} expired job results')
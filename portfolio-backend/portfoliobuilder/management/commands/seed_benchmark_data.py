@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from portfoliobuilder.benchmarks import PUBLISHED_RATIO, clear_benchmark_data, seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = 'Replace the benchmark users and portfolios with a freshly generated synthetic data set'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50,
+                            help='Benchmark users to create; each gets one or more portfolios')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed; the same seed always generates the same data')
+        parser.add_argument('--published-ratio', type=float, default=PUBLISHED_RATIO,
+                            help='Share of portfolios that are published')
+        parser.add_argument('--clear', action='store_true',
+                            help='Only delete the benchmark data')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            count = clear_benchmark_data()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {count} benchmark users and their portfolios'))
+            return
+
+        counts = seed_benchmark_data(
+            users=options['users'], seed=options['seed'], published_ratio=options['published_ratio'],
+        )
+        created = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Created {created}'))
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_technologies(apps, schema_editor):
+    """Split every existing technology_stack into Technology/ProjectTechnology rows"""
+    Project = apps.get_model('portfoliobuilder', 'Project')
+    Technology = apps.get_model('portfoliobuilder', 'Technology')
+    ProjectTechnology = apps.get_model('portfoliobuilder', 'ProjectTechnology')
+    technology_ids = {}
+
+    def flush(stacks):
+        names = {}
+        for stack in stacks.values():
+            for normalized, name in stack:
+                if normalized not in technology_ids:
+                    names.setdefault(normalized, name)
+        if names:
+            Technology.objects.bulk_create(
+                [Technology(normalized_name=normalized, name=name) for normalized, name in names.items()],
+                ignore_conflicts=True,
+            )
+            technology_ids.update(
+                Technology.objects.filter(normalized_name__in=names).values_list('normalized_name', 'id')
+            )
+        ProjectTechnology.objects.bulk_create([
+            ProjectTechnology(project_id=project_id, technology_id=technology_ids[normalized], position=position)
+            for project_id, stack in stacks.items()
+            for position, (normalized, _) in enumerate(stack)
+        ])
+
+    stacks = {}
+    for project_id, technology_stack in Project.objects.values_list('id', 'technology_stack').iterator():
+        seen = {}
+        for part in (technology_stack or '').split(','):
+            name = ' '.join(part.split())[:100]
+            if name:
+                seen.setdefault(name.lower(), name)
+        stacks[project_id] = list(seen.items())
+        if len(stacks) >= BACKFILL_BATCH_SIZE:
+            flush(stacks)
+            stacks = {}
+    if stacks:
+        flush(stacks)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfoliobuilder', '0003_renderjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Technology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('normalized_name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'technologies',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='technology_links', to='portfoliobuilder.project')),
+                ('technology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_links', to='portfoliobuilder.technology')),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='technologies',
+            field=models.ManyToManyField(blank=True, related_name='projects', through='portfoliobuilder.ProjectTechnology', to='portfoliobuilder.technology'),
+        ),
+        migrations.AddConstraint(
+            model_name='projecttechnology',
+            constraint=models.UniqueConstraint(fields=('technology', 'project'), name='projecttech_tech_project_uniq'),
+        ),
+        migrations.RunPython(backfill_technologies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+COLUMNS = ('title', 'hero', 'about', 'projects', 'skills', 'experience')
+
+SQLITE_FORWARD = [
+    # External-content FTS5 table over portfoliobuilder_searchdocument, kept in step by triggers
+    """CREATE VIRTUAL TABLE portfoliobuilder_search_fts USING fts5(
+        {columns}, content='portfoliobuilder_searchdocument', content_rowid='portfolio_id',
+        tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER portfoliobuilder_search_ai AFTER INSERT ON portfoliobuilder_searchdocument BEGIN
+        INSERT INTO portfoliobuilder_search_fts(rowid, {columns}) VALUES (new.portfolio_id, {new});
+    END""",
+    """CREATE TRIGGER portfoliobuilder_search_ad AFTER DELETE ON portfoliobuilder_searchdocument BEGIN
+        INSERT INTO portfoliobuilder_search_fts(portfoliobuilder_search_fts, rowid, {columns})
+        VALUES ('delete', old.portfolio_id, {old});
+    END""",
+    """CREATE TRIGGER portfoliobuilder_search_au AFTER UPDATE ON portfoliobuilder_searchdocument BEGIN
+        INSERT INTO portfoliobuilder_search_fts(portfoliobuilder_search_fts, rowid, {columns})
+        VALUES ('delete', old.portfolio_id, {old});
+        INSERT INTO portfoliobuilder_search_fts(rowid, {columns}) VALUES (new.portfolio_id, {new});
+    END""",
+]
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS portfoliobuilder_search_au',
+    'DROP TRIGGER IF EXISTS portfoliobuilder_search_ad',
+    'DROP TRIGGER IF EXISTS portfoliobuilder_search_ai',
+    'DROP TABLE IF EXISTS portfoliobuilder_search_fts',
+]
+
+POSTGRES_FORWARD = [
+    """ALTER TABLE portfoliobuilder_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(hero, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(skills, '') || ' ' || coalesce(projects, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(experience, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(about, '')), 'D')
+    ) STORED""",
+    'CREATE INDEX portfoliobuilder_search_vector_idx ON portfoliobuilder_searchdocument USING GIN (search_vector)',
+]
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS portfoliobuilder_search_vector_idx',
+    'ALTER TABLE portfoliobuilder_searchdocument DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def _run(schema_editor, statements):
+    columns = ', '.join(COLUMNS)
+    for statement in statements:
+        schema_editor.execute(statement.format(
+            columns=columns,
+            new=', '.join(f'new.{column}' for column in COLUMNS),
+            old=', '.join(f'old.{column}' for column in COLUMNS),
+        ))
+
+
+def create_search_index(apps, schema_editor):
+    """Vendor-specific full-text index; other databases fall back to LIKE search"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+        _run(schema_editor, SQLITE_FORWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_REVERSE)
+
+
+def backfill_search_documents(apps, schema_editor):
+    """Index every published portfolio"""
+    Portfolio = apps.get_model('portfoliobuilder', 'Portfolio')
+    SearchDocument = apps.get_model('portfoliobuilder', 'SearchDocument')
+    portfolios = Portfolio.objects.filter(is_published=True).prefetch_related('projects', 'skills', 'experiences')
+    documents = []
+    for portfolio in portfolios.iterator(chunk_size=500):
+        documents.append(SearchDocument(
+            portfolio_id=portfolio.pk,
+            title=portfolio.title,
+            hero=f'{portfolio.hero_title}\n{portfolio.hero_subtitle}',
+            about=portfolio.about_content,
+            projects='\n'.join(
+                f'{project.title}\n{project.description}\n{project.technology_stack}'
+                for project in portfolio.projects.all()
+            ),
+            skills='\n'.join(skill.name for skill in portfolio.skills.all()),
+            experience='\n'.join(
+                f'{experience.position}\n{experience.company}\n{experience.description}'
+                for experience in portfolio.experiences.all()
+            ),
+        ))
+        if len(documents) >= 500:
+            SearchDocument.objects.bulk_create(documents)
+            documents = []
+    SearchDocument.objects.bulk_create(documents)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfoliobuilder', '0004_technology_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('portfolio', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='portfoliobuilder.portfolio')),
+                ('title', models.TextField(blank=True)),
+                ('hero', models.TextField(blank=True)),
+                ('about', models.TextField(blank=True)),
+                ('projects', models.TextField(blank=True)),
+                ('skills', models.TextField(blank=True)),
+                ('experience', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfoliobuilder', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['portfolio', 'start_date'], name='experience_portfolio_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='portfolio',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='portfolio_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='portfolio',
+            index=models.Index(fields=['user', 'is_published'], name='portfolio_user_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='portfolio',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['updated_at', 'id'], name='portfolio_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['portfolio', 'order', '-created_at', '-id'], name='project_portfolio_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['portfolio', 'category', 'order'], name='skill_portfolio_order_idx'),
+        ),
+    ]
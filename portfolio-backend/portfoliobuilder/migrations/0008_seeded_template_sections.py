@@ -0,0 +1,111 @@
+from django.db import migrations
+
+# Templates seeded by create_templates before layouts were rendered from
+# html_content lacked the skills (and mostly the experience) placeholders, so
+# their exports silently dropped those sections. Insert the sections the
+# command now seeds; layouts that were edited away from these anchors, or
+# already use {{skills}}, are left alone.
+SEEDED_SECTIONS = {
+    'Minimal Clean': {
+        'html': [
+            (
+                '            <section class="contact">\n',
+                '            <section class="skills">\n'
+                '                <h2>Skills</h2>\n'
+                '                <div class="skills-grid">{{skills}}</div>\n'
+                '            </section>\n'
+                '            <section class="experience">\n'
+                '                <h2>Experience</h2>\n'
+                '                <div class="experience-list">{{experience}}</div>\n'
+                '            </section>\n'
+                '            <section class="contact">\n',
+            ),
+        ],
+        'css': (
+            '        .skills-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; }\n'
+            '        .skill-bar { height: 8px; background: #ecf0f1; border-radius: 4px; margin-top: 0.25rem; }\n'
+            '        .skill-progress { height: 100%; background: #3498db; border-radius: 4px; }\n'
+            '        .experience { margin-bottom: 1.5rem; }\n'
+            '        .duration { color: #7f8c8d; font-size: 0.9rem; }\n'
+        ),
+    },
+    'Professional Business': {
+        'html': [
+            (
+                '                    <li><a href="#experience">Experience</a></li>\n',
+                '                    <li><a href="#experience">Experience</a></li>\n'
+                '                    <li><a href="#skills">Skills</a></li>\n',
+            ),
+            (
+                '            <footer id="contact" class="footer">\n',
+                '            <section id="skills" class="section bg-light">\n'
+                '                <div class="container">\n'
+                '                    <h2>Skills</h2>\n'
+                '                    <div class="skills-grid">{{skills}}</div>\n'
+                '                </div>\n'
+                '            </section>\n'
+                '            <footer id="contact" class="footer">\n',
+            ),
+        ],
+        'css': (
+            '        .skills-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 1.5rem; }\n'
+            '        .skill-bar { height: 8px; background: #e1e5e9; border-radius: 4px; margin-top: 0.5rem; }\n'
+            '        .skill-progress { height: 100%; background: linear-gradient(90deg, #667eea, #764ba2); border-radius: 4px; }\n'
+        ),
+    },
+    'Creative Showcase': {
+        'html': [
+            (
+                '                    <a href="#portfolio">Portfolio</a>\n',
+                '                    <a href="#portfolio">Portfolio</a>\n'
+                '                    <a href="#skills">Skills</a>\n'
+                '                    <a href="#experience">Experience</a>\n',
+            ),
+            (
+                '                <section id="contact" class="section">\n',
+                '                <section id="skills" class="section">\n'
+                '                    <h2>Skills</h2>\n'
+                '                    <div class="skills-grid">{{skills}}</div>\n'
+                '                </section>\n'
+                '                <section id="experience" class="section">\n'
+                '                    <h2>Experience</h2>\n'
+                '                    <div class="experience-list">{{experience}}</div>\n'
+                '                </section>\n'
+                '                <section id="contact" class="section">\n',
+            ),
+        ],
+        'css': (
+            '        .skills-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1.5rem; }\n'
+            '        .skill-bar { height: 8px; background: #2a2a2a; border-radius: 4px; margin-top: 0.5rem; }\n'
+            '        .skill-progress { height: 100%; background: linear-gradient(45deg, #ff6b6b, #feca57); border-radius: 4px; }\n'
+            '        .experience { background: #2a2a2a; padding: 1.5rem; border-radius: 15px; margin-bottom: 1.5rem; }\n'
+        ),
+    },
+}
+
+
+def add_seeded_sections(apps, schema_editor):
+    Template = apps.get_model('portfoliobuilder', 'Template')
+    for template in Template.objects.filter(name__in=SEEDED_SECTIONS):
+        sections = SEEDED_SECTIONS[template.name]
+        if '{{skills}}' in template.html_content:
+            continue
+        if not all(template.html_content.count(anchor) == 1 for anchor, _ in sections['html']):
+            continue
+        for anchor, replacement in sections['html']:
+            template.html_content = template.html_content.replace(anchor, replacement)
+        if '.skill-bar' not in template.css_content:
+            template.css_content = template.css_content.rstrip(' ') + sections['css']
+        # auto_now bumps updated_at, which retires compiled layouts and cached renders
+        template.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfoliobuilder', '0007_signed_token_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_seeded_sections, migrations.RunPython.noop),
+    ]
@@ -14,6 +14,21 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
+class SignedTokenUser(User):
+    """Read-only user rebuilt from a signed token (see authentication.SignedTokenAuthentication).
+
+    It carries only the fields in the token, so writing it back would blank the
+    rest of the row; load the User from the database to change it.
+    """
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        raise TypeError("Users from signed tokens are read-only; load the User to save it.")
+
+    def delete(self, *args, **kwargs):
+        raise TypeError("Users from signed tokens are read-only; load the User to delete it.")
+
 class Template(models.Model):
     """Portfolio templates that users can choose from"""
     TEMPLATE_TYPES = [
@@ -34,6 +49,7 @@ class Template(models.Model):
     preview_image = models.CharField(max_length=500, blank=True)  # URL to preview image
     is_premium = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Version stamp for compiled template caches
     
     def __str__(self):
         return f"{self.name} ({self.template_type})"
@@ -63,6 +79,19 @@ class Portfolio(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # A user's portfolios newest first (portfolios list keyset ordering)
+            models.Index(fields=['user', 'updated_at', 'id'], name='portfolio_user_updated_idx'),
+            # A user's published / draft portfolios
+            models.Index(fields=['user', 'is_published'], name='portfolio_user_published_idx'),
+            # Published portfolios newest first (publishing, technology pages, search results).
+            # Partial, because filter(is_published=True) compiles to a bare boolean column test.
+            models.Index(
+                fields=['updated_at', 'id'], condition=models.Q(is_published=True), name='portfolio_published_idx'
+            ),
+        ]
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = f"{self.user.username}-{uuid.uuid4().hex[:8]}"
@@ -83,13 +112,46 @@ class Project(models.Model):
     order = models.PositiveIntegerField(default=0)  # For ordering projects
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Normalized index of technology_stack, kept in sync by the technologies module
+    technologies = models.ManyToManyField('Technology', through='ProjectTechnology', related_name='projects', blank=True)
     
     class Meta:
         ordering = ['order', '-created_at']
+        indexes = [
+            models.Index(fields=['portfolio', 'order', '-created_at', '-id'], name='project_portfolio_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.portfolio.title}"
 
+class Technology(models.Model):
+    """A technology named in at least one project's technology stack"""
+    name = models.CharField(max_length=100)  # Display name as first written
+    normalized_name = models.CharField(max_length=100, unique=True)  # Lowercased lookup key
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = 'technologies'
+    
+    def __str__(self):
+        return self.name
+
+class ProjectTechnology(models.Model):
+    """Link between a project and one technology of its stack"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='technology_links')
+    technology = models.ForeignKey(Technology, on_delete=models.CASCADE, related_name='project_links')
+    position = models.PositiveIntegerField(default=0)  # Position within technology_stack
+    
+    class Meta:
+        ordering = ['position']
+        constraints = [
+            # Leads with technology so "projects using X" is an index range scan
+            models.UniqueConstraint(fields=['technology', 'project'], name='projecttech_tech_project_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.technology} in {self.project_id}"
+
 class Skill(models.Model):
     """Skills section for portfolios"""
     SKILL_CATEGORIES = [
@@ -109,6 +171,9 @@ class Skill(models.Model):
     
     class Meta:
         ordering = ['category', 'order']
+        indexes = [
+            models.Index(fields=['portfolio', 'category', 'order'], name='skill_portfolio_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.proficiency}%)"
@@ -128,6 +193,70 @@ class Experience(models.Model):
     
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['portfolio', 'start_date'], name='experience_portfolio_start_idx'),
+        ]
     
     def __str__(self):
         return f"{self.position} at {self.company}"
+
+class SearchDocument(models.Model):
+    """Searchable text of a published portfolio, indexed by FTS5 (SQLite) or tsvector (Postgres)"""
+    portfolio = models.OneToOneField(Portfolio, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    title = models.TextField(blank=True)
+    hero = models.TextField(blank=True)  # hero_title and hero_subtitle
+    about = models.TextField(blank=True)
+    projects = models.TextField(blank=True)  # Project titles, descriptions and stacks
+    skills = models.TextField(blank=True)
+    experience = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Search document for portfolio {self.portfolio_id}"
+
+class RenderJob(models.Model):
+    """Export or render work queued for the run_render_worker command"""
+    KIND_CHOICES = [
+        ('export', 'Single portfolio export'),
+        ('archive', 'Multi-portfolio ZIP export'),
+        ('rerender', 'Re-render portfolios'),
+    ]
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='render_jobs', null=True, blank=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    payload = models.JSONField(default=dict, blank=True)
+    result_path = models.CharField(max_length=500, blank=True)  # Relative to PORTFOLIO_JOB_RESULT_ROOT
+    result_content_type = models.CharField(max_length=100, blank=True)
+    result_filename = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            # Workers poll for the oldest queued job
+            models.Index(fields=['status', 'created_at'], name='renderjob_status_created_idx'),
+        ]
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    def __str__(self):
+        return f"{self.kind} job {self.id} ({self.status})"
@@ -0,0 +1,135 @@
+"""
+Keyset (cursor) pagination and streamed JSON lists.
+
+List endpoints stay unpaginated by default for existing clients. Passing
+?page_size= or ?cursor= switches to keyset pagination: pages are filtered with
+a row comparison on the ordering columns instead of OFFSET, so every page costs
+the same regardless of depth. Passing ?stream=1 writes the whole list row by row
+from QuerySet.iterator() instead of building it in memory.
+"""
+import base64
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
+
+# Keyset orderings; the trailing primary key makes every position unique.
+PORTFOLIO_ORDERING = ('-updated_at', '-id')
+PROJECT_ORDERING = ('order', '-created_at', '-id')
+TEMPLATE_ORDERING = ('id',)
+
+
+class KeysetPagination:
+    """Paginates a queryset by remembering the ordering values of the last row"""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    default_page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+        self.next_position = None
+
+    @classmethod
+    def is_requested(cls, request):
+        params = request.query_params
+        return cls.cursor_query_param in params or cls.page_size_query_param in params
+
+    def _columns(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.default_page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, position):
+        payload = json.dumps(position, cls=JSONEncoder).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def decode_cursor(self, model, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self._columns(), values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def position_filter(self, position):
+        """Q matching rows strictly after ``position`` in the keyset ordering"""
+        clauses = []
+        columns = self._columns()
+        for index, (name, descending) in enumerate(columns):
+            equal = [Q(**{column: value}) for (column, _), value in zip(columns[:index], position)]
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            clauses.append(reduce(and_, equal + [Q(**{lookup: position[index]})]))
+        return reduce(or_, clauses)
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.position_filter(self.decode_cursor(queryset.model, cursor)))
+        page_size = self.get_page_size(request)
+        rows = list(queryset[:page_size + 1])
+        page = rows[:page_size]
+        if len(rows) > page_size:
+            last = page[-1]
+            self.next_position = [getattr(last, name) for name, _ in self._columns()]
+        return page
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+def is_stream_requested(request):
+    return request.query_params.get('stream') in ('1', 'true')
+
+
+def stream_json_list(serializer, queryset, chunk_size=500):
+    """Stream ``queryset`` as a JSON array, serializing one row at a time"""
+    def rows():
+        yield '['
+        for index, instance in enumerate(queryset.iterator(chunk_size=chunk_size)):
+            if index:
+                yield ','
+            yield json.dumps(serializer.to_representation(instance), cls=JSONEncoder)
+        yield ']'
+
+    return StreamingHttpResponse(rows(), content_type='application/json')
+
+
+def list_response(request, queryset, serializer_class, ordering, context=None):
+    """Respond with ``queryset`` as a plain, keyset-paginated or streamed JSON list"""
+    context = context if context is not None else {'request': request}
+    if is_stream_requested(request):
+        return stream_json_list(serializer_class(context=context), queryset.order_by(*ordering))
+    if KeysetPagination.is_requested(request):
+        paginator = KeysetPagination(ordering)
+        page = paginator.paginate_queryset(queryset, request)
+        serializer = serializer_class(page, many=True, context=context)
+        return paginator.get_paginated_response(serializer.data)
+    serializer = serializer_class(queryset, many=True, context=context)
+    return Response(serializer.data)
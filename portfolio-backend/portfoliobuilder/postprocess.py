@@ -0,0 +1,94 @@
+"""
+Export post-processing: HTML/CSS minification and pre-compressed variants.
+
+Minification is deliberately conservative: whitespace runs are collapsed to a
+single space rather than removed, so inline layout is unchanged, and the
+contents of <pre>, <textarea> and <script> are left alone. Brotli output needs
+the optional ``brotli`` package; without it only gzip variants are produced.
+"""
+import gzip
+import re
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+PROTECTED_BLOCK_RE = re.compile(
+    r'(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)', re.IGNORECASE | re.DOTALL
+)
+HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+WHITESPACE_RE = re.compile(r'\s+')
+CSS_STRING_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+CSS_COLON_RE = re.compile(r':\s+')
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    chunks = CSS_STRING_RE.split(css)
+    for index in range(0, len(chunks), 2):  # even chunks are outside string literals
+        chunk = CSS_COMMENT_RE.sub('', chunks[index])
+        chunk = WHITESPACE_RE.sub(' ', chunk)
+        chunk = CSS_PUNCTUATION_RE.sub(r'\1', chunk)
+        chunks[index] = CSS_COLON_RE.sub(':', chunk).replace(';}', '}')
+    return ''.join(chunks).strip()
+
+
+def _collapse(html):
+    return WHITESPACE_RE.sub(' ', HTML_COMMENT_RE.sub('', html))
+
+
+def minify_html(html):
+    """Collapse whitespace and comments in markup, minifying inline <style> blocks"""
+    output = []
+    position = 0
+    for match in PROTECTED_BLOCK_RE.finditer(html):
+        output.append(_collapse(html[position:match.start()]))
+        opening, tag, content, closing = match.groups()
+        if tag.lower() == 'style':
+            content = minify_css(content)
+        elif tag.lower() == 'script':
+            content = content.strip()
+        output.append(f'{opening}{content}{closing}')
+        position = match.end()
+    output.append(_collapse(html[position:]))
+    return ''.join(output).strip()
+
+
+def gzip_compress(data, level=9):
+    # mtime=0 keeps the output deterministic so identical renders share cache entries
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def brotli_compress(data, level=11):
+    return brotli.compress(data, quality=level)
+
+
+# Content-Encoding -> compressor, in order of preference
+ENCODINGS = {'br': brotli_compress, 'gzip': gzip_compress} if brotli else {'gzip': gzip_compress}
+# Content-Encoding -> level cheap enough to run after every save or inside a
+# request; background work keeps each compressor's maximum (its default level)
+FAST_LEVELS = {'br': 5, 'gzip': 6}
+
+
+def compress(data, encoding, fast=False):
+    if fast:
+        return ENCODINGS[encoding](data, FAST_LEVELS[encoding])
+    return ENCODINGS[encoding](data)
+
+
+def choose_encoding(accept_encoding):
+    """Pick the preferred available encoding allowed by an Accept-Encoding header"""
+    accepted = set()
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q=') and quality[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+            continue
+        accepted.add(name.strip().lower())
+    for encoding in ENCODINGS:
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
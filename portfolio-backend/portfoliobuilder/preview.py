@@ -0,0 +1,65 @@
+"""
+Live preview of unsaved portfolio edits.
+
+The editor posts a partial patch of Portfolio fields together with the hashes of
+the sections it already shows. The patch is applied to the instance in memory
+only, and just the sections whose HTML differs from those hashes are returned.
+Row-backed sections (projects, skills, experience) are identified by the digest
+of their rows and come from the section cache, so an unchanged one is neither
+rendered nor hashed.
+"""
+import hashlib
+
+from .render_cache import load_sections, render_sections
+from .rendering import PLACEHOLDERS, ROW_SECTIONS, get_compiled_template, render_portfolio
+
+# Content the outer document (rendering.DOCUMENT) adds around the layout,
+# previewed next to the layout placeholders
+DOCUMENT_SECTIONS = {
+    'title': PLACEHOLDERS['title'],
+    'custom_html': lambda portfolio: portfolio.custom_html,
+    'custom_css': lambda portfolio: portfolio.custom_css,
+}
+HASH_LENGTH = 16
+
+
+def section_hash(html):
+    return hashlib.sha256(html.encode()).hexdigest()[:HASH_LENGTH]
+
+
+def apply_patch(portfolio, patch):
+    """Apply validated field values to ``portfolio`` without saving it"""
+    for field, value in patch.items():
+        setattr(portfolio, field, value)
+    return portfolio
+
+
+def preview_sections(portfolio, known=None):
+    """Return ``{name: {'hash', 'html'}}`` for every section whose hash is not in ``known``"""
+    known = known or {}
+    placeholders = get_compiled_template(portfolio.template).placeholders
+    changed = {}
+
+    row_names = placeholders & ROW_SECTIONS.keys()
+    rows = load_sections(portfolio, {ROW_SECTIONS[name][0] for name in row_names})
+    stale = {}
+    for name in row_names:
+        digest = rows[ROW_SECTIONS[name][0]][1][:HASH_LENGTH]
+        if known.get(name) != digest:
+            stale[name] = digest
+    for name, html in render_sections(portfolio, rows, stale).items():
+        changed[name] = {'hash': stale[name], 'html': html}
+
+    renderers = {name: PLACEHOLDERS[name] for name in placeholders - row_names if name in PLACEHOLDERS}
+    renderers.update(DOCUMENT_SECTIONS)
+    for name, renderer in renderers.items():
+        html = renderer(portfolio)
+        digest = section_hash(html)
+        if known.get(name) != digest:
+            changed[name] = {'hash': digest, 'html': html}
+    return changed
+
+
+def preview_document(portfolio):
+    """Full preview document for ``portfolio`` as patched; never read from or stored in the render cache"""
+    return render_portfolio(portfolio, sections=render_sections(portfolio))
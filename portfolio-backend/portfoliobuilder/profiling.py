@@ -0,0 +1,224 @@
+"""
+Opt-in per-request profiling.
+
+With PORTFOLIO_PROFILING on, ProfilingMiddleware times every request and breaks
+it down into database queries (count and time, recorded by an execute wrapper on
+every connection), serializer time (serializers.TimedRepresentationMixin) and
+template render time (rendering.render_portfolio), plus the response size. The
+breakdown is sent back in a Server-Timing header and aggregated per view into
+in-process histograms that views.metrics exposes in the Prometheus text format.
+
+Phases overlap: serializing a lazy queryset also counts its queries as db time.
+Streamed responses are measured up to the first byte only, as their body is
+produced after the middleware returns.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Upper bounds of the latency and size histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Timed phases, in Server-Timing order
+PHASES = ('db', 'serializer', 'render')
+
+_current = ContextVar('portfolio_request_profile', default=None)
+
+
+class RequestProfile:
+    """Time spent per phase (seconds) and queries run while handling one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.running = set()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+@contextmanager
+def timed(phase):
+    """Count the block towards ``phase`` of the current request; nested blocks count once"""
+    profile = _current.get()
+    if profile is None or phase in profile.running:
+        yield
+        return
+    profile.running.add(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.running.discard(phase)
+        profile.durations[phase] += time.perf_counter() - start
+
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper adding each query to the current request's profile"""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.durations['db'] += time.perf_counter() - start
+
+
+def _install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_query_recorder():
+    """Record queries on every open and future database connection"""
+    connection_created.connect(_install_query_recorder, dispatch_uid='portfolio_profiling')
+    for connection in connections.all(initialized_only=True):
+        _install_query_recorder(connection)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """Thread-safe Prometheus-style histogram keyed by label values"""
+
+    def __init__(self, name, documentation, buckets, labelnames=('view', 'method')):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, values in series:
+            label_text = ','.join(
+                f'{name}="{_escape_label(value)}"' for name, value in zip(self.labelnames, labels)
+            )
+            for bound, count in zip(self.buckets, values['buckets']):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {values["count"]}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {values["sum"]}')
+            lines.append(f'{self.name}_count{{{label_text}}} {values["count"]}')
+        return '\n'.join(lines)
+
+
+REQUEST_DURATION = Histogram(
+    'portfolio_request_duration_seconds', 'Wall time spent handling requests.', DURATION_BUCKETS,
+    labelnames=('view', 'method', 'status'),
+)
+PHASE_DURATIONS = {
+    'db': Histogram('portfolio_db_duration_seconds', 'Time spent in database queries per request.',
+                    DURATION_BUCKETS),
+    'serializer': Histogram('portfolio_serializer_duration_seconds', 'Time spent serializing per request.',
+                            DURATION_BUCKETS),
+    'render': Histogram('portfolio_render_duration_seconds', 'Time spent rendering portfolio HTML per request.',
+                        DURATION_BUCKETS),
+}
+DB_QUERIES = Histogram('portfolio_db_queries', 'Database queries run per request.', QUERY_COUNT_BUCKETS)
+RESPONSE_BYTES = Histogram('portfolio_response_bytes', 'Size of response bodies.', SIZE_BUCKETS)
+METRICS = (REQUEST_DURATION, *PHASE_DURATIONS.values(), DB_QUERIES, RESPONSE_BYTES)
+
+
+def render_metrics():
+    """Every histogram in the Prometheus text exposition format"""
+    return '\n'.join(metric.expose() for metric in METRICS) + '\n'
+
+
+def reset_metrics():
+    for metric in METRICS:
+        metric.clear()
+
+
+def response_size(response):
+    if not response.streaming:
+        return len(response.content)
+    length = response.get('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+
+def server_timing(profile, total):
+    entries = [f'db;dur={profile.durations["db"] * 1000:.1f};desc="{profile.queries} queries"']
+    entries += [f'{phase};dur={profile.durations[phase] * 1000:.1f}' for phase in PHASES[1:]]
+    entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
+
+
+class ProfilingMiddleware:
+    """Add a Server-Timing header to each response and feed the per-view histograms"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PORTFOLIO_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install_query_recorder()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        total = profile.elapsed()
+        match = request.resolver_match
+        labels = (match.view_name if match else 'unresolved', request.method)
+        REQUEST_DURATION.observe((*labels, str(response.status_code)), total)
+        for phase, histogram in PHASE_DURATIONS.items():
+            histogram.observe(labels, profile.durations[phase])
+        DB_QUERIES.observe(labels, profile.queries)
+        size = response_size(response)
+        if size is not None:
+            RESPONSE_BYTES.observe(labels, size)
+        response['Server-Timing'] = server_timing(profile, total)
+        return response
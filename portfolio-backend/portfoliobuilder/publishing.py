@@ -0,0 +1,166 @@
+"""
+Pre-rendered pages for published portfolios.
+
+A published portfolio is rendered when it (or one of its projects, skills,
+experiences or its template) is saved, and the finished page is stored in the
+cache under its slug. The public view only reads that entry, so visitors never
+trigger a render while the page is warm.
+
+Each page records the version (portfolio and template updated_at) it was
+rendered from. Readers compare it with the current version, itself cached for
+PAGE_VERSION_TIMEOUT seconds, so with per-process caches an edit, unpublish or
+delete made in another worker is served for at most that long.
+
+Pages rendered after a save or on a cache miss are compressed at the cheap
+FAST_LEVELS; background rerenders (render_pool) store maximally compressed
+copies.
+"""
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+from .models import Portfolio
+from .postprocess import ENCODINGS, compress, minify_html
+from .render_cache import render_sections
+from .rendering import render_portfolio
+from .static_site import StaticSitePublisher, get_static_root
+
+PAGE_KEY = 'portfoliobuilder:page:{slug}'
+PAGE_VERSION_KEY = 'portfoliobuilder:page-version:{slug}'
+PAGE_VERSION_TIMEOUT = 60
+# Version of slugs that are not published; remembered like any other version
+# so repeated misses do not reach the database.
+MISSING_PAGE = 'missing'
+
+
+def _cache():
+    return caches[getattr(settings, 'PORTFOLIO_PAGE_CACHE_ALIAS', 'default')]
+
+
+def page_timeout():
+    return getattr(settings, 'PORTFOLIO_PAGE_TIMEOUT', 24 * 60 * 60)
+
+
+def minify_published_pages():
+    return getattr(settings, 'PORTFOLIO_MINIFY_PUBLISHED', True)
+
+
+def published_portfolios():
+    """Published portfolios with everything the renderer reads loaded up front"""
+    return Portfolio.objects.filter(is_published=True).select_related('template').prefetch_related(
+        'projects', 'skills', 'experiences'
+    )
+
+
+def _version(updated_at, template_updated_at):
+    return f'{updated_at.isoformat()}|{template_updated_at.isoformat()}'
+
+
+def refresh_page_version(slug):
+    """Look up the current version of the page at ``slug`` and store it"""
+    row = Portfolio.objects.filter(slug=slug, is_published=True).values_list(
+        'updated_at', 'template__updated_at'
+    ).first()
+    version = MISSING_PAGE if row is None else _version(*row)
+    _cache().set(PAGE_VERSION_KEY.format(slug=slug), version, PAGE_VERSION_TIMEOUT)
+    return version
+
+
+def page_cache_is_shared():
+    """Whether pages stored by one process are visible to the others"""
+    return not isinstance(_cache(), LocMemCache)
+
+
+def render_page(portfolio, fast=False):
+    """Render ``portfolio`` into the page stored for its public URL; ``fast`` compresses cheaply"""
+    html = render_portfolio(portfolio, sections=render_sections(portfolio))
+    if minify_published_pages():
+        html = minify_html(html)
+    data = html.encode()
+    # Pre-compressed copies are stored with the page so serving never compresses.
+    content = {'identity': data}
+    for encoding in ENCODINGS:
+        content[encoding] = compress(data, encoding, fast=fast)
+    page = {
+        'content': content,
+        'etag': hashlib.sha256(data).hexdigest()[:32],
+        'last_modified': timezone.now(),
+        'version': _version(portfolio.updated_at, portfolio.template.updated_at),
+    }
+    return page
+
+
+def store_page(slug, page):
+    """Serve ``page`` (from render_page) at the public URL of ``slug``"""
+    cache = _cache()
+    cache.set(PAGE_KEY.format(slug=slug), page, page_timeout())
+    cache.set(PAGE_VERSION_KEY.format(slug=slug), page['version'], PAGE_VERSION_TIMEOUT)
+
+
+def publish_page(portfolio, fast=False):
+    """Render ``portfolio`` and store it as the page served at its public URL"""
+    page = render_page(portfolio, fast=fast)
+    store_page(portfolio.slug, page)
+    return page
+
+
+def unpublish_page(slug):
+    # The next read re-checks the database, so a slug that is published again is not hidden
+    forget_pages([slug])
+    if get_static_root():
+        StaticSitePublisher().unpublish(slug)
+
+
+def forget_pages(slugs):
+    """Drop the stored pages of ``slugs`` so their next request renders them afresh"""
+    keys = [key.format(slug=slug) for slug in slugs for key in (PAGE_VERSION_KEY, PAGE_KEY)]
+    if keys:
+        _cache().delete_many(keys)
+
+
+def refresh_portfolio_page(portfolio_id):
+    """Re-render a portfolio's public page, or drop it if it is no longer published"""
+    row = Portfolio.objects.filter(pk=portfolio_id).values_list('slug', 'is_published').first()
+    if row is None:
+        return None
+    slug, is_published = row
+    if not is_published:
+        unpublish_page(slug)
+        return None
+    portfolio = published_portfolios().get(pk=portfolio_id)
+    if get_static_root():
+        StaticSitePublisher().update(portfolio)
+    return publish_page(portfolio, fast=True)
+
+
+def get_published_page(slug):
+    """Return the current page for ``slug``, rendering it on a cold cache or a version change"""
+    keys = PAGE_VERSION_KEY.format(slug=slug), PAGE_KEY.format(slug=slug)
+    cached = _cache().get_many(keys)
+    version = cached.get(keys[0]) or refresh_page_version(slug)
+    if version == MISSING_PAGE:
+        return None
+    page = cached.get(keys[1])
+    if page is None or page['version'] != version:
+        portfolio = published_portfolios().filter(slug=slug).first()
+        if portfolio is None:
+            _cache().set(keys[0], MISSING_PAGE, PAGE_VERSION_TIMEOUT)
+            return None
+        page = publish_page(portfolio, fast=True)
+    return page
+
+
+async def aget_published_page(slug):
+    """Async counterpart of get_published_page; a warm, current page needs no thread hop"""
+    keys = PAGE_VERSION_KEY.format(slug=slug), PAGE_KEY.format(slug=slug)
+    cached = await _cache().aget_many(keys)
+    version, page = cached.get(keys[0]), cached.get(keys[1])
+    if version == MISSING_PAGE:
+        return None
+    if version is None or page is None or page['version'] != version:
+        return await sync_to_async(get_published_page)(slug)
+    return page
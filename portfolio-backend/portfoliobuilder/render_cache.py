@@ -0,0 +1,338 @@
+"""
+Content-addressed cache for rendered portfolio HTML.
+
+Rendered documents are stored under a fingerprint of every row that feeds the
+render (the portfolio, its template, projects, skills and experiences), so two
+identical graphs share one entry. A small per-portfolio pointer remembers the
+last fingerprint and lets a repeat export skip even the fingerprint queries.
+The pointer is only trusted while the portfolio's and template's updated_at are
+unchanged: edits to projects, skills and experiences touch the portfolio's
+updated_at (signals.portfolio_content_changed), so a pointer written by another
+process goes stale with the rows. Signals also drop the pointer in-process.
+
+The projects, skills and experience sections are cached the same way, each under
+a digest of its own rows, so editing one project re-renders only the projects
+section and re-stitches the page around the cached rest.
+
+The storage backend is configured with the PORTFOLIO_RENDER_CACHE setting::
+
+    PORTFOLIO_RENDER_CACHE = {
+        'BACKEND': 'portfoliobuilder.render_cache.LocMemRenderCache',
+        'OPTIONS': {'MAX_ENTRIES': 512},
+    }
+"""
+import hashlib
+import itertools
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .lru import LRUCache
+from .postprocess import ENCODINGS, compress, minify_html
+from .profiling import timed
+from .rendering import ROW_SECTIONS, get_compiled_template, render_portfolio
+
+# Bump when the renderer output changes so stale entries are never served.
+RENDER_VERSION = 3
+
+DEFAULT_RENDER_CACHE = {
+    'BACKEND': 'portfoliobuilder.render_cache.LocMemRenderCache',
+    'OPTIONS': {},
+}
+
+
+class BaseRenderCache:
+    """Byte-oriented key/value store used for rendered documents"""
+
+    def __init__(self, **options):
+        self.options = options
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LocMemRenderCache(BaseRenderCache):
+    """Per-process LRU; fastest, but every worker keeps its own copy"""
+
+    def __init__(self, MAX_ENTRIES=512, **options):
+        super().__init__(**options)
+        self._cache = LRUCache(maxsize=MAX_ENTRIES)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def delete(self, key):
+        self._cache.delete(key)
+
+    def clear(self):
+        self._cache.clear()
+
+
+class FileSystemRenderCache(BaseRenderCache):
+    """Stores one file per key under LOCATION, shared by every worker on the host"""
+
+    def __init__(self, LOCATION=None, **options):
+        super().__init__(**options)
+        self.location = os.fspath(LOCATION or os.path.join(settings.BASE_DIR, 'render_cache'))
+
+    def _path(self, key):
+        return os.path.join(self.location, hashlib.md5(key.encode()).hexdigest() + '.cache')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        os.makedirs(self.location, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.location)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        if not os.path.isdir(self.location):
+            return
+        for name in os.listdir(self.location):
+            if name.endswith('.cache'):
+                os.remove(os.path.join(self.location, name))
+
+
+class DjangoRenderCache(BaseRenderCache):
+    """Delegates to one of the CACHES aliases (e.g. Redis or Memcached)"""
+
+    def __init__(self, ALIAS='default', TIMEOUT=None, KEY_PREFIX='portfolio-render', **options):
+        super().__init__(**options)
+        self.alias = ALIAS
+        self.timeout = TIMEOUT
+        self.key_prefix = KEY_PREFIX
+
+    @property
+    def _cache(self):
+        return caches[self.alias]
+
+    def _key(self, key):
+        return f'{self.key_prefix}:{key}'
+
+    def get(self, key):
+        return self._cache.get(self._key(key))
+
+    def set(self, key, value):
+        self._cache.set(self._key(key), value, self.timeout)
+
+    def delete(self, key):
+        self._cache.delete(self._key(key))
+
+    def clear(self):
+        # Shared Django caches cannot be cleared by prefix; entries age out instead.
+        pass
+
+
+_render_cache = None
+
+
+def get_render_cache():
+    """Return the configured render cache backend, building it on first use"""
+    global _render_cache
+    if _render_cache is None:
+        config = getattr(settings, 'PORTFOLIO_RENDER_CACHE', DEFAULT_RENDER_CACHE)
+        backend = import_string(config['BACKEND'])
+        _render_cache = backend(**config.get('OPTIONS', {}))
+    return _render_cache
+
+
+@receiver(setting_changed)
+def _reset_render_cache(setting, **kwargs):
+    global _render_cache
+    if setting == 'PORTFOLIO_RENDER_CACHE':
+        _render_cache = None
+
+
+# Related managers whose rows feed a cached section (see rendering.ROW_SECTIONS)
+SECTION_RELATIONS = ('projects', 'skills', 'experiences')
+
+
+def _digest(value):
+    return hashlib.sha256(repr(value).encode()).hexdigest()
+
+
+def _row_values(rows):
+    return [tuple(getattr(row, field.attname) for field in row._meta.concrete_fields) for row in rows]
+
+
+def load_sections(portfolio, relations=SECTION_RELATIONS):
+    """Rows of every related section with a digest of their values.
+
+    Prefetched relations cost no queries; otherwise each relation is loaded once
+    and the same rows serve both the fingerprint and the section renders.
+    """
+    sections = {}
+    for related in relations:
+        rows = list(getattr(portfolio, related).all())
+        sections[related] = (rows, _digest(_row_values(rows)))
+    return sections
+
+
+def fingerprint(portfolio, sections=None):
+    """Hash every row that contributes to the rendered document"""
+    if sections is None:
+        sections = load_sections(portfolio)
+    template = portfolio.template
+    return _digest((
+        RENDER_VERSION,
+        [getattr(portfolio, field.attname) for field in portfolio._meta.concrete_fields],
+        (template.pk, template.updated_at),
+        [digest for _, digest in sections.values()],
+    ))
+
+
+def _section_key(related, digest):
+    return f'section:{RENDER_VERSION}:{related}:{digest}'
+
+
+def render_sections(portfolio, sections=None, names=None):
+    """HTML of the row-backed placeholders used by the portfolio's layout.
+
+    Each section is looked up under the digest of its rows and rendered only on
+    a miss; pass the result to rendering.render_portfolio(sections=...).
+    ``names`` narrows the placeholders to render.
+    """
+    if names is None:
+        names = get_compiled_template(portfolio.template).placeholders
+    names = set(names) & ROW_SECTIONS.keys()
+    if not names:
+        return {}
+    if sections is None:
+        sections = load_sections(portfolio, {ROW_SECTIONS[name][0] for name in names})
+    cache = get_render_cache()
+    rendered = {}
+    for name in names:
+        related, renderer = ROW_SECTIONS[name]
+        rows, digest = sections[related]
+        key = _section_key(related, digest)
+        html = cache.get(key)
+        if html is None:
+            with timed('render'):
+                html = renderer(rows).encode()
+            cache.set(key, html)
+        rendered[name] = html.decode()
+    return rendered
+
+
+def _content_key(digest, variant):
+    return f'render:{digest}:{variant}'
+
+
+def _variant(include_css, include_js, minify):
+    return f"css{int(include_css)}-js{int(include_js)}-min{int(minify)}"
+
+
+def _pointer_key(portfolio_id):
+    return f'portfolio:{portfolio_id}'
+
+
+def _pointer_stamp(portfolio):
+    template = portfolio.template
+    return f'{portfolio.updated_at.isoformat()}|{template.pk}|{template.updated_at.isoformat()}|'
+
+
+def _cached_digest(cache, portfolio):
+    """Fingerprint remembered for ``portfolio`` if none of its rows changed since"""
+    pointer = cache.get(_pointer_key(portfolio.pk))
+    if pointer is None:
+        return None
+    stamp = _pointer_stamp(portfolio)
+    pointer = pointer.decode()
+    return pointer[len(stamp):] if pointer.startswith(stamp) else None
+
+
+def render_portfolio_cached(portfolio, include_css=True, include_js=True, minify=False, encoding=None):
+    """Return the rendered document for ``portfolio`` as bytes, rendering only on a cache miss.
+
+    Every combination of export options is cached as its own variant, and
+    ``encoding`` (see postprocess.ENCODINGS) returns a pre-compressed copy that
+    is cached next to the plain one.
+    """
+    cache = get_render_cache()
+    variant = _variant(include_css, include_js, minify)
+    encoded_variant = f'{variant}-{encoding}' if encoding else variant
+
+    sections = None
+    digest = _cached_digest(cache, portfolio)
+    if digest is not None:
+        data = cache.get(_content_key(digest, encoded_variant))
+        if data is not None:
+            return data
+    else:
+        sections = load_sections(portfolio)
+        digest = fingerprint(portfolio, sections)
+        cache.set(_pointer_key(portfolio.pk), (_pointer_stamp(portfolio) + digest).encode())
+
+    html = cache.get(_content_key(digest, variant))
+    if html is None:
+        document = render_portfolio(
+            portfolio, include_css=include_css, include_js=include_js,
+            sections=render_sections(portfolio, sections),
+        )
+        if minify:
+            document = minify_html(document)
+        html = document.encode()
+        cache.set(_content_key(digest, variant), html)
+    if not encoding:
+        return html
+    data = compress(html, encoding)
+    cache.set(_content_key(digest, encoded_variant), data)
+    return data
+
+
+def invalidate_portfolio(portfolio_id):
+    """Forget the last render of a portfolio so the next export re-fingerprints it"""
+    get_render_cache().delete(_pointer_key(portfolio_id))
+
+
+def evict_portfolio(portfolio):
+    """Delete every cached render of ``portfolio`` as it is now: pointer, sections and all export variants.
+
+    Unlike invalidate_portfolio(), the next render starts from nothing, e.g. to
+    measure a cold render.
+    """
+    cache = get_render_cache()
+    sections = load_sections(portfolio)
+    digest = fingerprint(portfolio, sections)
+    cache.delete(_pointer_key(portfolio.pk))
+    for related, (_, section_digest) in sections.items():
+        cache.delete(_section_key(related, section_digest))
+    for options in itertools.product((False, True), repeat=3):
+        variant = _variant(*options)
+        for encoded_variant in (variant, *(f'{variant}-{encoding}' for encoding in ENCODINGS)):
+            cache.delete(_content_key(digest, encoded_variant))
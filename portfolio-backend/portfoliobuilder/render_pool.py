@@ -0,0 +1,175 @@
+"""
+Parallel re-rendering of many portfolios.
+
+Used after a template changes (or to rebuild everything) so that public pages,
+static site files and shared export caches are refreshed without rendering
+serially in one request. Portfolio ids are split into contiguous chunks; each
+worker process loads its chunk with the sections prefetched and renders it.
+Unless the page cache is shared, workers return the rendered pages and the
+parent stores them, since a worker's own cache dies with it.
+Finished chunks, and the ids that failed in them, are recorded in a state file
+so an interrupted run can resume where it stopped and retry only the failures.
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from django import db
+
+from .models import Portfolio
+from .publishing import page_cache_is_shared, publish_page, render_page, store_page
+from .render_cache import FileSystemRenderCache, DjangoRenderCache, get_render_cache, render_portfolio_cached
+from .static_site import StaticSitePublisher, get_static_root
+
+
+@dataclass
+class RerenderReport:
+    total: int = 0
+    rendered: int = 0
+    skipped: int = 0
+    failed: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self):
+        return self.rendered / self.elapsed if self.elapsed else 0.0
+
+
+def _shared_render_cache():
+    # Warming a per-process LRU from a worker would be thrown away with the worker.
+    return isinstance(get_render_cache(), (FileSystemRenderCache, DjangoRenderCache))
+
+
+def render_chunk(portfolio_ids, store_pages=True):
+    """Render one chunk of portfolios; returns (rendered count, static entries, pages, errors).
+
+    Published pages are stored right away, or returned by slug for the caller to
+    store when ``store_pages`` is false.
+    """
+    portfolios = Portfolio.objects.filter(pk__in=portfolio_ids).select_related('template').prefetch_related(
+        'projects', 'skills', 'experiences'
+    )
+    publisher = StaticSitePublisher() if get_static_root() else None
+    warm_exports = _shared_render_cache()
+    rendered = 0
+    entries = {}
+    pages = {}
+    errors = {}
+    for portfolio in portfolios:
+        try:
+            if portfolio.is_published:
+                if store_pages:
+                    publish_page(portfolio)
+                else:
+                    pages[portfolio.slug] = render_page(portfolio)
+                if publisher is not None:
+                    entries[portfolio.slug] = publisher.publish(portfolio)
+            if warm_exports:
+                render_portfolio_cached(portfolio)
+            rendered += 1
+        except Exception as e:
+            errors[portfolio.pk] = str(e)
+    return rendered, entries, pages, errors
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def chunk_ids(portfolio_ids, chunk_size):
+    return [portfolio_ids[i:i + chunk_size] for i in range(0, len(portfolio_ids), chunk_size)]
+
+
+class RerenderState:
+    """Completed chunks of a run and the ids that failed in them, persisted as JSON after each chunk"""
+
+    def __init__(self, path, job):
+        self.path = path
+        self.job = job
+        self.completed = []
+        self.failed = set()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            state = json.load(f)
+        if state.get('job') == self.job:
+            self.completed = [tuple(bounds) for bounds in state.get('completed', [])]
+            self.failed = set(state.get('failed', []))
+
+    def is_done(self, portfolio_id):
+        if portfolio_id in self.failed:
+            return False
+        return any(low <= portfolio_id <= high for low, high in self.completed)
+
+    def mark_done(self, chunk, failed=()):
+        """Record ``chunk`` as finished; ids in ``failed`` stay pending for the next resume"""
+        self.completed.append((chunk[0], chunk[-1]))
+        self.failed = (self.failed - set(chunk)) | set(failed)
+        if self.path:
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'job': self.job, 'completed': self.completed, 'failed': sorted(self.failed)}, f)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def rerender_portfolios(queryset=None, workers=None, chunk_size=100, state_path=None, resume=False, progress=None):
+    """Re-render every portfolio in ``queryset`` across a process pool.
+
+    ``workers=0`` renders in the current process. With ``state_path`` set, each
+    finished chunk is checkpointed and ``resume=True`` skips the portfolios a
+    previous, interrupted or partly failed run with the same queryset already
+    rendered. ``progress`` is
+    called with the report after every chunk.
+    """
+    queryset = queryset if queryset is not None else Portfolio.objects.all()
+    portfolio_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    state = RerenderState(state_path, job=str(queryset.query))
+    if resume:
+        state.load()
+
+    report = RerenderReport(total=len(portfolio_ids))
+    pending = [pk for pk in portfolio_ids if not state.is_done(pk)]
+    report.skipped = len(portfolio_ids) - len(pending)
+    chunks = chunk_ids(pending, chunk_size)
+    static_entries = {}
+    started = time.monotonic()
+
+    def record(chunk, result):
+        rendered, entries, pages, errors = result
+        for slug, page in pages.items():
+            store_page(slug, page)
+        report.rendered += rendered
+        report.failed.update(errors)
+        static_entries.update(entries)
+        state.mark_done(chunk, failed=errors)
+        report.elapsed = time.monotonic() - started
+        if progress is not None:
+            progress(report)
+
+    if workers == 0:
+        for chunk in chunks:
+            record(chunk, render_chunk(chunk))
+    else:
+        # Forked workers must not share the parent's database connections
+        db.connections.close_all()
+        store_pages = page_cache_is_shared()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = {executor.submit(render_chunk, chunk, store_pages): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                record(futures[future], future.result())
+
+    if static_entries:
+        StaticSitePublisher().merge_entries(static_entries)
+    report.elapsed = time.monotonic() - started
+    if not report.failed:
+        state.clear()
+    return report
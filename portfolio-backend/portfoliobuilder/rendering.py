@@ -0,0 +1,263 @@
+"""
+Portfolio HTML rendering.
+
+Template.html_content is a layout with ``{{placeholder}}`` slots (see the
+create_templates command). Each layout is parsed once into a CompiledTemplate
+and cached per template id and ``updated_at`` version, so an export only has to
+fill the slots from the portfolio instead of re-scanning the HTML/CSS blobs.
+"""
+import re
+
+from django.utils.html import escape
+
+from .lru import LRUCache
+from .profiling import timed
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}')
+
+
+class CompiledTemplate:
+    """Template source split into literal chunks and placeholder slots"""
+
+    __slots__ = ('parts', 'slots', 'placeholders')
+
+    def __init__(self, source):
+        parts = []
+        slots = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            parts.append(source[position:match.start()])
+            slots.append((len(parts), match.group(1)))
+            parts.append('')
+            position = match.end()
+        parts.append(source[position:])
+        self.parts = tuple(parts)
+        self.slots = tuple(slots)
+        self.placeholders = frozenset(name for _, name in slots)
+
+    def render(self, context):
+        """Fill every slot from ``context``; unknown placeholders render empty"""
+        parts = list(self.parts)
+        for index, name in self.slots:
+            parts[index] = context.get(name, '')
+        return ''.join(parts)
+
+
+# Outer document shared by every template; the layout is rendered into {{body}}
+# and the style/script tags are built by render_portfolio().
+DOCUMENT = CompiledTemplate("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{title}}</title>
+    {{styles}}
+</head>
+<body>
+{{body}}
+{{custom_html}}
+{{scripts}}
+</body>
+</html>""")
+
+# Layout used for templates that do not define their own html_content.
+DEFAULT_LAYOUT = CompiledTemplate("""
+<header>
+    <h1>{{hero_title}}</h1>
+    <h2>{{hero_subtitle}}</h2>
+</header>
+
+<section id="about">
+    <h3>About</h3>
+    <p>{{about_content}}</p>
+</section>
+
+<section id="projects">
+    <h3>Projects</h3>
+    <div class="projects-grid">{{projects}}</div>
+</section>
+
+<section id="skills">
+    <h3>Skills</h3>
+    <div class="skills-grid">{{skills}}</div>
+</section>
+
+<section id="experience">
+    <h3>Experience</h3>
+    {{experience}}
+</section>
+
+<section id="contact">
+    <h3>Contact</h3>
+    {{contact}}
+</section>
+""")
+
+_compiled_templates = LRUCache(maxsize=256)
+
+
+def get_compiled_template(template):
+    """Return the compiled layout for ``template``, parsing it at most once per version"""
+    if not template.html_content.strip():
+        return DEFAULT_LAYOUT
+    key = (template.pk, template.updated_at)
+    compiled = _compiled_templates.get(key)
+    if compiled is None:
+        compiled = CompiledTemplate(template.html_content)
+        _compiled_templates.set(key, compiled)
+    return compiled
+
+
+def _link(url, label):
+    if not url:
+        return ''
+    return f'<a href="{escape(url)}" target="_blank">{label}</a>'
+
+
+def render_project_items(projects):
+    return ''.join(
+        f"""
+<div class="project">
+    <h4>{escape(project.title)}</h4>
+    <p>{escape(project.description)}</p>
+    <p><strong>Technologies:</strong> {escape(project.technology_stack)}</p>
+    {_link(project.project_url, 'View Project')}
+    {_link(project.github_url, 'GitHub')}
+</div>"""
+        for project in projects
+    )
+
+
+def render_skill_items(skills):
+    return ''.join(
+        f"""
+<div class="skill">
+    <span>{escape(skill.name)}</span>
+    <div class="skill-bar">
+        <div class="skill-progress" style="width: {int(skill.proficiency)}%"></div>
+    </div>
+</div>"""
+        for skill in skills
+    )
+
+
+def render_experience_items(experiences):
+    return ''.join(
+        f"""
+<div class="experience">
+    <h4>{escape(exp.position)} at {escape(exp.company)}</h4>
+    <p class="duration">{exp.start_date} - {'Present' if exp.is_current or not exp.end_date else exp.end_date}</p>
+    <p>{escape(exp.description)}</p>
+</div>"""
+        for exp in experiences
+    )
+
+
+def render_projects(portfolio):
+    return render_project_items(portfolio.projects.all())
+
+
+def render_skills(portfolio):
+    return render_skill_items(portfolio.skills.all())
+
+
+def render_experience(portfolio):
+    return render_experience_items(portfolio.experiences.all())
+
+
+def render_contact(portfolio):
+    lines = [f'<p>Email: {escape(portfolio.contact_email)}</p>']
+    if portfolio.contact_phone:
+        lines.append(f'<p>Phone: {escape(portfolio.contact_phone)}</p>')
+    lines.append(_link(portfolio.social_linkedin, 'LinkedIn'))
+    lines.append(_link(portfolio.social_github, 'GitHub'))
+    lines.append(_link(portfolio.social_twitter, 'Twitter'))
+    return '\n'.join(line for line in lines if line)
+
+
+# Placeholder name -> callable producing its HTML. Only the placeholders a layout
+# actually uses are evaluated, so unused sections cost no queries.
+PLACEHOLDERS = {
+    'title': lambda portfolio: escape(portfolio.title),
+    'hero_title': lambda portfolio: escape(portfolio.hero_title),
+    'hero_subtitle': lambda portfolio: escape(portfolio.hero_subtitle),
+    'about_content': lambda portfolio: escape(portfolio.about_content),
+    'contact_email': lambda portfolio: escape(portfolio.contact_email),
+    'contact_phone': lambda portfolio: escape(portfolio.contact_phone),
+    'projects': render_projects,
+    'skills': render_skills,
+    'experience': render_experience,
+    'experiences': render_experience,
+    'contact': render_contact,
+}
+
+
+# Placeholders rendered from a related manager: name -> (related name, renderer
+# over its rows). These are the sections render_cache caches independently.
+ROW_SECTIONS = {
+    'projects': ('projects', render_project_items),
+    'skills': ('skills', render_skill_items),
+    'experience': ('experiences', render_experience_items),
+    'experiences': ('experiences', render_experience_items),
+}
+
+
+def build_context(portfolio, names, sections=None):
+    """Evaluate the placeholders in ``names`` for ``portfolio``.
+
+    ``sections`` maps placeholder names to HTML rendered beforehand (e.g. from
+    the section cache); those placeholders are not evaluated again.
+    """
+    context = {}
+    for name in names:
+        if sections and name in sections:
+            context[name] = sections[name]
+            continue
+        renderer = PLACEHOLDERS.get(name)
+        if renderer is not None:
+            context[name] = renderer(portfolio)
+    return context
+
+
+def _tags(tag, *contents):
+    content = '\n'.join(text for text in contents if text and text.strip())
+    return f'<{tag}>\n{content}\n</{tag}>' if content else ''
+
+
+def render_portfolio(portfolio, stylesheet_href=None, script_src=None, include_css=True, include_js=True,
+                     sections=None):
+    """Render the complete HTML document for ``portfolio``.
+
+    The template CSS/JS are inlined unless ``stylesheet_href``/``script_src`` give
+    a URL to link them from instead. ``include_css``/``include_js`` leave the
+    styles or scripts out entirely. ``sections`` supplies pre-rendered
+    placeholders (see render_cache.render_sections).
+    """
+    with timed('render'):
+        return _render_document(portfolio, stylesheet_href, script_src, include_css, include_js, sections)
+
+
+def _render_document(portfolio, stylesheet_href, script_src, include_css, include_js, sections):
+    template = portfolio.template
+    layout = get_compiled_template(template)
+
+    styles = ''
+    if include_css:
+        if stylesheet_href:
+            styles = f'<link rel="stylesheet" href="{escape(stylesheet_href)}">\n' + _tags('style', portfolio.custom_css)
+        else:
+            styles = _tags('style', template.css_content, portfolio.custom_css)
+    scripts = ''
+    if include_js:
+        if script_src:
+            scripts = f'<script src="{escape(script_src)}"></script>'
+        else:
+            scripts = _tags('script', template.js_content)
+
+    return DOCUMENT.render({
+        'title': escape(portfolio.title),
+        'styles': styles,
+        'body': layout.render(build_context(portfolio, layout.placeholders, sections)),
+        'custom_html': portfolio.custom_html,
+        'scripts': scripts,
+    })
@@ -0,0 +1,350 @@
+"""
+Resume/CV import into a portfolio.
+
+A reader turns an uploaded file into a stream of ``(kind, source, record)``
+tuples, where ``kind`` is one of bulk.BULK_SECTIONS and ``record`` already uses
+model field names. Each record is validated with the section's item serializer
+and buffered; full buffers are written with bulk_create, so memory stays bounded
+by the batch size rather than the file size. The whole import is one
+transaction, so a file that turns out to be unreadable part-way imports
+nothing. Supported formats:
+
+* ``json``  - JSON Resume (https://jsonresume.org/schema); streamed with ijson
+  when it is installed, otherwise loaded with the json module, which limits
+  files to MAX_JSON_SIZE bytes.
+* ``csv``   - a LinkedIn data export file (Positions.csv, Skills.csv or
+  Projects.csv), recognised by its header row.
+* ``jsonl`` - one object per line with a ``type`` of project, skill or
+  experience and the model's field names.
+"""
+import codecs
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.db import transaction
+
+from .bulk import BULK_SECTIONS, first_free_order
+from .models import Project
+from .signals import portfolio_content_changed
+from .technologies import sync_project_technologies
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+IMPORT_FORMATS = ('json', 'csv', 'jsonl')
+IMPORT_BATCH_SIZE = 200
+# Largest JSON Resume read into memory when ijson is not installed to stream it
+MAX_JSON_SIZE = 2 * 1024 * 1024
+# Only the first errors are kept in the report; the rest are counted
+MAX_REPORTED_ERRORS = 100
+
+SKILL_LEVELS = {
+    'beginner': 25, 'novice': 25, 'elementary': 25,
+    'intermediate': 50,
+    'advanced': 75, 'proficient': 75,
+    'expert': 90, 'master': 90, 'native': 90,
+}
+DATE_FORMATS = ('%Y-%m-%d', '%Y-%m', '%Y', '%b %Y', '%B %Y', '%m/%Y', '%m/%d/%Y')
+
+
+class ImportFormatError(ValueError):
+    """The file cannot be read as the requested format"""
+
+
+@dataclass
+class ImportReport:
+    created: dict = field(default_factory=lambda: {section: 0 for section in BULK_SECTIONS})
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, source, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'record': source, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'error_count': self.error_count, 'errors': self.errors}
+
+
+FORMAT_EXTENSIONS = {'.json': 'json', '.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+
+def guess_format(filename):
+    return FORMAT_EXTENSIONS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def parse_date(value):
+    """Parse the partial dates resumes use ('2020-03', 'Mar 2020', '2020'); None when empty"""
+    if value is not None and not isinstance(value, str):
+        return value  # left for the serializer to reject with a per-record error
+    value = (value or '').strip()
+    if not value or value.lower() in ('present', 'current', 'now'):
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return value  # left for the serializer to reject with a per-record error
+
+
+def parse_proficiency(level):
+    if isinstance(level, (int, float)):
+        return max(0, min(int(level), 100))
+    if not isinstance(level, str):
+        return SKILL_LEVELS['intermediate']
+    level = level.strip().lower().rstrip('%')
+    if level.isdigit():
+        return max(0, min(int(level), 100))
+    return SKILL_LEVELS.get(level, SKILL_LEVELS['intermediate'])
+
+
+def _join(*parts):
+    lines = []
+    for part in parts:
+        if isinstance(part, (list, tuple)):
+            lines.extend(f'- {item}' for item in part if item)
+        elif part:
+            lines.append(str(part))
+    return '\n'.join(lines)
+
+
+def _keywords(value):
+    """JSON Resume keywords are a list; a plain string is kept as written"""
+    if isinstance(value, list):
+        return ', '.join(str(keyword) for keyword in value if keyword)
+    return value or ''
+
+
+def _json_resume_work(item):
+    return {
+        'company': item.get('name') or item.get('company') or '',
+        'position': item.get('position') or '',
+        'description': _join(item.get('summary'), item.get('highlights')),
+        'start_date': parse_date(item.get('startDate')),
+        'end_date': parse_date(item.get('endDate')),
+        'is_current': not item.get('endDate'),
+        'company_url': item.get('url') or '',
+        'location': item.get('location') or '',
+    }
+
+
+def _json_resume_skill(item):
+    return {
+        'name': item.get('name') or '',
+        'category': 'other',
+        'proficiency': parse_proficiency(item.get('level')),
+    }
+
+
+def _json_resume_project(item):
+    return {
+        'title': item.get('name') or '',
+        'description': _join(item.get('description'), item.get('highlights')),
+        'technology_stack': _keywords(item.get('keywords')),
+        'project_url': item.get('url') or '',
+    }
+
+
+JSON_RESUME_SECTIONS = (
+    ('work', 'experiences', _json_resume_work),
+    ('skills', 'skills', _json_resume_skill),
+    ('projects', 'projects', _json_resume_project),
+)
+
+
+def _json_resume_items(key, kind, mapper, items):
+    for index, item in enumerate(items):
+        source = f'{key}[{index}]'
+        if isinstance(item, dict):
+            yield kind, source, mapper(item)
+        else:
+            yield None, source, {'non_field_errors': ['Expected an object']}
+
+
+def _json_section_types(fileobj):
+    """JSON type event (see ijson.parse) of each JSON Resume section, from one streaming pass"""
+    keys = {key for key, _, _ in JSON_RESUME_SECTIONS}
+    types = {}
+    for prefix, event, _ in ijson.parse(fileobj):
+        if prefix == '' and event not in ('start_map', 'map_key', 'end_map'):
+            raise ImportFormatError('Expected a JSON Resume object')
+        if prefix in keys and prefix not in types and event != 'map_key':
+            types[prefix] = event
+    return types
+
+
+def read_json_resume(fileobj):
+    if ijson is not None:
+        try:
+            fileobj.seek(0)
+            types = _json_section_types(fileobj)
+            for key, kind, mapper in JSON_RESUME_SECTIONS:
+                if types.get(key, 'null') not in ('start_array', 'null'):
+                    yield None, key, {key: ['Expected a list']}
+                    continue
+                fileobj.seek(0)
+                items = ijson.items(fileobj, f'{key}.item', use_float=True)
+                yield from _json_resume_items(key, kind, mapper, items)
+        except ijson.JSONError as e:
+            raise ImportFormatError(f'Invalid JSON: {e}')
+        return
+
+    data = fileobj.read(MAX_JSON_SIZE + 1)
+    if len(data) > MAX_JSON_SIZE:
+        raise ImportFormatError(f'JSON files are limited to {MAX_JSON_SIZE} bytes; install ijson to stream larger ones')
+    try:
+        resume = json.loads(data.decode('utf-8-sig'))
+    except ValueError as e:  # UnicodeDecodeError included
+        raise ImportFormatError(f'Invalid JSON: {e}')
+    if not isinstance(resume, dict):
+        raise ImportFormatError('Expected a JSON Resume object')
+    for key, kind, mapper in JSON_RESUME_SECTIONS:
+        items = resume.get(key)
+        if items is None:
+            continue
+        if not isinstance(items, list):
+            yield None, key, {key: ['Expected a list']}
+            continue
+        yield from _json_resume_items(key, kind, mapper, items)
+
+
+def _linkedin_position(row):
+    finished = row.get('Finished On')
+    return {
+        'company': row.get('Company Name') or '',
+        'position': row.get('Title') or '',
+        'description': row.get('Description') or '',
+        'start_date': parse_date(row.get('Started On')),
+        'end_date': parse_date(finished),
+        'is_current': not (finished or '').strip(),
+        'location': row.get('Location') or '',
+    }
+
+
+def _linkedin_skill(row):
+    return {'name': row.get('Name') or '', 'category': 'other'}
+
+
+def _linkedin_project(row):
+    return {
+        'title': row.get('Title') or '',
+        'description': row.get('Description') or '',
+        'technology_stack': row.get('Technologies') or '',
+        'project_url': row.get('Url') or '',
+    }
+
+
+# Header column that identifies each LinkedIn export file
+LINKEDIN_FILES = (
+    ('Company Name', 'experiences', _linkedin_position),
+    ('Title', 'projects', _linkedin_project),
+    ('Name', 'skills', _linkedin_skill),
+)
+
+
+def read_linkedin_csv(fileobj):
+    reader = csv.DictReader(codecs.getreader('utf-8-sig')(fileobj))
+    columns = reader.fieldnames or []
+    for column, kind, mapper in LINKEDIN_FILES:
+        if column in columns:
+            break
+    else:
+        raise ImportFormatError('Unrecognised CSV; expected a LinkedIn Positions, Projects or Skills export')
+    for row in reader:
+        yield kind, f'line {reader.line_num}', mapper(row)
+
+
+JSONL_TYPES = {'project': 'projects', 'skill': 'skills', 'experience': 'experiences'}
+
+
+def read_jsonl(fileobj):
+    for number, line in enumerate(codecs.getreader('utf-8-sig')(fileobj), start=1):
+        if not line.strip():
+            continue
+        source = f'line {number}'
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield None, source, {'non_field_errors': [f'Invalid JSON: {e}']}
+            continue
+        kind = JSONL_TYPES.get(record.pop('type', None)) if isinstance(record, dict) else None
+        if kind is None:
+            yield None, source, {'type': [f'Expected one of {", ".join(JSONL_TYPES)}']}
+            continue
+        yield kind, source, record
+
+
+READERS = {
+    'json': read_json_resume,
+    'csv': read_linkedin_csv,
+    'jsonl': read_jsonl,
+}
+
+
+class _SectionWriter:
+    """Buffers validated rows of one section and bulk-inserts them in batches"""
+
+    def __init__(self, portfolio, kind, batch_size):
+        self.portfolio = portfolio
+        self.model, self.serializer_class = BULK_SECTIONS[kind]
+        self.batch_size = batch_size
+        self.next_order = first_free_order(self.model, portfolio)
+        self.pending = []
+        self.created = 0
+
+    def add(self, attrs):
+        if 'order' not in attrs:
+            attrs = {**attrs, 'order': self.next_order}
+            self.next_order += 1
+        self.pending.append(self.model(portfolio=self.portfolio, **attrs))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.model.objects.bulk_create(self.pending)
+            if self.model is Project:
+                sync_project_technologies(self.pending)
+            self.created += len(self.pending)
+            self.pending = []
+
+
+def import_resume(portfolio, fileobj, file_format, batch_size=IMPORT_BATCH_SIZE):
+    """Import every record of ``fileobj`` into ``portfolio`` and return an ImportReport.
+
+    Invalid records are reported and skipped; valid ones are written in batches
+    of ``batch_size`` inside a single transaction. Raises ImportFormatError, and
+    imports nothing, if the file cannot be read.
+    """
+    if file_format not in READERS:
+        raise ImportFormatError(f'Unsupported format {file_format!r}; expected one of {", ".join(IMPORT_FORMATS)}')
+    report = ImportReport()
+    writers = {}
+    try:
+        with transaction.atomic():
+            for kind, source, record in READERS[file_format](fileobj):
+                if kind is None:
+                    report.add_error(source, record)
+                    continue
+                writer = writers.get(kind)
+                if writer is None:
+                    writer = writers[kind] = _SectionWriter(portfolio, kind, batch_size)
+                serializer = writer.serializer_class(data=record)
+                if serializer.is_valid():
+                    writer.add(serializer.validated_data)
+                else:
+                    report.add_error(source, serializer.errors)
+            for kind, writer in writers.items():
+                writer.flush()
+                report.created[kind] = writer.created
+            if any(report.created.values()):
+                portfolio_content_changed(portfolio.pk)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFormatError(f'Unreadable {file_format} file: {e}')
+    return report
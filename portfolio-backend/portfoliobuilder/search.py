@@ -0,0 +1,130 @@
+"""
+Full-text search over published portfolios.
+
+Each published portfolio has a SearchDocument row holding its searchable text,
+rebuilt after every change to the portfolio or its projects, skills and
+experiences (see signals.portfolio_content_changed). Migration 0005 indexes the
+table with an external-content FTS5 table on SQLite or a weighted, generated
+tsvector column on Postgres; other databases fall back to LIKE matching.
+"""
+import re
+
+from django.db import connections, router
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Experience, Portfolio, Project, SearchDocument, Skill
+
+FTS_TABLE = 'portfoliobuilder_search_fts'
+# bm25() column weights for title, hero, about, projects, skills, experience
+FTS_WEIGHTS = (10.0, 8.0, 1.0, 3.0, 5.0, 2.0)
+SEARCH_COLUMNS = ('title', 'hero', 'about', 'projects', 'skills', 'experience')
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_QUERY_TOKENS = 16
+
+
+def build_search_document(portfolio_id):
+    """Searchable text of a portfolio as SearchDocument field values, or None if it is not published"""
+    portfolio = (
+        Portfolio.objects.filter(pk=portfolio_id, is_published=True)
+        .values('title', 'hero_title', 'hero_subtitle', 'about_content').first()
+    )
+    if portfolio is None:
+        return None
+    projects = Project.objects.filter(portfolio_id=portfolio_id)
+    skills = Skill.objects.filter(portfolio_id=portfolio_id)
+    experiences = Experience.objects.filter(portfolio_id=portfolio_id)
+    return {
+        'title': portfolio['title'],
+        'hero': f"{portfolio['hero_title']}\n{portfolio['hero_subtitle']}",
+        'about': portfolio['about_content'],
+        'projects': '\n'.join(
+            '\n'.join(row) for row in projects.values_list('title', 'description', 'technology_stack')
+        ),
+        'skills': '\n'.join(skills.values_list('name', flat=True)),
+        'experience': '\n'.join(
+            '\n'.join(row) for row in experiences.values_list('position', 'company', 'description')
+        ),
+    }
+
+
+def update_search_document(portfolio_id):
+    """Re-index one portfolio; unpublished or deleted portfolios are dropped from the index"""
+    fields = build_search_document(portfolio_id)
+    if fields is None:
+        SearchDocument.objects.filter(portfolio_id=portfolio_id).delete()
+        return None
+    document, _ = SearchDocument.objects.update_or_create(portfolio_id=portfolio_id, defaults=fields)
+    return document
+
+
+def rebuild_search_index():
+    """Re-index every portfolio from scratch; returns the number of documents"""
+    SearchDocument.objects.all().delete()
+    count = 0
+    for portfolio_id in Portfolio.objects.filter(is_published=True).values_list('pk', flat=True).iterator():
+        update_search_document(portfolio_id)
+        count += 1
+    return count
+
+
+# (alias, database NAME) -> whether migration 0005 could create the FTS5 table there
+_fts_tables = {}
+
+
+def _has_fts_table(connection):
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _fts_tables:
+        _fts_tables[key] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_tables[key]
+
+
+def _fts5_query(tokens):
+    # Every token must match, each as a prefix; quoting keeps FTS5 syntax out of user input
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _search_fts5(connection, tokens, limit, offset):
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, -bm25({FTS_TABLE}, {weights}) AS rank FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s ORDER BY rank DESC, rowid LIMIT %s OFFSET %s',
+            [_fts5_query(tokens), limit, offset],
+        )
+        return cursor.fetchall()
+
+
+def _search_postgres(query, limit, offset):
+    tsquery = "websearch_to_tsquery('english', %s)"
+    documents = SearchDocument.objects.filter(
+        RawSQL(f'search_vector @@ {tsquery}', [query], output_field=BooleanField()),
+    ).annotate(
+        rank=RawSQL(f'ts_rank_cd(search_vector, {tsquery})', [query], output_field=FloatField()),
+    ).order_by('-rank', 'portfolio_id')
+    return list(documents.values_list('portfolio_id', 'rank')[offset:offset + limit])
+
+
+def _search_like(tokens, limit, offset):
+    documents = SearchDocument.objects.all()
+    for token in tokens:
+        match = Q()
+        for column in SEARCH_COLUMNS:
+            match |= Q(**{f'{column}__icontains': token})
+        documents = documents.filter(match)
+    rows = documents.order_by('-updated_at', 'portfolio_id').values_list('portfolio_id', flat=True)
+    return [(portfolio_id, 0.0) for portfolio_id in rows[offset:offset + limit]]
+
+
+def search_portfolios(query, limit=20, offset=0):
+    """Ranked ``(portfolio_id, rank)`` pairs of published portfolios matching ``query``"""
+    tokens = TOKEN_RE.findall(query or '')[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return []
+    # Raw FTS queries bypass the ORM, so ask the router which database to read
+    connection = connections[router.db_for_read(SearchDocument)]
+    if connection.vendor == 'sqlite' and _has_fts_table(connection):
+        return _search_fts5(connection, tokens, limit, offset)
+    if connection.vendor == 'postgresql':
+        return _search_postgres(' '.join(tokens), limit, offset)
+    return _search_like(tokens, limit, offset)
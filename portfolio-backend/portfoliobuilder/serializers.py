@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
-from .models import User, Portfolio, Project, Skill, Experience, Template
+from django.urls import reverse
+from .models import User, Portfolio, Project, Skill, Experience, Template, RenderJob
+from .profiling import timed
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -40,33 +42,157 @@ class UserLoginSerializer(serializers.Serializer):
         else:
             raise serializers.ValidationError('Must include email and password')
 
-class UserSerializer(serializers.ModelSerializer):
+class TimedRepresentationMixin:
+    """Counts to_representation towards the request's serializer time (see profiling)"""
+
+    def to_representation(self, instance):
+        with timed('serializer'):
+            return super().to_representation(instance)
+
+class UserSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'created_at')
         read_only_fields = ('id', 'created_at')
 
-class TemplateSerializer(serializers.ModelSerializer):
+class EagerLoadingMixin:
+    """Plans select_related/prefetch_related for the fields a serializer renders.
+
+    Subclasses map serializer field names to the relation lookups they read, and
+    views pass their queryset through setup_eager_loading() so nested fields cost
+    a fixed number of queries regardless of how many rows are serialized.
+    """
+    select_related_fields = {}
+    prefetch_related_fields = {}
+    # Large model columns that are deferred when their field is not rendered
+    deferrable_fields = ()
+
+    @classmethod
+    def requested_fields(cls, context=None):
+        """Names of the fields this serializer renders for the given context"""
+        return list(cls(context=context or {}).fields.keys())
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, field_names=None):
+        if field_names is None:
+            field_names = cls.requested_fields()
+        select = sorted({lookup for name, lookup in cls.select_related_fields.items() if name in field_names})
+        prefetch = sorted({lookup for name, lookup in cls.prefetch_related_fields.items() if name in field_names})
+        defer = [name for name in cls.deferrable_fields if name not in field_names]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if defer:
+            queryset = queryset.defer(*defer)
+        return queryset
+
+def parse_field_list(value):
+    """Split a comma-separated ?fields=/?expand= value into a set of names"""
+    if not value:
+        return set()
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+class DynamicFieldsMixin:
+    """Sparse fieldsets for model serializers.
+
+    ``fields`` keeps only the named fields and ``expand`` adds optional ones back.
+    Both are accepted as keyword arguments or read from the ?fields= and ?expand=
+    query parameters of the request in the serializer context. When Meta declares
+    ``default_fields``, every other field is left out unless it is expanded or
+    named in ``fields``.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        # DRF requests expose query_params; plain Django requests (async views) expose GET
+        query_params = getattr(request, 'query_params', getattr(request, 'GET', {}))
+        if fields is None:
+            fields = parse_field_list(query_params.get('fields'))
+        if expand is None:
+            expand = parse_field_list(query_params.get('expand'))
+        fields, expand = set(fields), set(expand)
+
+        default_fields = getattr(self.Meta, 'default_fields', None)
+        if fields:
+            allowed = fields | expand
+        elif default_fields is not None:
+            allowed = set(default_fields) | expand
+        else:
+            return
+        for name in list(self.fields):
+            if name not in allowed:
+                self.fields.pop(name)
+
+class TemplateSerializer(TimedRepresentationMixin, DynamicFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    deferrable_fields = ('html_content', 'css_content', 'js_content')
+
     class Meta:
         model = Template
         fields = '__all__'
 
-class ProjectSerializer(serializers.ModelSerializer):
+class TemplateCatalogSerializer(TemplateSerializer):
+    """Template gallery representation without the HTML/CSS/JS bodies; use ?expand= for them"""
+
+    class Meta(TemplateSerializer.Meta):
+        default_fields = (
+            'id', 'name', 'description', 'template_type', 'preview_image',
+            'is_premium', 'created_at', 'updated_at',
+        )
+
+class ProjectSerializer(TimedRepresentationMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Project
-        fields = '__all__'
+        # technologies mirrors technology_stack (see technologies.py)
+        exclude = ('technologies',)
 
-class SkillSerializer(serializers.ModelSerializer):
+class SkillSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Skill
         fields = '__all__'
 
-class ExperienceSerializer(serializers.ModelSerializer):
+class ExperienceSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Experience
         fields = '__all__'
 
-class PortfolioSerializer(serializers.ModelSerializer):
+class ProjectItemSerializer(ProjectSerializer):
+    """Project within a bulk request; the portfolio comes from the URL"""
+    class Meta(ProjectSerializer.Meta):
+        read_only_fields = ('portfolio',)
+
+class SkillItemSerializer(SkillSerializer):
+    class Meta(SkillSerializer.Meta):
+        read_only_fields = ('portfolio',)
+
+class ExperienceItemSerializer(ExperienceSerializer):
+    class Meta(ExperienceSerializer.Meta):
+        read_only_fields = ('portfolio',)
+
+class ResumeImportSerializer(serializers.Serializer):
+    """Serializer for resume uploads; the format defaults to the file extension"""
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=('json', 'csv', 'jsonl'), required=False)
+
+class ReorderSerializer(serializers.Serializer):
+    """Serializer for reordering the items of a portfolio section"""
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_ids(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError('Duplicate ids')
+        return value
+
+class PortfolioSerializer(TimedRepresentationMixin, DynamicFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    select_related_fields = {'template_name': 'template'}
+    prefetch_related_fields = {
+        'projects': 'projects',
+        'skills': 'skills',
+        'experiences': 'experiences',
+    }
+    deferrable_fields = ('about_content', 'custom_html', 'custom_css')
+
     projects = ProjectSerializer(many=True, read_only=True)
     skills = SkillSerializer(many=True, read_only=True)
     experiences = ExperienceSerializer(many=True, read_only=True)
@@ -77,14 +203,68 @@ class PortfolioSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('user', 'slug', 'created_at', 'updated_at')
 
+class PortfolioSummarySerializer(PortfolioSerializer):
+    """Compact portfolio representation used by list views; use ?expand= for more"""
+
+    class Meta(PortfolioSerializer.Meta):
+        default_fields = (
+            'id', 'title', 'slug', 'template', 'template_name',
+            'is_published', 'created_at', 'updated_at',
+        )
+
 class PortfolioCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Portfolio
         fields = ('template', 'title', 'hero_title', 'hero_subtitle', 'about_content')
 
+class PortfolioPatchSerializer(serializers.ModelSerializer):
+    """Unsaved portfolio edits accepted by the live preview"""
+    class Meta:
+        model = Portfolio
+        fields = (
+            'title', 'hero_title', 'hero_subtitle', 'about_content', 'contact_email', 'contact_phone',
+            'social_linkedin', 'social_github', 'social_twitter', 'custom_html', 'custom_css',
+        )
+
+class PortfolioPreviewSerializer(serializers.Serializer):
+    """Serializer for live preview requests; validate with partial=True"""
+    patch = PortfolioPatchSerializer(required=False)
+    sections = serializers.DictField(child=serializers.CharField(), required=False)
+    document = serializers.BooleanField(required=False)
+
 class PortfolioExportSerializer(serializers.Serializer):
-    """Serializer for exporting portfolio as HTML"""
-    portfolio_id = serializers.IntegerField()
+    """Serializer for exporting one portfolio as HTML, or several as a ZIP archive"""
+    portfolio_id = serializers.IntegerField(required=False)
+    portfolio_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    all = serializers.BooleanField(default=False)
     include_css = serializers.BooleanField(default=True)
     include_js = serializers.BooleanField(default=True)
-    minify = serializers.BooleanField(default=False)
\ No newline at end of file
+    minify = serializers.BooleanField(default=False)
+    background = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        selectors = [name for name in ('portfolio_id', 'portfolio_ids') if name in attrs]
+        if attrs['all']:
+            selectors.append('all')
+        if len(selectors) != 1:
+            raise serializers.ValidationError('Provide exactly one of portfolio_id, portfolio_ids or all')
+        return attrs
+
+    @property
+    def is_bulk(self):
+        return 'portfolio_id' not in self.validated_data
+
+class RenderJobSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RenderJob
+        fields = ('id', 'kind', 'status', 'error', 'created_at', 'started_at', 'finished_at', 'download_url')
+        read_only_fields = fields
+
+    def get_download_url(self, job):
+        if job.status != RenderJob.STATUS_SUCCEEDED or not job.result_path:
+            return None
+        url = reverse('render_job_download', args=[job.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
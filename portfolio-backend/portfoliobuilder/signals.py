@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from .models import Portfolio, Project, Skill, Experience, Template, User
+from .authentication import invalidate_token, invalidate_user, revoke_signed_tokens
+from .render_cache import invalidate_portfolio
+from .catalog import refresh_catalog_version
+from .publishing import forget_pages, refresh_portfolio_page, unpublish_page
+from .jobs import enqueue_on_commit
+from .search import update_search_document
+from .technologies import sync_project_technologies
+
+
+def portfolio_content_changed(portfolio_id, touch=True):
+    """Invalidate cached renders, then refresh the public page and search index once the transaction commits.
+
+    ``touch`` bumps the portfolio's updated_at, the version other processes check
+    their cached renders against, for changes made to its child rows.
+    """
+    if touch:
+        Portfolio.objects.filter(pk=portfolio_id).update(updated_at=timezone.now())
+    invalidate_portfolio(portfolio_id)
+    transaction.on_commit(lambda: refresh_portfolio_page(portfolio_id))
+    transaction.on_commit(lambda: update_search_document(portfolio_id))
+
+
+@receiver(post_save, sender=Portfolio)
+def portfolio_saved(sender, instance, **kwargs):
+    """Drop cached renders of a portfolio and re-render its public page"""
+    portfolio_content_changed(instance.pk, touch=False)
+
+
+@receiver(post_delete, sender=Portfolio)
+def portfolio_deleted(sender, instance, **kwargs):
+    invalidate_portfolio(instance.pk)
+    unpublish_page(instance.slug)
+
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=Skill)
+@receiver([post_save, post_delete], sender=Experience)
+def portfolio_section_changed(sender, instance, **kwargs):
+    """Drop cached renders of the portfolio owning a project, skill or experience"""
+    portfolio_content_changed(instance.portfolio_id)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, update_fields=None, **kwargs):
+    """Mirror a project's technology_stack into the technology index"""
+    if update_fields is None or 'technology_stack' in update_fields:
+        sync_project_technologies([instance])
+
+
+@receiver([post_save, post_delete], sender=Template)
+def template_changed(sender, instance, **kwargs):
+    """Drop cached renders of every portfolio built on a template and bump the catalog version"""
+    refresh_catalog_version()
+    portfolios = list(
+        Portfolio.objects.filter(template_id=instance.pk).values_list('pk', 'slug', 'is_published')
+    )
+    published = [portfolio_id for portfolio_id, _, is_published in portfolios if is_published]
+    for portfolio_id, _, _ in portfolios:
+        invalidate_portfolio(portfolio_id)
+
+    if len(published) > getattr(settings, 'PORTFOLIO_SYNC_RERENDER_LIMIT', 20):
+        # The worker re-renders into its own cache; this process must not keep
+        # serving the old pages meanwhile, so they render again on next request.
+        slugs = [slug for _, slug, is_published in portfolios if is_published]
+        transaction.on_commit(lambda: forget_pages(slugs))
+        enqueue_on_commit('rerender', {'template_ids': [instance.pk], 'published_only': True})
+        return
+    for portfolio_id in published:
+        transaction.on_commit(lambda portfolio_id=portfolio_id: refresh_portfolio_page(portfolio_id))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """Logout deletes the token: forget the cached user and refuse earlier signed tokens"""
+    invalidate_token(instance.key)
+    revoke_signed_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    """Cached users must not outlive a deactivation or profile change"""
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    invalidate_user(instance.pk)
+    if not instance.is_active:
+        revoke_signed_tokens(instance.pk)
@@ -0,0 +1,241 @@
+"""
+Static site publishing.
+
+Writes every published portfolio to ``<root>/<slug>/index.html`` with the
+template CSS/JS stored once under ``<root>/assets/<content hash>.css|js``, plus a
+``manifest.json`` describing the tree. The output can be served directly, e.g.::
+
+    location / { root /srv/portfolios; try_files $uri $uri/index.html =404; }
+
+The root is the PORTFOLIO_STATIC_ROOT setting; publishing on save is enabled by
+setting it, and the publish_static command rebuilds the whole tree, skipping
+pages whose portfolio and template are unchanged since the manifest was written.
+Manifest updates from concurrent saves are serialized by a lock file in the root.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows; the manifest lock is then per process
+    fcntl = None
+
+from django.conf import settings
+from django.utils import timezone
+
+from .postprocess import minify_css, minify_html
+from .render_cache import render_sections
+from .rendering import render_portfolio
+
+ASSETS_DIR = 'assets'
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_LOCK_NAME = '.manifest.lock'
+
+# Serializes manifest updates between threads where fcntl is unavailable
+_manifest_thread_lock = threading.Lock()
+
+
+def get_static_root():
+    return getattr(settings, 'PORTFOLIO_STATIC_ROOT', None)
+
+
+def write_atomic(path, data):
+    """Write ``data`` to ``path`` through a temporary file so readers never see partial files"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def asset_name(content, extension):
+    """Content-addressed file name for a CSS/JS asset"""
+    digest = hashlib.sha256(content.encode()).hexdigest()[:20]
+    return f'{ASSETS_DIR}/{digest}.{extension}'
+
+
+class StaticSitePublisher:
+    """Writes rendered portfolios and their deduplicated assets under ``root``"""
+
+    def __init__(self, root=None):
+        self.root = os.fspath(root or get_static_root())
+        self._template_assets = {}
+
+    def _path(self, relative):
+        return os.path.join(self.root, *relative.split('/'))
+
+    def write_asset(self, content, extension):
+        """Store an asset once per content hash and return its path relative to the root"""
+        name = asset_name(content, extension)
+        path = self._path(name)
+        if not os.path.exists(path):
+            write_atomic(path, content.encode())
+        return name
+
+    def template_assets(self, template):
+        """Asset paths for a template's CSS and JS, or None where the template has none"""
+        key = (template.pk, template.updated_at)
+        if key not in self._template_assets:
+            css = self.write_asset(minify_css(template.css_content), 'css') if template.css_content.strip() else None
+            js = self.write_asset(template.js_content, 'js') if template.js_content.strip() else None
+            self._template_assets[key] = (css, js)
+        return self._template_assets[key]
+
+    def render(self, portfolio, prefix='../'):
+        """Render ``portfolio`` with links to shared assets; returns (html, asset paths)"""
+        css, js = self.template_assets(portfolio.template)
+        html = render_portfolio(
+            portfolio,
+            stylesheet_href=prefix + css if css else '',
+            script_src=prefix + js if js else '',
+            sections=render_sections(portfolio),
+        )
+        if getattr(settings, 'PORTFOLIO_MINIFY_PUBLISHED', True):
+            html = minify_html(html)
+        return html, [name for name in (css, js) if name]
+
+    def publish(self, portfolio):
+        """Write one portfolio page and return its manifest entry"""
+        html, assets = self.render(portfolio)
+        data = html.encode()
+        page = f'{portfolio.slug}/index.html'
+        write_atomic(self._path(page), data)
+        return {
+            'path': page,
+            'assets': assets,
+            'etag': hashlib.sha256(data).hexdigest()[:32],
+            'bytes': len(data),
+            'id': portfolio.pk,
+            'updated_at': portfolio.updated_at.isoformat(),
+            'template_updated_at': portfolio.template.updated_at.isoformat(),
+        }
+
+    def is_current(self, entry, portfolio):
+        """Whether manifest ``entry`` was written from this version of ``portfolio`` and its files exist"""
+        return (
+            entry is not None
+            and entry.get('id') == portfolio.pk
+            and entry.get('updated_at') == portfolio.updated_at.isoformat()
+            and entry.get('template_updated_at') == portfolio.template.updated_at.isoformat()
+            and all(os.path.exists(self._path(name)) for name in [entry['path'], *entry['assets']])
+        )
+
+    def remove(self, slug):
+        shutil.rmtree(self._path(slug), ignore_errors=True)
+
+    @contextmanager
+    def manifest_lock(self):
+        """Hold an exclusive lock for a read-modify-write of the manifest, across processes"""
+        if fcntl is None:
+            with _manifest_thread_lock:
+                yield
+            return
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._path(MANIFEST_LOCK_NAME), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read_manifest(self):
+        try:
+            with open(self._path(MANIFEST_NAME)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {'portfolios': {}}
+
+    def write_manifest(self, portfolios):
+        manifest = {
+            'generated_at': timezone.now().isoformat(),
+            'portfolios': portfolios,
+            'assets': sorted({name for entry in portfolios.values() for name in entry['assets']}),
+        }
+        write_atomic(self._path(MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode())
+        return manifest
+
+    def update(self, portfolio=None, removed_slug=None):
+        """Publish or remove a single portfolio and update the manifest in place.
+
+        A portfolio published under a new slug has its page at the old slug removed.
+        """
+        entry = self.publish(portfolio) if portfolio is not None else None
+        with self.manifest_lock():
+            portfolios = self.read_manifest().get('portfolios', {})
+            stale = {removed_slug} if removed_slug else set()
+            if portfolio is not None:
+                stale.update(
+                    slug for slug, existing in portfolios.items()
+                    if existing.get('id') == portfolio.pk and slug != portfolio.slug
+                )
+            for slug in stale:
+                self.remove(slug)
+                portfolios.pop(slug, None)
+            if entry is not None:
+                portfolios[portfolio.slug] = entry
+            return self.write_manifest(portfolios)
+
+    def merge_entries(self, entries):
+        """Add already written manifest entries (e.g. from render workers) to the manifest"""
+        ids = {entry['id'] for entry in entries.values()}
+        with self.manifest_lock():
+            portfolios = self.read_manifest().get('portfolios', {})
+            moved = [
+                slug for slug, existing in portfolios.items() if existing.get('id') in ids and slug not in entries
+            ]
+            for slug in moved:
+                self.remove(slug)
+                del portfolios[slug]
+            portfolios.update(entries)
+            return self.write_manifest(portfolios)
+
+    def unpublish(self, slug):
+        """Remove a portfolio's page if it was written; cheap when it never was"""
+        if os.path.exists(self._path(f'{slug}/index.html')):
+            self.update(removed_slug=slug)
+
+    def build(self, portfolios, prune=True, force=False):
+        """Publish ``portfolios`` and rewrite the manifest; optionally delete stale pages and assets.
+
+        Pages that are current in the manifest are kept unless ``force`` is set.
+        Returns the manifest and the number of pages written.
+        """
+        current = self.read_manifest().get('portfolios', {})
+        entries = {}
+        written = 0
+        for portfolio in portfolios:
+            entry = current.get(portfolio.slug)
+            if force or not self.is_current(entry, portfolio):
+                entry = self.publish(portfolio)
+                written += 1
+            entries[portfolio.slug] = entry
+        with self.manifest_lock():
+            previous = self.read_manifest().get('portfolios', {})
+            if prune:
+                for slug in set(previous) - set(entries):
+                    self.remove(slug)
+            manifest = self.write_manifest(entries)
+            if prune:
+                self.prune_assets(manifest['assets'])
+            return manifest, written
+
+    def prune_assets(self, keep):
+        directory = self._path(ASSETS_DIR)
+        if not os.path.isdir(directory):
+            return
+        keep = {name.split('/', 1)[1] for name in keep}
+        for name in os.listdir(directory):
+            if name not in keep:
+                os.remove(os.path.join(directory, name))
@@ -0,0 +1,96 @@
+"""
+Normalized technology index for projects.
+
+Project.technology_stack stays the editable, comma-separated source; this module
+mirrors it into Technology/ProjectTechnology rows so "portfolios using X" and
+facet counts are indexed joins instead of ``icontains`` scans. Project saves are
+synced by a signal; bulk writes (bulk endpoints, resume import) call
+sync_project_technologies() themselves.
+"""
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+
+from .models import Portfolio, ProjectTechnology, Technology
+
+MAX_TECHNOLOGY_LENGTH = 100
+
+
+def normalize_technology(name):
+    return ' '.join(name.split()).lower()
+
+
+def split_stack(technology_stack):
+    """Ordered, de-duplicated ``(normalized_name, name)`` pairs of a comma-separated stack"""
+    seen = {}
+    for part in (technology_stack or '').split(','):
+        name = ' '.join(part.split())[:MAX_TECHNOLOGY_LENGTH]
+        if name:
+            seen.setdefault(normalize_technology(name), name)
+    return list(seen.items())
+
+
+def get_or_create_technologies(names):
+    """Map normalized name -> Technology id for ``names`` ({normalized: display}), creating missing rows"""
+    if not names:
+        return {}
+    existing = dict(
+        Technology.objects.filter(normalized_name__in=names).values_list('normalized_name', 'id')
+    )
+    missing = [
+        Technology(normalized_name=normalized, name=name)
+        for normalized, name in names.items() if normalized not in existing
+    ]
+    if missing:
+        # ignore_conflicts tolerates a concurrent insert of the same technology
+        Technology.objects.bulk_create(missing, ignore_conflicts=True)
+        existing.update(
+            Technology.objects.filter(
+                normalized_name__in=[technology.normalized_name for technology in missing]
+            ).values_list('normalized_name', 'id')
+        )
+    return existing
+
+
+def sync_project_technologies(projects):
+    """Rewrite the technology links of ``projects`` from their technology_stack"""
+    projects = [project for project in projects if project.pk is not None]
+    if not projects:
+        return
+    stacks = {project.pk: split_stack(project.technology_stack) for project in projects}
+    names = {}
+    for stack in stacks.values():
+        for normalized, name in stack:
+            names.setdefault(normalized, name)
+
+    with transaction.atomic():
+        technology_ids = get_or_create_technologies(names)
+        ProjectTechnology.objects.filter(project_id__in=stacks).delete()
+        ProjectTechnology.objects.bulk_create([
+            ProjectTechnology(project_id=project_id, technology_id=technology_ids[normalized], position=position)
+            for project_id, stack in stacks.items()
+            for position, (normalized, _) in enumerate(stack)
+        ])
+
+
+def portfolios_using(name, queryset=None):
+    """Portfolios with at least one project listing technology ``name``"""
+    queryset = Portfolio.objects.all() if queryset is None else queryset
+    links = ProjectTechnology.objects.filter(
+        technology__normalized_name=normalize_technology(name),
+        project__portfolio=OuterRef('pk'),
+    )
+    return queryset.filter(Exists(links))
+
+
+def technology_facets(published_only=True, prefix=None, limit=50):
+    """Technologies with the number of (published) portfolios using each, most used first"""
+    links = ProjectTechnology.objects.all()
+    if published_only:
+        links = links.filter(project__portfolio__is_published=True)
+    if prefix:
+        links = links.filter(technology__normalized_name__startswith=normalize_technology(prefix))
+    return list(
+        links.values('technology__name', 'technology__normalized_name')
+        .annotate(portfolio_count=Count('project__portfolio', distinct=True))
+        .order_by('-portfolio_count', 'technology__normalized_name')[:limit]
+    )
@@ -1,3 +1,1461 @@
-from django.test import TestCase
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import time
+import zipfile
+from unittest import mock, skipIf, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import api_views, async_views
+from .archive import iter_portfolio_archive
+from .authentication import CachedTokenAuthentication, SignedTokenAuthentication, signed_token_max_age
+from .benchmarks import run_benchmarks, seed_benchmark_data
+from .jobs import (
+    MAX_ATTEMPTS, claim_next_job, enqueue, purge_expired_results, requeue_stale_jobs, result_file_path, run_job,
+)
+from .render_cache import _pointer_key, evict_portfolio, get_render_cache, render_portfolio_cached
+from .rendering import DEFAULT_LAYOUT, ROW_SECTIONS, get_compiled_template, render_portfolio, render_project_items
+from .search import search_portfolios
+from .technologies import portfolios_using, technology_facets
+from .serializers import UserSerializer
+from .models import (
+    User, Portfolio, Project, Skill, Experience, Template, RenderJob, SearchDocument, ProjectTechnology,
+)
+from .pagination import PORTFOLIO_ORDERING, KeysetPagination
+from .postprocess import ENCODINGS, compress
+from .profiling import reset_metrics
+from .publishing import publish_page, refresh_page_version, refresh_portfolio_page
+from .render_pool import rerender_portfolios
+
+# Queries allowed for a fully expanded portfolio list: portfolios joined with
+# their template, plus one prefetch each for projects, skills and experiences.
+PORTFOLIO_LIST_MAX_QUERIES = 4
+EXPAND_ALL = 'projects,skills,experiences'
+
+
+def create_user(username):
+    return User.objects.create_user(
+        username=username, email=f'{username}@example.com', password='password123',
+        first_name=username.title(), last_name='User',
+    )
+
+
+def create_template(name='Minimal', html_content='<h1>{{hero_title}}</h1>', css_content='body {}', **fields):
+    return Template.objects.create(
+        name=name, description=name, template_type='minimal', html_content=html_content, css_content=css_content,
+        **fields,
+    )
+
+
+def create_portfolio(user, template, index=0):
+    portfolio = Portfolio.objects.create(user=user, template=template, title=f'Portfolio {index}')
+    for order in range(3):
+        Project.objects.create(
+            portfolio=portfolio, title=f'Project {order}', description='Description',
+            technology_stack='Python, Django', order=order,
+        )
+        Skill.objects.create(portfolio=portfolio, name=f'Skill {order}', category='backend', order=order)
+        Experience.objects.create(
+            portfolio=portfolio, company='Company', position='Developer', description='Description',
+            start_date=datetime.date(2020, order + 1, 1),
+        )
+    return portfolio
+
+
+class PortfolioQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='owner', email='owner@example.com', password='password123',
+            first_name='Owner', last_name='User',
+        )
+        cls.template = Template.objects.create(
+            name='Minimal', description='Minimal', template_type='minimal',
+            html_content='<h1>{{hero_title}}</h1>', css_content='body {}',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertListQueriesCapped(self):
+        with self.assertNumQueries(PORTFOLIO_LIST_MAX_QUERIES):
+            response = self.client.get(reverse('portfolios_list'), {'expand': EXPAND_ALL})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_query_count_is_independent_of_portfolio_count(self):
+        create_portfolio(self.user, self.template)
+        self.assertListQueriesCapped()
+
+        for index in range(1, 10):
+            create_portfolio(self.user, self.template, index)
+        response = self.assertListQueriesCapped()
+        self.assertEqual(len(response.json()), 10)
+
+    def test_detail_query_count(self):
+        portfolio = create_portfolio(self.user, self.template)
+        with self.assertNumQueries(PORTFOLIO_LIST_MAX_QUERIES):
+            response = self.client.get(reverse('portfolio_detail', args=[portfolio.id]))
+        self.assertEqual(len(response.json()['projects']), 3)
+
+    def test_list_defaults_to_summary(self):
+        create_portfolio(self.user, self.template)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('portfolios_list'))
+        self.assertEqual(
+            set(response.json()[0]),
+            {'id', 'title', 'slug', 'template', 'template_name', 'is_published', 'created_at', 'updated_at'},
+        )
+
+    def test_sparse_fieldsets(self):
+        portfolio = create_portfolio(self.user, self.template)
+        response = self.client.get(reverse('portfolios_list'), {'fields': 'id,title', 'expand': 'projects'})
+        self.assertEqual(set(response.json()[0]), {'id', 'title', 'projects'})
+
+        response = self.client.get(reverse('portfolio_detail', args=[portfolio.id]), {'fields': 'id,slug'})
+        self.assertEqual(set(response.json()), {'id', 'slug'})
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN the hot queries of api_views and the admin and fail on full table scans"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='planner', email='planner@example.com', password='password123',
+            first_name='Plan', last_name='User',
+        )
+        cls.template = Template.objects.create(
+            name='Minimal', description='Minimal', template_type='minimal',
+            html_content='<h1>{{hero_title}}</h1>', css_content='body {}',
+        )
+        cls.portfolio = create_portfolio(cls.user, cls.template)
+
+    def hot_queries(self):
+        portfolio, user = self.portfolio, self.user
+        return {
+            'portfolios list': Portfolio.objects.filter(user=user).order_by('-updated_at', '-id'),
+            'portfolios list page': Portfolio.objects.filter(user=user, updated_at__lt=portfolio.updated_at)
+                .order_by('-updated_at', '-id'),
+            'published portfolios of user': Portfolio.objects.filter(user=user, is_published=True),
+            'published portfolios': Portfolio.objects.filter(is_published=True).order_by('-updated_at', '-id'),
+            'portfolio by slug': Portfolio.objects.filter(slug=portfolio.slug),
+            'portfolio projects': Project.objects.filter(portfolio=portfolio).order_by('order', '-created_at', '-id'),
+            'portfolio skills': Skill.objects.filter(portfolio=portfolio),
+            'portfolio experiences': Experience.objects.filter(portfolio=portfolio),
+            'queued render jobs': RenderJob.objects.filter(status=RenderJob.STATUS_QUEUED).order_by('created_at'),
+        }
+
+    def full_scans(self, queryset):
+        table = re.escape(queryset.model._meta.db_table)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # Tiny test tables make sequential scans cheapest; only flag those without an alternative
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+            return re.findall(rf'Seq Scan on {table}\b', plan)
+        plan = queryset.explain()
+        # SQLite reports "SCAN <table>" for full scans and "SCAN <table> USING INDEX" for index-only walks
+        return re.findall(rf'\bSCAN {table}\s*$', plan, re.MULTILINE)
+
+    def test_hot_queries_use_indexes(self):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest('Query plans are only checked on SQLite and Postgres')
+        for name, queryset in self.hot_queries().items():
+            with self.subTest(name):
+                self.assertEqual(self.full_scans(queryset), [], queryset.explain())
+
+
+class KeysetPaginationTests(TestCase):
+    """?page_size=/?cursor= walk the list once, in order, without OFFSET"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='pager', email='pager@example.com', password='password123',
+            first_name='Page', last_name='User',
+        )
+        cls.template = Template.objects.create(
+            name='Minimal', description='Minimal', template_type='minimal',
+            html_content='<h1>{{hero_title}}</h1>', css_content='body {}',
+        )
+        cls.portfolios = [
+            Portfolio.objects.create(user=cls.user, template=cls.template, title=f'Portfolio {index}')
+            for index in range(7)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, page_size):
+        ids, pages = [], 0
+        response = self.client.get(reverse('portfolios_list'), {'page_size': page_size})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            ids += [portfolio['id'] for portfolio in page['results']]
+            pages += 1
+            if page['next'] is None:
+                return ids, pages
+            response = self.client.get(page['next'])
+
+    def expected_ids(self):
+        portfolios = Portfolio.objects.filter(user=self.user).order_by(*PORTFOLIO_ORDERING)
+        return list(portfolios.values_list('id', flat=True))
+
+    def test_cursor_round_trip(self):
+        ids, pages = self.walk(page_size=3)
+        self.assertEqual(ids, self.expected_ids())
+        self.assertEqual(pages, 3)
+
+    def test_equal_timestamps_break_ties_on_id(self):
+        same_time = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        Portfolio.objects.filter(user=self.user).update(updated_at=same_time)
+        ids, _ = self.walk(page_size=2)
+        self.assertEqual(ids, sorted((portfolio.id for portfolio in self.portfolios), reverse=True))
+
+    def test_cursor_survives_encoding(self):
+        paginator = KeysetPagination(PORTFOLIO_ORDERING)
+        portfolio = self.portfolios[0]
+        cursor = paginator.encode_cursor([portfolio.updated_at, portfolio.id])
+        self.assertEqual(paginator.decode_cursor(Portfolio, cursor), [portfolio.updated_at, portfolio.id])
+
+    def test_tampered_cursor(self):
+        paginator = KeysetPagination(PORTFOLIO_ORDERING)
+        for cursor in (
+            'not a cursor',
+            paginator.encode_cursor([1]),
+            paginator.encode_cursor(['yesterday', 1]),
+            paginator.encode_cursor({'updated_at': None}),
+            paginator.encode_cursor(['2024-01-01T00:00:00Z', 1])[:-3],
+        ):
+            with self.subTest(cursor):
+                response = self.client.get(reverse('portfolios_list'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class BulkUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='bulk', email='bulk@example.com', password='password123',
+            first_name='Bulk', last_name='User',
+        )
+        cls.template = Template.objects.create(
+            name='Minimal', description='Minimal', template_type='minimal',
+            html_content='<h1>{{hero_title}}</h1>', css_content='body {}',
+        )
+        cls.portfolio = create_portfolio(cls.user, cls.template)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('projects_bulk', args=[self.portfolio.pk])
+
+    def reorder(self, section, ids):
+        url = reverse(f'{section}_reorder', args=[self.portfolio.pk])
+        response = self.client.post(url, {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['ids']
+
+    def test_reorder_projects(self):
+        ids = list(self.portfolio.projects.values_list('pk', flat=True))
+        self.assertEqual(self.reorder('projects', ids[::-1]), ids[::-1])
+        self.assertEqual(list(self.portfolio.projects.values_list('pk', flat=True)), ids[::-1])
+        # Unlisted items follow the listed ones in their previous order
+        self.assertEqual(self.reorder('projects', [ids[1]]), [ids[1], ids[2], ids[0]])
+
+    def test_skill_reorder_stays_within_category(self):
+        backend = list(self.portfolio.skills.values_list('pk', flat=True))
+        frontend = Skill.objects.create(portfolio=self.portfolio, name='CSS', category='frontend', order=9).pk
+        ids = self.reorder('skills', [frontend, *backend[::-1]])
+        self.assertEqual(ids, [*backend[::-1], frontend])
+        self.assertEqual(list(self.portfolio.skills.values_list('pk', flat=True)), ids)
+
+    def test_experience_reorder_reports_date_order(self):
+        by_date = list(self.portfolio.experiences.values_list('pk', flat=True))
+        self.assertEqual(self.reorder('experiences', by_date[::-1]), by_date)
+
+    def test_invalid_ids_are_rejected(self):
+        project_id = self.portfolio.projects.first().pk
+        for items in (
+            [{'id': [project_id]}], [{'id': {'pk': project_id}}], [{'id': 'first'}], [{'title': 'No id'}],
+            [project_id], [{'id': project_id}, {'id': project_id}],
+        ):
+            with self.subTest(items):
+                response = self.client.patch(self.url, items, format='json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_update_by_id(self):
+        project = self.portfolio.projects.first()
+        response = self.client.patch(self.url, [{'id': project.pk, 'title': 'Renamed'}], format='json')
+        self.assertEqual(response.status_code, 200)
+        project.refresh_from_db()
+        self.assertEqual(project.title, 'Renamed')
+
+
+class RenderCacheInvalidationTests(TestCase):
+    """Edits to any row feeding a render must never be served from a stale cached document"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='renderer', email='renderer@example.com', password='password123',
+            first_name='Render', last_name='User',
+        )
+        cls.template = Template.objects.create(
+            name='Sections', description='Sections', template_type='minimal',
+            html_content='<h1>{{hero_title}}</h1>{{projects}}{{skills}}{{experience}}', css_content='body {}',
+        )
+        cls.portfolio = create_portfolio(cls.user, cls.template)
+
+    def render(self):
+        portfolio = Portfolio.objects.select_related('template').get(pk=self.portfolio.pk)
+        return render_portfolio_cached(portfolio).decode()
+
+    def assertEditRendered(self, row, field, value):
+        self.assertNotIn(value, self.render())
+        setattr(row, field, value)
+        row.save()
+        self.assertIn(value, self.render())
+
+    def assertEditRenderedByOtherProcess(self, row, field, value):
+        """A process that missed the edit's signal still holds its pointer; it must not be trusted"""
+        self.render()
+        pointer_key = _pointer_key(self.portfolio.pk)
+        stale_pointer = get_render_cache().get(pointer_key)
+        setattr(row, field, value)
+        row.save()
+        get_render_cache().set(pointer_key, stale_pointer)
+        self.assertIn(value, self.render())
+
+    def test_project_edit(self):
+        project = self.portfolio.projects.first()
+        self.assertEditRendered(project, 'title', 'Renamed project')
+        self.assertEditRenderedByOtherProcess(project, 'title', 'Project from elsewhere')
+
+    def test_skill_edit(self):
+        skill = self.portfolio.skills.first()
+        self.assertEditRendered(skill, 'name', 'Renamed skill')
+        self.assertEditRenderedByOtherProcess(skill, 'name', 'Skill from elsewhere')
+
+    def test_experience_edit(self):
+        experience = self.portfolio.experiences.first()
+        self.assertEditRendered(experience, 'company', 'Renamed company')
+        self.assertEditRenderedByOtherProcess(experience, 'company', 'Company from elsewhere')
+
+    def test_deleted_row_disappears(self):
+        project = self.portfolio.projects.create(title='Short-lived project', description='Description', order=9)
+        self.assertIn('Short-lived project', self.render())
+        project.delete()
+        self.assertNotIn('Short-lived project', self.render())
+
+
+class TokenAuthenticationTests(TestCase):
+    """Cached and signed tokens stop working as soon as the user logs out or is deactivated"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='holder', email='holder@example.com', password='password123',
+            first_name='Token', last_name='Holder',
+        )
+
+    def setUp(self):
+        response = APIClient().post(
+            reverse('login'), {'email': 'holder@example.com', 'password': 'password123'}, format='json',
+        )
+        self.token = response.json()['token']
+        self.signed_token = response.json()['signed_token']
+
+    def profile(self, header):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=header)
+        return client.get(reverse('user_profile'))
+
+    def test_cache_hit_skips_the_database_and_returns_the_token(self):
+        self.assertEqual(self.profile(f'Token {self.token}').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.profile(f'Token {self.token}').status_code, 200)
+        authentication = CachedTokenAuthentication()
+        for _ in range(2):
+            user, auth = authentication.authenticate_credentials(self.token)
+            self.assertIsInstance(auth, Token)
+            self.assertEqual((user.pk, auth.key), (self.user.pk, self.token))
+
+    def test_logout_evicts_cached_token(self):
+        self.assertEqual(self.profile(f'Token {self.token}').status_code, 200)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.assertEqual(client.post(reverse('logout')).status_code, 200)
+        self.assertEqual(self.profile(f'Token {self.token}').status_code, 401)
+
+    def test_token_delete_evicts_cached_token(self):
+        self.assertEqual(self.profile(f'Token {self.token}').status_code, 200)
+        Token.objects.filter(key=self.token).delete()
+        self.assertEqual(self.profile(f'Token {self.token}').status_code, 401)
+
+    def test_deactivation_evicts_cached_token(self):
+        self.assertEqual(self.profile(f'Token {self.token}').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.profile(f'Token {self.token}').status_code, 401)
+        self.assertEqual(self.profile(f'Signed {self.signed_token}').status_code, 401)
+
+    def test_signed_token_needs_no_queries(self):
+        with self.assertNumQueries(0):
+            response = self.profile(f'Signed {self.signed_token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), UserSerializer(self.user).data)
+
+    def test_signed_token_expires(self):
+        expired = time.time() + signed_token_max_age() + 1
+        with mock.patch('django.core.signing.time.time', return_value=expired):
+            self.assertEqual(self.profile(f'Signed {self.signed_token}').status_code, 401)
+
+    def test_signed_token_revoked_by_logout(self):
+        self.assertEqual(self.profile(f'Signed {self.signed_token}').status_code, 200)
+        Token.objects.filter(key=self.token).delete()
+        self.assertEqual(self.profile(f'Signed {self.signed_token}').status_code, 401)
+
+    def test_tampered_signed_token(self):
+        self.assertEqual(self.profile(f'Signed {self.signed_token[:-1]}x').status_code, 401)
+
+    def test_signed_token_user_is_read_only(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Signed {self.signed_token}')
+        user, _ = SignedTokenAuthentication().authenticate(request)
+        self.assertEqual(user.created_at, self.user.created_at)
+        with self.assertRaises(TypeError):
+            user.save()
+        with self.assertRaises(TypeError):
+            user.delete()
+
+    def test_token_cache_settings_are_read_when_changed(self):
+        self.assertEqual(self.profile(f'Token {self.token}').status_code, 200)
+        with override_settings(PORTFOLIO_TOKEN_CACHE_TTL=0):
+            self.assertEqual(self.profile(f'Token {self.token}').status_code, 200)
+            with self.assertNumQueries(1):
+                self.assertEqual(self.profile(f'Token {self.token}').status_code, 200)
+        with override_settings(PORTFOLIO_TOKEN_CACHE_SIZE=0):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.profile(f'Token {self.token}').status_code, 200)
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tokens-default'},
+            'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tokens-shared'},
+        },
+        PORTFOLIO_TOKEN_REVOCATION_CACHE_ALIAS='shared',
+    )
+    def test_signed_token_revocation_uses_configured_cache(self):
+        Token.objects.filter(key=self.token).delete()
+        self.assertEqual(self.profile(f'Signed {self.signed_token}').status_code, 401)
+        caches['shared'].clear()
+        self.assertEqual(self.profile(f'Signed {self.signed_token}').status_code, 200)
+
+
+class ResumeImportTests(TestCase):
+    """The import endpoint and command read every format and report bad records instead of failing"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('importer')
+        cls.portfolio = Portfolio.objects.create(user=cls.user, template=create_template(), title='Imported')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, name, content, **data):
+        return self.client.post(
+            reverse('portfolio_import', args=[self.portfolio.pk]),
+            {'file': SimpleUploadedFile(name, content), **data}, format='multipart',
+        )
+
+    def test_json_resume(self):
+        resume = {
+            'work': [{'name': 'Acme', 'position': 'Engineer', 'startDate': '2020-03', 'highlights': ['Shipped']}],
+            'skills': [{'name': 'Python', 'level': 'Expert'}],
+            'projects': [
+                {'name': 'Listed keywords', 'description': 'A site', 'keywords': ['Python', 'Django']},
+                {'name': 'String keywords', 'description': 'A script', 'keywords': 'py'},
+            ],
+        }
+        response = self.upload('resume.json', json.dumps(resume).encode())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], {'projects': 2, 'skills': 1, 'experiences': 1})
+        experience = self.portfolio.experiences.get()
+        self.assertEqual((experience.company, experience.start_date), ('Acme', datetime.date(2020, 3, 1)))
+        self.assertTrue(experience.is_current)
+        self.assertEqual(self.portfolio.skills.get().proficiency, 90)
+        self.assertEqual(
+            dict(self.portfolio.projects.values_list('title', 'technology_stack')),
+            {'Listed keywords': 'Python, Django', 'String keywords': 'py'},
+        )
+
+    def test_json_resume_with_wrong_types(self):
+        resume = {'work': 'abc', 'skills': ['Python', {'name': 'Go', 'level': ['high']}], 'projects': None}
+        response = self.upload('resume.json', json.dumps(resume).encode())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], {'projects': 0, 'skills': 1, 'experiences': 0})
+        self.assertEqual([error['record'] for error in response.json()['errors']], ['work', 'skills[0]'])
+
+    def test_linkedin_csv(self):
+        content = (
+            'Company Name,Title,Description,Location,Started On,Finished On\n'
+            'Acme,Engineer,Built things,Berlin,Mar 2019,Jan 2021\n'
+            'Initech,Lead,Led things,Remote,Feb 2021,\n'
+        ).encode()
+        response = self.upload('Positions.csv', content)
+        self.assertEqual(response.json()['created']['experiences'], 2)
+        self.assertEqual(
+            list(self.portfolio.experiences.order_by('order').values_list('company', 'end_date', 'is_current')),
+            [('Acme', datetime.date(2021, 1, 1), False), ('Initech', None, True)],
+        )
+
+    def test_jsonl(self):
+        lines = [
+            '{"type": "project", "title": "CLI", "description": "A tool", "technology_stack": "Go"}',
+            '{"type": "skill", "name": "Go", "category": "backend"}',
+            'not json',
+            '{"type": "award", "title": "Prize"}',
+            '{"type": "skill", "category": "backend"}',
+        ]
+        response = self.upload('items.jsonl', '\n'.join(lines).encode())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], {'projects': 1, 'skills': 1, 'experiences': 0})
+        self.assertEqual([error['record'] for error in response.json()['errors']], ['line 3', 'line 4', 'line 5'])
+
+    def test_unreadable_files_import_nothing(self):
+        for name, content in (
+            ('resume.json', b'{"skills": ['),
+            ('resume.json', b'["not", "an", "object"]'),
+            ('Unknown.csv', b'Foo,Bar\n1,2\n'),
+            ('Skills.csv', b'Name\nPython\n' + b'\xff\xfe\n'),
+            ('items.jsonl', b'{"type": "skill", "name": "Go", "category": "backend"}\n\xff\n'),
+            ('resume.txt', b'Python'),
+        ):
+            with self.subTest(name=name, content=content):
+                self.assertEqual(self.upload(name, content).status_code, 400)
+        self.assertFalse(self.portfolio.skills.exists())
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            f.write('{"type": "skill", "name": "Rust", "category": "backend"}\n{"type": "skill"}\n')
+        self.addCleanup(os.remove, f.name)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_resume', self.portfolio.pk, f.name, '--batch-size', '1', stdout=stdout, stderr=stderr)
+        self.assertIn('1 records skipped', stdout.getvalue())
+        self.assertIn('line 2', stderr.getvalue())
+        self.assertEqual(list(self.portfolio.skills.values_list('name', flat=True)), ['Rust'])
+
+        with self.assertRaises(CommandError):
+            call_command('import_resume', self.portfolio.pk, f.name, '--format', 'json', stdout=stdout)
+        with self.assertRaises(CommandError):
+            call_command('import_resume', self.portfolio.pk, f'{f.name}.missing', stdout=stdout)
+
+
+class BenchmarkHarnessTests(TestCase):
+    """The seeded data set is reproducible and every benchmark runs against it"""
+
+    def seeded_data(self):
+        portfolios = Portfolio.objects.filter(user__email__endswith='@benchmark.invalid').select_related(
+            'user', 'template'
+        ).prefetch_related('projects', 'skills', 'experiences').order_by('slug')
+        return [
+            (
+                portfolio.user.email, portfolio.slug, portfolio.template.name, portfolio.is_published,
+                portfolio.about_content,
+                [(project.title, project.technology_stack, project.order) for project in portfolio.projects.all()],
+                [(skill.name, skill.category, skill.proficiency) for skill in portfolio.skills.all()],
+                [(experience.company, experience.start_date) for experience in portfolio.experiences.all()],
+            )
+            for portfolio in portfolios
+        ]
+
+    def test_seed_and_run(self):
+        counts = seed_benchmark_data(users=5, seed=1)
+        first = self.seeded_data()
+        self.assertEqual(counts, seed_benchmark_data(users=5, seed=1))
+        self.assertEqual(self.seeded_data(), first)
+        self.assertEqual(len(first), counts['portfolios'])
+        self.assertEqual(
+            {email for email, *_ in first}, {f'bench{index}@benchmark.invalid' for index in range(5)},
+        )
+        self.assertTrue(any(is_published for _, _, _, is_published, *_ in first))
+
+        results = run_benchmarks(iterations=2, warmup=1)['results']
+        self.assertIn('endpoint.portfolio_detail', results)
+        self.assertIn('render.generate_portfolio_html.large', results)
+        for result in results.values():
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+    def test_cold_render_setup_empties_render_cache(self):
+        user = User.objects.create_user(username='cold', email='cold@example.com', password='password123')
+        template = Template.objects.create(
+            name='Cold', description='Cold', template_type='minimal',
+            html_content='<h1>{{hero_title}}</h1>{{projects}}', css_content='body {}',
+        )
+        portfolio = Portfolio.objects.select_related('template').get(pk=create_portfolio(user, template).pk)
+        render_portfolio_cached(portfolio)
+        render_portfolio_cached(portfolio, encoding='gzip')
+        evict_portfolio(portfolio)
+        projects = mock.Mock(wraps=render_project_items)
+        with mock.patch('portfoliobuilder.render_cache.render_portfolio', wraps=render_portfolio) as render, \
+                mock.patch.dict(ROW_SECTIONS, {'projects': ('projects', projects)}):
+            render_portfolio_cached(portfolio, encoding='gzip')
+        render.assert_called_once()
+        projects.assert_called_once()
+
+    def test_other_seed_changes_data(self):
+        seed_benchmark_data(users=3, seed=1)
+        first = self.seeded_data()
+        seed_benchmark_data(users=3, seed=2)
+        self.assertNotEqual(self.seeded_data(), first)
+
+
+class JobLifecycleTests(TestCase):
+    """Export jobs are queued, claimed once, run by a worker and downloadable until their result expires"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('queuer')
+        cls.portfolio = create_portfolio(cls.user, create_template())
+
+    def setUp(self):
+        result_root = tempfile.TemporaryDirectory()
+        self.addCleanup(result_root.cleanup)
+        settings_override = override_settings(PORTFOLIO_JOB_RESULT_ROOT=result_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def queue_export(self):
+        response = self.client.post(reverse('render_jobs'), {'portfolio_id': self.portfolio.pk}, format='json')
+        self.assertEqual(response.status_code, 202)
+        return RenderJob.objects.get(pk=response.json()['id'])
+
+    def test_export_job_runs_and_downloads(self):
+        job = self.queue_export()
+        self.assertEqual(job.status, RenderJob.STATUS_QUEUED)
+        response = self.client.get(reverse('render_job_detail', args=[job.pk]))
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response['Location'].endswith(reverse('render_job_detail', args=[job.pk])))
+        self.assertEqual(response['Retry-After'], '1')
+
+        claimed = claim_next_job('worker-1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.worker, claimed.attempts),
+                         (job.pk, RenderJob.STATUS_RUNNING, 'worker-1', 1))
+        self.assertIsNone(claim_next_job('worker-2'))
+
+        run_job(claimed)
+        response = self.client.get(reverse('render_job_detail', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], RenderJob.STATUS_SUCCEEDED)
+        self.assertIsNotNone(response.json()['download_url'])
+
+        response = self.client.get(reverse('render_job_download', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+        self.assertIn(f'{self.portfolio.slug}.html', response['Content-Disposition'])
+        self.assertIn(self.portfolio.hero_title, b''.join(response.streaming_content).decode())
+
+    def test_worker_command_processes_queue(self):
+        job = self.queue_export()
+        call_command('run_render_worker', once=True, name='cli', stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), (RenderJob.STATUS_SUCCEEDED, 'cli'))
+        self.assertTrue(os.path.exists(result_file_path(job)))
+
+    def test_failed_job_records_error(self):
+        job = enqueue('export', {'portfolio_id': 0}, user=self.user)
+        run_job(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, RenderJob.STATUS_FAILED)
+        self.assertTrue(job.error)
+        response = self.client.get(reverse('render_job_detail', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['download_url'])
+        self.assertEqual(self.client.get(reverse('render_job_download', args=[job.pk])).status_code, 404)
+
+    def test_other_users_cannot_see_job(self):
+        job = self.queue_export()
+        self.client.force_authenticate(create_user('stranger'))
+        self.assertEqual(self.client.get(reverse('render_job_detail', args=[job.pk])).status_code, 404)
+
+    def test_wait_long_polls_until_timeout_or_finish(self):
+        job = self.queue_export()
+        started = time.monotonic()
+        response = self.client.get(reverse('render_job_detail', args=[job.pk]), {'wait': '0.2'})
+        self.assertEqual(response.status_code, 202)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+        run_job(claim_next_job())
+        with mock.patch('portfoliobuilder.jobs.time.sleep') as sleep:
+            response = self.client.get(reverse('render_job_detail', args=[job.pk]), {'wait': '1000'})
+        self.assertEqual(response.status_code, 200)
+        sleep.assert_not_called()
+
+    def test_stale_jobs_are_requeued_then_failed(self):
+        job = self.queue_export()
+        claim_next_job()
+        self.assertEqual(requeue_stale_jobs(), 0)
+        long_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1)
+        RenderJob.objects.filter(pk=job.pk).update(started_at=long_ago)
+        self.assertEqual(requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, RenderJob.STATUS_QUEUED)
+
+        RenderJob.objects.filter(pk=job.pk).update(
+            status=RenderJob.STATUS_RUNNING, started_at=long_ago, attempts=MAX_ATTEMPTS,
+        )
+        requeue_stale_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, RenderJob.STATUS_FAILED)
+
+    def test_expired_results_are_deleted(self):
+        job = self.queue_export()
+        run_job(claim_next_job())
+        job.refresh_from_db()
+        path = result_file_path(job)
+        self.assertEqual(purge_expired_results(), 0)
+        self.assertTrue(os.path.exists(path))
+
+        RenderJob.objects.filter(pk=job.pk).update(
+            finished_at=datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=2),
+        )
+        self.assertEqual(purge_expired_results(), 1)
+        self.assertFalse(os.path.exists(path))
+        response = self.client.get(reverse('render_job_detail', args=[job.pk]))
+        self.assertIsNone(response.json()['download_url'])
+        self.assertEqual(self.client.get(reverse('render_job_download', args=[job.pk])).status_code, 404)
+
+
+class PublicPortfolioTests(TestCase):
+    """Public pages are served from the stored render, revalidated by ETag and dropped on unpublish"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('publisher')
+        cls.template = create_template(html_content='<h1>{{hero_title}}</h1>')
+
+    def setUp(self):
+        self.portfolio = create_portfolio(self.user, self.template)
+        self.portfolio.hero_title = 'Published hero'
+        self.portfolio.is_published = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.portfolio.save()
+        self.url = reverse('public_portfolio', args=[self.portfolio.slug])
+
+    def test_matching_etag_answers_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Published hero', response.content)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_encodings_have_their_own_etag(self):
+        identity = self.client.get(self.url)
+        gzipped = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(gzipped.content), identity.content)
+        self.assertNotEqual(gzipped['ETag'], identity['ETag'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=identity['ETag'],
+                                         HTTP_ACCEPT_ENCODING='gzip').status_code, 200)
+
+    def test_unpublish_answers_404(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.portfolio.is_published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.portfolio.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_stale_version_is_rerendered(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        # An edit made by another process: no signal reaches this one's stored page
+        Portfolio.objects.filter(pk=self.portfolio.pk).update(
+            hero_title='Edited elsewhere', updated_at=datetime.datetime.now(datetime.timezone.utc),
+        )
+        self.assertIn(b'Published hero', self.client.get(self.url).content)
+        refresh_page_version(self.portfolio.slug)
+        self.assertIn(b'Edited elsewhere', self.client.get(self.url).content)
+
+    def test_save_compresses_cheaply(self):
+        with mock.patch('portfoliobuilder.publishing.compress', wraps=compress) as compressor:
+            refresh_portfolio_page(self.portfolio.pk)
+        self.assertTrue(compressor.call_args_list)
+        for call in compressor.call_args_list:
+            self.assertIs(call.kwargs['fast'], True)
+
+
+class LivePreviewTests(TestCase):
+    """The preview returns only the sections whose hash the editor does not already have"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('previewer')
+        cls.template = create_template(html_content='<h1>{{hero_title}}</h1><p>{{about_content}}</p>{{projects}}')
+        cls.portfolio = create_portfolio(cls.user, cls.template)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def preview(self, **data):
+        response = self.client.post(reverse('portfolio_preview', args=[self.portfolio.pk]), data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def hashes(self, sections):
+        return {name: section['hash'] for name, section in sections.items()}
+
+    def test_first_preview_returns_every_section_and_document(self):
+        data = self.preview(document=True)
+        self.assertEqual(
+            set(data['sections']), {'hero_title', 'about_content', 'projects', 'title', 'custom_html', 'custom_css'},
+        )
+        self.assertIn('Project 0', data['sections']['projects']['html'])
+        self.assertIn('<title>Portfolio 0</title>', data['document'])
+
+    def test_known_hashes_are_skipped(self):
+        known = self.hashes(self.preview()['sections'])
+        data = self.preview(sections=known, document=True)
+        self.assertEqual(data, {'sections': {}})
+
+    def test_patch_returns_only_changed_sections(self):
+        known = self.hashes(self.preview()['sections'])
+        data = self.preview(patch={'hero_title': 'Unsaved <hero>'}, sections=known)
+        self.assertEqual(set(data['sections']), {'hero_title'})
+        self.assertEqual(data['sections']['hero_title']['html'], 'Unsaved &lt;hero&gt;')
+        self.assertNotEqual(data['sections']['hero_title']['hash'], known['hero_title'])
+        self.portfolio.refresh_from_db()
+        self.assertNotEqual(self.portfolio.hero_title, 'Unsaved <hero>')
+
+    def test_title_patch_is_previewed(self):
+        known = self.hashes(self.preview()['sections'])
+        data = self.preview(patch={'title': 'Renamed'}, sections=known, document=True)
+        self.assertEqual(set(data['sections']), {'title'})
+        self.assertIn('<title>Renamed</title>', data['document'])
+
+    def test_row_change_updates_row_section(self):
+        known = self.hashes(self.preview()['sections'])
+        Project.objects.create(portfolio=self.portfolio, title='Project 3', description='Description', order=3)
+        data = self.preview(sections=known)
+        self.assertEqual(set(data['sections']), {'projects'})
+        self.assertIn('Project 3', data['sections']['projects']['html'])
+
+
+class RenderingTests(TestCase):
+    """Layouts are compiled once per template version and every placeholder value is escaped"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('renderer')
+
+    def test_compiled_layout_is_reused_until_template_changes(self):
+        template = create_template(html_content='<h1>{{hero_title}}</h1>')
+        compiled = get_compiled_template(template)
+        self.assertIs(get_compiled_template(Template.objects.get(pk=template.pk)), compiled)
+        template.html_content = '<h2>{{hero_title}}</h2>'
+        template.save()
+        recompiled = get_compiled_template(template)
+        self.assertIsNot(recompiled, compiled)
+        self.assertEqual(recompiled.render({'hero_title': 'Hi'}), '<h2>Hi</h2>')
+
+    def test_blank_layout_uses_default(self):
+        self.assertIs(get_compiled_template(create_template(html_content='  ')), DEFAULT_LAYOUT)
+
+    def test_unknown_placeholders_render_empty(self):
+        portfolio = create_portfolio(self.user, create_template(html_content='<p>{{unknown}}|{{ hero_title }}</p>'))
+        portfolio.hero_title = 'Hero'
+        self.assertIn('<p>|Hero</p>', render_portfolio(portfolio))
+
+    def test_values_are_escaped(self):
+        template = create_template(html_content='<h1>{{hero_title}}</h1>{{projects}}{{skills}}')
+        portfolio = create_portfolio(self.user, template)
+        portfolio.title = 'Tom & Jerry'
+        portfolio.hero_title = '<script>alert(1)</script>'
+        Project.objects.filter(portfolio=portfolio).update(title='<b>Bold</b>')
+        Skill.objects.filter(portfolio=portfolio).update(name='"quoted"')
+        html = render_portfolio(portfolio)
+        self.assertIn('<title>Tom &amp; Jerry</title>', html)
+        self.assertIn('&lt;script&gt;alert(1)&lt;/script&gt;', html)
+        self.assertIn('&lt;b&gt;Bold&lt;/b&gt;', html)
+        self.assertIn('&quot;quoted&quot;', html)
+        self.assertNotIn('<script>alert', html)
+
+    def test_seeded_templates_render_every_section(self):
+        call_command('create_templates', stdout=io.StringIO())
+        for template in Template.objects.all():
+            with self.subTest(template=template.name):
+                html = render_portfolio(create_portfolio(self.user, template))
+                for text in ('Project 0', 'Skill 0', 'Developer at Company'):
+                    self.assertIn(text, html)
+
+
+class StaticSiteTests(TestCase):
+    """publish_static writes pages, shared assets and a manifest, and skips pages that did not change"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('static')
+        cls.template = create_template(css_content='body { color: red; }', js_content='console.log(1);')
+        cls.portfolios = [create_portfolio(cls.user, cls.template, index) for index in range(2)]
+        Portfolio.objects.update(is_published=True)
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = root.name
+
+    def publish(self, *args):
+        out = io.StringIO()
+        call_command('publish_static', '--root', self.root, *args, stdout=out)
+        with open(os.path.join(self.root, 'manifest.json')) as f:
+            return json.load(f), out.getvalue()
+
+    @override_settings(PORTFOLIO_STATIC_ROOT=None)
+    def test_missing_root_is_an_error(self):
+        with self.assertRaises(CommandError):
+            call_command('publish_static', stdout=io.StringIO())
+
+    def test_manifest_lists_pages_and_shared_assets(self):
+        manifest, out = self.publish()
+        self.assertIn('(2 written, 0 unchanged)', out)
+        self.assertEqual(set(manifest['portfolios']), {portfolio.slug for portfolio in self.portfolios})
+        self.assertEqual(len(manifest['assets']), 2)
+        for portfolio in self.portfolios:
+            entry = manifest['portfolios'][portfolio.slug]
+            self.assertEqual((entry['id'], entry['path']), (portfolio.pk, f'{portfolio.slug}/index.html'))
+            self.assertEqual(sorted(entry['assets']), manifest['assets'])
+            with open(os.path.join(self.root, entry['path']), 'rb') as f:
+                html = f.read()
+            self.assertEqual(entry['etag'], hashlib.sha256(html).hexdigest()[:32])
+            for asset in entry['assets']:
+                self.assertIn(f'../{asset}'.encode(), html)
+                self.assertTrue(os.path.exists(os.path.join(self.root, asset)))
+
+    def test_unchanged_pages_are_skipped(self):
+        first, _ = self.publish()
+        second, out = self.publish()
+        self.assertIn('(0 written, 2 unchanged)', out)
+        self.assertEqual(second['portfolios'], first['portfolios'])
+
+        edited = self.portfolios[0]
+        Portfolio.objects.filter(pk=edited.pk).update(
+            hero_title='Edited', updated_at=datetime.datetime.now(datetime.timezone.utc),
+        )
+        manifest, out = self.publish()
+        self.assertIn('(1 written, 1 unchanged)', out)
+        self.assertNotEqual(manifest['portfolios'][edited.slug]['etag'], first['portfolios'][edited.slug]['etag'])
+
+        os.remove(os.path.join(self.root, manifest['portfolios'][edited.slug]['path']))
+        self.assertIn('(1 written, 1 unchanged)', self.publish()[1])
+        self.assertIn('(2 written, 0 unchanged)', self.publish('--force')[1])
+
+    def test_template_change_rewrites_pages_and_prunes_assets(self):
+        first, _ = self.publish()
+        self.template.css_content = 'body { color: blue; }'
+        self.template.save()
+        manifest, out = self.publish()
+        self.assertIn('(2 written, 0 unchanged)', out)
+        self.assertNotEqual(manifest['assets'], first['assets'])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.root, 'assets'))),
+                         sorted(name.split('/', 1)[1] for name in manifest['assets']))
+
+    def test_unpublished_pages_are_pruned(self):
+        self.publish()
+        removed = self.portfolios[1]
+        Portfolio.objects.filter(pk=removed.pk).update(is_published=False)
+        manifest, _ = self.publish()
+        self.assertNotIn(removed.slug, manifest['portfolios'])
+        self.assertFalse(os.path.exists(os.path.join(self.root, removed.slug)))
+
+
+class ArchiveExportTests(TestCase):
+    """Bulk exports stream one page per portfolio with shared assets stored once"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('agency')
+        layout = '<h1>{{hero_title}}</h1>{{projects}}'
+        shared = create_template(html_content=layout, css_content='.shared {}')
+        cls.portfolios = [create_portfolio(cls.user, shared, index) for index in range(2)]
+        other = create_template('Other', html_content=layout, css_content='.other {}')
+        cls.portfolios.append(create_portfolio(cls.user, other, 2))
+        cls.other = create_portfolio(create_user('rival'), shared)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, **data):
+        return self.client.post(reverse('export_portfolio'), data, format='json')
+
+    def archive(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_one_page_per_portfolio_with_shared_assets(self):
+        archive = self.archive(self.export(portfolio_ids=[portfolio.pk for portfolio in self.portfolios]))
+        manifest = json.loads(archive.read('manifest.json'))['portfolios']
+        self.assertEqual(set(manifest), {portfolio.slug for portfolio in self.portfolios})
+        pages = [name for name in archive.namelist() if name.endswith('/index.html')]
+        self.assertEqual(sorted(pages), sorted(f'{portfolio.slug}/index.html' for portfolio in self.portfolios))
+        css = sorted(name for name in archive.namelist() if name.endswith('.css'))
+        self.assertEqual([archive.read(name) for name in css], sorted([b'.shared {}', b'.other {}']))
+        for portfolio in self.portfolios:
+            html = archive.read(f'{portfolio.slug}/index.html').decode()
+            self.assertIn(f'<title>{portfolio.title}</title>', html)
+            self.assertIn('Project 0', html)
+            for asset in manifest[portfolio.slug]['assets']:
+                self.assertIn(f'../{asset}', html)
+
+    def test_all_exports_only_own_portfolios(self):
+        names = self.archive(self.export(all=True)).namelist()
+        self.assertEqual(len([name for name in names if name.endswith('/index.html')]), 3)
+        self.assertNotIn(f'{self.other.slug}/index.html', names)
+
+    def test_foreign_ids_are_rejected(self):
+        response = self.export(portfolio_ids=[self.portfolios[0].pk, self.other.pk])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['portfolio_ids'], [self.other.pk])
+
+    def test_archive_is_streamed_per_portfolio(self):
+        chunks = list(iter_portfolio_archive(Portfolio.objects.filter(user=self.user).order_by('id')))
+        self.assertEqual(len(chunks), len(self.portfolios) + 1)
+        self.assertTrue(all(chunks))
+
+    @override_settings(PORTFOLIO_SYNC_ARCHIVE_LIMIT=2)
+    def test_large_archives_are_queued(self):
+        response = self.export(all=True)
+        self.assertEqual(response.status_code, 202)
+        job = RenderJob.objects.get(pk=response.json()['id'])
+        self.assertEqual((job.kind, job.payload['all']), ('archive', True))
+        self.assertEqual(self.export(portfolio_ids=[p.pk for p in self.portfolios[:2]]).status_code, 200)
+
+
+class ExportOptionsTests(TestCase):
+    """Each export option changes the downloaded page, and each combination is cached on its own"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('exporter')
+        template = create_template(
+            html_content='<!-- layout -->\n<h1>{{hero_title}}</h1>\n\n    {{projects}}',
+            css_content='.hero {\n    color: red;\n}', js_content='console.log("ready");',
+        )
+        cls.portfolio = create_portfolio(cls.user, template)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, headers=None, **options):
+        response = self.client.post(
+            reverse('export_portfolio'), {'portfolio_id': self.portfolio.pk, **options}, format='json',
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{self.portfolio.slug}.html"')
+        return response
+
+    def page(self, **options):
+        return self.export(**options).content.decode()
+
+    def test_defaults_include_assets_unminified(self):
+        html = self.page()
+        self.assertIn('<!-- layout -->', html)
+        self.assertIn('.hero {\n    color: red;\n}', html)
+        self.assertIn('<script>\nconsole.log("ready");\n</script>', html)
+        self.assertIn('Project 0', html)
+
+    def test_include_sections(self):
+        for include_css, include_js in ((False, True), (True, False), (False, False)):
+            with self.subTest(include_css=include_css, include_js=include_js):
+                html = self.page(include_css=include_css, include_js=include_js)
+                self.assertEqual('<style>' in html, include_css)
+                self.assertEqual('<script>' in html, include_js)
+                self.assertIn('Project 0', html)
+
+    def test_minify(self):
+        html = self.page(minify=True)
+        self.assertNotIn('<!-- layout -->', html)
+        self.assertNotIn('\n', html)
+        self.assertIn('<style>.hero{color:red}</style>', html)
+        self.assertIn('<script>console.log("ready");</script>', html)
+        # The unminified variant is still served from its own cache entry
+        self.assertIn('<!-- layout -->', self.page())
+
+    def test_encoding_negotiation(self):
+        plain = self.export().content
+        for accept_encoding, encoding in (
+            ('gzip', 'gzip'), ('deflate, gzip;q=0.5', 'gzip'), ('gzip;q=0', None), ('identity', None),
+        ):
+            with self.subTest(accept_encoding):
+                response = self.export(headers={'Accept-Encoding': accept_encoding})
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+                self.assertIn('Accept-Encoding', response['Vary'])
+                content = gzip.decompress(response.content) if encoding else response.content
+                self.assertEqual(content, plain)
+
+    @skipIf('br' in ENCODINGS, 'brotli is installed and preferred')
+    def test_wildcard_falls_back_to_gzip(self):
+        self.assertEqual(self.export(headers={'Accept-Encoding': 'br, *'})['Content-Encoding'], 'gzip')
+
+    @skipUnless('br' in ENCODINGS, 'brotli is not installed')
+    def test_brotli_is_preferred(self):
+        self.assertEqual(self.export(headers={'Accept-Encoding': 'gzip, br'})['Content-Encoding'], 'br')
+
+    def test_options_combine_with_encoding(self):
+        response = self.export(headers={'Accept-Encoding': 'gzip'}, minify=True, include_js=False)
+        self.assertEqual(gzip.decompress(response.content), self.export(minify=True, include_js=False).content)
+        self.assertNotIn(b'<script>', gzip.decompress(response.content))
+
+
+class SearchIndexTests(TestCase):
+    """Published portfolios are indexed on commit and ranked by where the query matches"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('searcher')
+        cls.template = create_template()
+
+    def publish(self, title, about='', **fields):
+        portfolio = Portfolio.objects.create(
+            user=self.user, template=self.template, title=title, about_content=about, **fields,
+        )
+        portfolio.is_published = True
+        with self.captureOnCommitCallbacks(execute=True):
+            portfolio.save()
+        return portfolio
+
+    def found(self, query):
+        return [portfolio_id for portfolio_id, _ in search_portfolios(query)]
+
+    def test_indexed_on_publish_only(self):
+        draft = Portfolio.objects.create(user=self.user, template=self.template, title='Kubernetes draft')
+        published = self.publish('Kubernetes operator')
+        self.assertFalse(SearchDocument.objects.filter(portfolio=draft).exists())
+        self.assertEqual(self.found('kubernetes'), [published.pk])
+
+    def test_updated_on_edit(self):
+        portfolio = self.publish('Haskell wizard')
+        portfolio.title = 'Elixir wizard'
+        with self.captureOnCommitCallbacks(execute=True):
+            portfolio.save()
+        self.assertEqual(self.found('haskell'), [])
+        self.assertEqual(self.found('elixir'), [portfolio.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(portfolio=portfolio, name='Terraform', category='devops')
+        self.assertEqual(self.found('terraform'), [portfolio.pk])
+
+    def test_removed_on_unpublish(self):
+        portfolio = self.publish('Fortran veteran')
+        portfolio.is_published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            portfolio.save()
+        self.assertFalse(SearchDocument.objects.filter(portfolio=portfolio).exists())
+        self.assertEqual(self.found('fortran'), [])
+
+    def test_every_token_must_match_as_prefix(self):
+        portfolio = self.publish('Python developer', about='Distributed systems')
+        self.publish('Python designer')
+        self.assertEqual(self.found('pyth distrib'), [portfolio.pk])
+        self.assertEqual(self.found('"OR* NEAR('), [])
+        self.assertEqual(self.found('   '), [])
+
+    @skipIf(connection.vendor not in ('sqlite', 'postgresql'), 'LIKE fallback does not rank')
+    def test_title_matches_outrank_about_matches(self):
+        about = self.publish('Generalist', about='I sometimes write Rust')
+        title = self.publish('Rust engineer')
+        results = search_portfolios('rust')
+        self.assertEqual([portfolio_id for portfolio_id, _ in results], [title.pk, about.pk])
+        self.assertGreater(results[0][1], results[1][1])
+
+    def test_like_fallback(self):
+        portfolio = self.publish('Cobol maintainer')
+        with mock.patch('portfoliobuilder.search._has_fts_table', return_value=False):
+            self.assertEqual(self.found('cobol'), [portfolio.pk])
+
+    @skipUnless(connection.vendor == 'postgresql', 'tsvector search needs Postgres')
+    def test_postgres_search_vector(self):
+        portfolio = self.publish('Rust engineer', about='Compilers')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT search_vector::text FROM portfoliobuilder_searchdocument WHERE portfolio_id = %s',
+                [portfolio.pk],
+            )
+            vector = cursor.fetchone()[0]
+        self.assertIn("'rust':1A", vector)
+        self.assertEqual(self.found('compilers'), [portfolio.pk])
+
+    def test_search_endpoint(self):
+        first, second = self.publish('Scala one'), self.publish('Scala two')
+        response = APIClient().get(reverse('search'), {'q': 'scala', 'page_size': 1})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['results']), 1)
+        self.assertIn(data['results'][0]['id'], {first.pk, second.pk})
+        self.assertIn('rank', data['results'][0])
+        self.assertIn('page=2', data['next'])
+
+
+class ProfilingTests(TestCase):
+    """Profiling is opt-in; when on, responses carry Server-Timing and /metrics exposes histograms"""
+
+    METRIC_LINE_RE = re.compile(r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? [0-9.e+-]+$')
+
+    @classmethod
+    def setUpTestData(cls):
+        create_template()
+        cls.user = create_user('viewer')
+        cls.staff = create_user('operator')
+        cls.staff.is_staff = True
+        cls.staff.save()
+
+    def setUp(self):
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+
+    @override_settings(PORTFOLIO_PROFILING=False)
+    def test_off_by_default(self):
+        response = self.client.get(reverse('templates_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    @override_settings(PORTFOLIO_PROFILING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('templates_list'))
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[0-9.]+;desc="[1-9][0-9]* queries", '
+            r'serializer;dur=[0-9.]+, render;dur=[0-9.]+, total;dur=[0-9.]+$',
+        )
+
+    @override_settings(PORTFOLIO_PROFILING=True)
+    def test_metrics_are_valid_prometheus_text(self):
+        self.client.get(reverse('templates_list'))
+        self.client.get(reverse('templates_list'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        text = response.content.decode()
+        self.assertTrue(text.endswith('\n'))
+
+        buckets = {}
+        for line in text.splitlines():
+            if line.startswith('#'):
+                self.assertRegex(line, r'^# (HELP [a-z_]+ .+|TYPE [a-z_]+ histogram)$')
+                continue
+            self.assertRegex(line, self.METRIC_LINE_RE)
+            if line.startswith('portfolio_request_duration_seconds_bucket{view="templates_list"'):
+                buckets[line.split('le="')[1].split('"')[0]] = int(line.rsplit(' ', 1)[1])
+        counts = list(buckets.values())
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(buckets['+Inf'], 2)
+        self.assertIn('portfolio_request_duration_seconds_count{view="templates_list",method="GET",status="200"} 2',
+                      text)
+
+    @override_settings(PORTFOLIO_PROFILING=True, INTERNAL_IPS=[])
+    def test_metrics_need_staff_or_internal_ip(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+        self.client.logout()
+        with override_settings(INTERNAL_IPS=['127.0.0.1']):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+
+class RerenderResumeTests(TestCase):
+    """An interrupted or partly failed rerender resumes with just the portfolios it has not rendered"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = create_user('rerenderer')
+        template = create_template()
+        cls.portfolios = [create_portfolio(user, template, index) for index in range(5)]
+        Portfolio.objects.update(is_published=True)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.state_path = os.path.join(directory.name, 'state.json')
+
+    def rerender(self, **options):
+        return rerender_portfolios(workers=0, chunk_size=2, state_path=self.state_path, **options)
+
+    def test_resume_after_stop(self):
+        def stop_after_first_chunk(report):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.rerender(progress=stop_after_first_chunk)
+        self.assertTrue(os.path.exists(self.state_path))
+
+        with mock.patch('portfoliobuilder.render_pool.publish_page', wraps=publish_page) as publish:
+            report = self.rerender(resume=True)
+        self.assertEqual((report.total, report.skipped, report.rendered), (5, 2, 3))
+        self.assertEqual(
+            sorted(call.args[0].pk for call in publish.call_args_list),
+            [portfolio.pk for portfolio in self.portfolios[2:]],
+        )
+        self.assertFalse(os.path.exists(self.state_path))
+
+    def test_resume_retries_only_failed_portfolios(self):
+        broken = self.portfolios[1]
+
+        def fail_broken(portfolio):
+            if portfolio.pk == broken.pk:
+                raise ValueError('broken layout')
+            return publish_page(portfolio)
+
+        with mock.patch('portfoliobuilder.render_pool.publish_page', side_effect=fail_broken):
+            report = self.rerender()
+        self.assertEqual(report.failed, {broken.pk: 'broken layout'})
+        self.assertEqual(report.rendered, 4)
+        with open(self.state_path) as f:
+            self.assertEqual(json.load(f)['failed'], [broken.pk])
+
+        with mock.patch('portfoliobuilder.render_pool.publish_page', wraps=publish_page) as publish:
+            report = self.rerender(resume=True)
+        self.assertEqual((report.skipped, report.rendered, report.failed), (4, 1, {}))
+        self.assertEqual([call.args[0].pk for call in publish.call_args_list], [broken.pk])
+        self.assertFalse(os.path.exists(self.state_path))
+
+    def test_without_resume_everything_renders(self):
+        with mock.patch('portfoliobuilder.render_pool.publish_page', side_effect=ValueError('down')):
+            self.rerender()
+        self.assertEqual(self.rerender().rendered, 5)
+
+
+class AsyncAuthenticationTests(TestCase):
+    """The async views answer bad credentials exactly like DRF answers the sync views"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('async')
+        cls.portfolio = create_portfolio(cls.user, create_template())
+        cls.token = Token.objects.create(user=cls.user)
+
+    def sync_response(self, headers):
+        request = RequestFactory().get('/', headers=headers)
+        response = api_views.portfolio_detail(request, self.portfolio.pk)
+        response.render()
+        return response.status_code, json.loads(response.content), response.get('WWW-Authenticate')
+
+    async def async_response(self, headers):
+        request = AsyncRequestFactory().get('/', headers=headers)
+        request.auser = mock.AsyncMock(return_value=mock.Mock(is_authenticated=False))
+        response = await async_views.portfolio_detail(request, self.portfolio.pk)
+        return response.status_code, json.loads(response.content), response.get('WWW-Authenticate')
+
+    async def test_invalid_credentials_match_sync_views(self):
+        inactive = await User.objects.acreate(
+            username='gone', email='gone@example.com', first_name='Gone', last_name='User', is_active=False,
+        )
+        inactive_token = await Token.objects.acreate(user=inactive)
+        for authorization in (
+            None, 'Token', 'Token not-a-token', 'Token two parts', f'Token {inactive_token.key}',
+            'Signed', 'Signed tampered', 'Basic abc',
+        ):
+            headers = {'Authorization': authorization} if authorization else {}
+            with self.subTest(authorization):
+                expected = await sync_to_async(self.sync_response)(headers)
+                self.assertEqual(expected[0], 401)
+                self.assertEqual(await self.async_response(headers), expected)
+
+    async def test_valid_token(self):
+        status_code, data, _ = await self.async_response({'Authorization': f'Token {self.token.key}'})
+        self.assertEqual((status_code, data['id']), (200, self.portfolio.pk))
+
+
+class TechnologyIndexTests(TestCase):
+    """The technology links follow each project's technology_stack"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('stack')
+        cls.portfolio = create_portfolio(cls.user, create_template())
+        Portfolio.objects.filter(pk=cls.portfolio.pk).update(is_published=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.project = self.portfolio.projects.first()
+
+    def stack(self, project):
+        return list(
+            ProjectTechnology.objects.filter(project=project).values_list('technology__normalized_name', 'position')
+        )
+
+    def assertUses(self, name, expected):
+        self.assertEqual(portfolios_using(name).filter(pk=self.portfolio.pk).exists(), expected)
+
+    def test_save_rewrites_links(self):
+        self.assertEqual(self.stack(self.project), [('python', 0), ('django', 1)])
+        self.project.technology_stack = 'Go,  python , GO'
+        self.project.save()
+        self.assertEqual(self.stack(self.project), [('go', 0), ('python', 1)])
+        # The other projects still list Django
+        self.assertUses('Django', True)
+        self.portfolio.projects.exclude(pk=self.project.pk).update(technology_stack='Go')
+        for project in self.portfolio.projects.all():
+            project.save(update_fields=['technology_stack'])
+        self.assertUses('Django', False)
+        self.assertUses('go', True)
+
+    def test_saving_other_fields_keeps_links(self):
+        Project.objects.filter(pk=self.project.pk).update(technology_stack='Rust')
+        self.project.refresh_from_db()
+        self.project.title = 'Renamed'
+        self.project.save(update_fields=['title'])
+        self.assertEqual(self.stack(self.project), [('python', 0), ('django', 1)])
+
+    def test_bulk_update_rewrites_links(self):
+        self.client.force_authenticate(self.user)
+        url = reverse('projects_bulk', args=[self.portfolio.pk])
+        items = [{'id': pk, 'technology_stack': 'Rust'} for pk in self.portfolio.projects.values_list('pk', flat=True)]
+        response = self.client.patch(url, items, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stack(self.project), [('rust', 0)])
+        self.assertUses('python', False)
+        self.assertEqual(
+            [(facet['technology__name'], facet['portfolio_count']) for facet in technology_facets()],
+            [('Rust', 1)],
+        )
+
+    def test_endpoints_follow_stack_changes(self):
+        self.project.technology_stack = 'Elixir'
+        self.project.save()
+        response = self.client.get(reverse('technologies_list'), {'q': 'e'})
+        self.assertEqual(response.json(), [{'name': 'Elixir', 'portfolio_count': 1}])
+        response = self.client.get(reverse('technology_portfolios', args=['elixir']))
+        self.assertEqual([portfolio['id'] for portfolio in response.json()], [self.portfolio.pk])
+
+        self.project.technology_stack = 'Python'
+        self.project.save()
+        self.assertEqual(self.client.get(reverse('technologies_list'), {'q': 'e'}).json(), [])
+        self.assertEqual(self.client.get(reverse('technology_portfolios', args=['elixir'])).json(), [])
@@ -1,28 +1,55 @@
+from django.conf import settings
 from django.urls import path
-from . import api_views
+from . import api_views, async_views
+
+# Read-heavy endpoints have ASGI-native versions (see async_views)
+read_views = async_views if getattr(settings, 'PORTFOLIO_ASYNC_VIEWS', False) else api_views
 
 urlpatterns = [
     # Health check
-    path('health/', api_views.api_health_check, name='api_health_check'),
+    path('health/', read_views.api_health_check, name='api_health_check'),
     
     # Authentication
     path('auth/register/', api_views.register, name='register'),
     path('auth/login/', api_views.login_view, name='login'),
     path('auth/logout/', api_views.logout_view, name='logout'),
+    path('auth/signed-token/', api_views.signed_token, name='signed_token'),
     path('auth/profile/', api_views.user_profile, name='user_profile'),
     
     # Templates
-    path('templates/', api_views.templates_list, name='templates_list'),
-    path('templates/<int:template_id>/', api_views.template_detail, name='template_detail'),
+    path('templates/', read_views.templates_list, name='templates_list'),
+    path('templates/<int:template_id>/', read_views.template_detail, name='template_detail'),
     
     # Portfolios
     path('portfolios/', api_views.portfolios_list, name='portfolios_list'),
-    path('portfolios/<int:portfolio_id>/', api_views.portfolio_detail, name='portfolio_detail'),
+    path('portfolios/<int:portfolio_id>/', read_views.portfolio_detail, name='portfolio_detail'),
     path('portfolios/<int:portfolio_id>/projects/', api_views.portfolio_projects, name='portfolio_projects'),
+    path('portfolios/<int:portfolio_id>/preview/', api_views.portfolio_preview, name='portfolio_preview'),
+    path('portfolios/<int:portfolio_id>/import/', api_views.portfolio_import, name='portfolio_import'),
+    
+    # Batch writes for projects, skills and experiences
+    path('portfolios/<int:portfolio_id>/projects/bulk/', api_views.section_items_bulk, {'section': 'projects'}, name='projects_bulk'),
+    path('portfolios/<int:portfolio_id>/projects/reorder/', api_views.section_items_reorder, {'section': 'projects'}, name='projects_reorder'),
+    path('portfolios/<int:portfolio_id>/skills/bulk/', api_views.section_items_bulk, {'section': 'skills'}, name='skills_bulk'),
+    path('portfolios/<int:portfolio_id>/skills/reorder/', api_views.section_items_reorder, {'section': 'skills'}, name='skills_reorder'),
+    path('portfolios/<int:portfolio_id>/experiences/bulk/', api_views.section_items_bulk, {'section': 'experiences'}, name='experiences_bulk'),
+    path('portfolios/<int:portfolio_id>/experiences/reorder/', api_views.section_items_reorder, {'section': 'experiences'}, name='experiences_reorder'),
+    
+    # Search
+    path('search/', api_views.search, name='search'),
+    
+    # Technology index
+    path('technologies/', api_views.technologies_list, name='technologies_list'),
+    path('technologies/<str:name>/portfolios/', api_views.technology_portfolios, name='technology_portfolios'),
     
     # Export
     path('export/', api_views.export_portfolio, name='export_portfolio'),
     
+    # Background jobs
+    path('jobs/', api_views.render_jobs, name='render_jobs'),
+    path('jobs/<uuid:job_id>/', api_views.render_job_detail, name='render_job_detail'),
+    path('jobs/<uuid:job_id>/download/', api_views.render_job_download, name='render_job_download'),
+    
     # Legacy endpoints (for backward compatibility)
     path('portfolio/', api_views.portfolio_items, name='portfolio_items'),
 ]
\ No newline at end of file
@@ -1,3 +1,52 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
 
-# Create your views here.
+from .postprocess import choose_encoding
+from .profiling import render_metrics
+from .publishing import get_published_page
+
+# Seconds shared caches and browsers may reuse a public page before revalidating
+PUBLIC_PAGE_MAX_AGE = 300
+
+
+@require_safe
+def public_portfolio(request, slug):
+    """Serve the pre-rendered page of a published portfolio"""
+    return published_page_response(request, get_published_page(slug))
+
+
+def published_page_response(request, page):
+    """Build the (possibly 304) response for a stored page, negotiating its encoding"""
+    if page is None:
+        raise Http404('Portfolio not found')
+
+    encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+    if encoding not in page['content']:
+        encoding = None
+    # Each encoding is a different representation and needs its own strong ETag
+    etag = quote_etag(f"{page['etag']}-{encoding}" if encoding else page['etag'])
+    last_modified = int(page['last_modified'].timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(page['content'][encoding or 'identity'], content_type='text/html; charset=utf-8')
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=PUBLIC_PAGE_MAX_AGE)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+@require_safe
+def metrics(request):
+    """Request histograms in the Prometheus text format (needs PORTFOLIO_PROFILING)"""
+    if not getattr(settings, 'PORTFOLIO_PROFILING', False):
+        raise Http404('Profiling is disabled')
+    if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS and not request.user.is_staff:
+        raise PermissionDenied
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { apiService } from '../services/api';
@@ -17,6 +17,14 @@ interface Portfolio {
   template_name: string;
 }
 
+// Fields sent to the live preview as unsaved edits
+const PREVIEW_FIELDS = [
+  'title', 'hero_title', 'hero_subtitle', 'about_content', 'contact_email', 'contact_phone',
+  'social_linkedin', 'social_github', 'social_twitter',
+] as const;
+// Milliseconds of quiet typing before the preview is refreshed
+const PREVIEW_DEBOUNCE_MS = 400;
+
 const PortfolioEditor: React.FC = () => {
   const { portfolioId } = useParams<{ portfolioId: string }>();
   const [portfolio, setPortfolio] = useState<Portfolio | null>(null);
@@ -25,6 +33,9 @@ const PortfolioEditor: React.FC = () => {
   const [error, setError] = useState('');
   const [activeTab, setActiveTab] = useState('content');
   const [previewMode, setPreviewMode] = useState(false);
+  const [previewHtml, setPreviewHtml] = useState('');
+  // Hashes of the sections the current preview was rendered from; unchanged ones are not re-sent
+  const sectionHashes = useRef<Record<string, string>>({});
   
   const { isAuthenticated } = useAuth();
   const navigate = useNavigate();
@@ -39,6 +50,31 @@ const PortfolioEditor: React.FC = () => {
     }
   }, [isAuthenticated, portfolioId, navigate]);
 
+  useEffect(() => {
+    if (!portfolio || !previewMode) return;
+    const patch = Object.fromEntries(PREVIEW_FIELDS.map((field) => [field, portfolio[field] ?? '']));
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const preview = await apiService.previewPortfolio(portfolio.id, patch, sectionHashes.current, true);
+        if (cancelled) return;
+        Object.entries(preview.sections).forEach(([name, section]) => {
+          sectionHashes.current[name] = section.hash;
+        });
+        // The document only comes back when a section changed
+        if (preview.document !== undefined) {
+          setPreviewHtml(preview.document);
+        }
+      } catch (err) {
+        console.error('Error previewing portfolio:', err);
+      }
+    }, PREVIEW_DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [portfolio, previewMode]);
+
   const fetchPortfolio = async () => {
     try {
       setLoading(true);
@@ -274,29 +310,16 @@ const PortfolioEditor: React.FC = () => {
           <div className="preview-container">
             <div className="preview-frame">
               <h2>Portfolio Preview</h2>
-              <div className="preview-content">
-                <header className="preview-hero">
-                  <h1>{portfolio.hero_title}</h1>
-                  <h2>{portfolio.hero_subtitle}</h2>
-                </header>
-                
-                <section className="preview-about">
-                  <h3>About</h3>
-                  <p>{portfolio.about_content}</p>
-                </section>
-                
-                <section className="preview-contact">
-                  <h3>Contact</h3>
-                  {portfolio.contact_email && <p>📧 {portfolio.contact_email}</p>}
-                  {portfolio.contact_phone && <p>📞 {portfolio.contact_phone}</p>}
-                  
-                  <div className="preview-social">
-                    {portfolio.social_linkedin && <a href={portfolio.social_linkedin} target="_blank" rel="noopener noreferrer">LinkedIn</a>}
-                    {portfolio.social_github && <a href={portfolio.social_github} target="_blank" rel="noopener noreferrer">GitHub</a>}
-                    {portfolio.social_twitter && <a href={portfolio.social_twitter} target="_blank" rel="noopener noreferrer">Twitter</a>}
-                  </div>
-                </section>
-              </div>
+              {previewHtml ? (
+                <iframe
+                  className="preview-content"
+                  title="Portfolio preview"
+                  srcDoc={previewHtml}
+                  sandbox="allow-scripts"
+                />
+              ) : (
+                <p className="preview-content">Rendering preview...</p>
+              )}
             </div>
           </div>
         )}
@@ -63,9 +63,10 @@ interface Template {
   name: string;
   description: string;
   template_type: string;
-  html_content: string;
-  css_content: string;
-  js_content: string;
+  // Only returned by /templates/ when requested with ?expand=
+  html_content?: string;
+  css_content?: string;
+  js_content?: string;
   preview_image: string;
   is_premium: boolean;
 }
@@ -83,6 +84,42 @@ interface Portfolio {
   updated_at: string;
 }
 
+interface ExportOptions {
+  include_css?: boolean;
+  include_js?: boolean;
+  minify?: boolean;
+}
+
+interface RenderJob {
+  id: string;
+  kind: 'export' | 'archive' | 'rerender';
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  error: string;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+  download_url: string | null;
+}
+
+// Seconds between job status polls when the server sends no Retry-After
+const JOB_POLL_INTERVAL = 1;
+// Seconds each status request asks the server to hold it open (capped server-side)
+const JOB_LONG_POLL_WAIT = 5;
+
+const sleep = (seconds: number) => new Promise((resolve) => setTimeout(resolve, seconds * 1000));
+
+interface PreviewSection {
+  hash: string;
+  html: string;
+}
+
+interface PreviewResponse {
+  // Only the sections whose hash differs from the ones sent in `knownSections`
+  sections: Record<string, PreviewSection>;
+  // Sent when requested and at least one section changed
+  document?: string;
+}
+
 // API service functions
 export const apiService = {
   // Health check endpoint
@@ -222,10 +259,10 @@ export const apiService = {
   },
 
   // Export
-  exportPortfolio: async (portfolioId: number) => {
+  exportPortfolio: async (portfolioId: number, options: ExportOptions = {}) => {
     try {
       const response = await apiClient.post('/export/', 
-        { portfolio_id: portfolioId },
+        { portfolio_id: portfolioId, ...options },
         { responseType: 'blob' }
       );
       
@@ -246,6 +283,53 @@ export const apiService = {
     }
   },
 
+  // Render unsaved edits; send the hashes of sections already shown to receive only changed ones
+  previewPortfolio: async (
+    portfolioId: number,
+    patch: Record<string, string>,
+    knownSections: Record<string, string> = {},
+    includeDocument = false
+  ): Promise<PreviewResponse> => {
+    try {
+      const response = await apiClient.post(`/portfolios/${portfolioId}/preview/`, {
+        patch,
+        sections: knownSections,
+        document: includeDocument,
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Failed to preview portfolio:', error);
+      throw error;
+    }
+  },
+
+  // Background jobs: the server answers 202 (with Retry-After) until the job finished
+  // `wait` long-polls: the server answers as soon as the job finishes, or after `wait` seconds
+  getRenderJob: async (jobId: string, wait = 0) => {
+    try {
+      const response = await apiClient.get(`/jobs/${jobId}/`, wait ? { params: { wait } } : undefined);
+      return { job: response.data as RenderJob, retryAfter: Number(response.headers['retry-after']) || 0 };
+    } catch (error) {
+      console.error('Failed to get render job:', error);
+      throw error;
+    }
+  },
+
+  // Poll a job until it succeeds or fails; resolves with the finished job
+  waitForRenderJob: async (jobId: string, timeoutSeconds = 300): Promise<RenderJob> => {
+    const deadline = Date.now() + timeoutSeconds * 1000;
+    for (;;) {
+      const { job, retryAfter } = await apiService.getRenderJob(jobId, JOB_LONG_POLL_WAIT);
+      if (job.status === 'succeeded' || job.status === 'failed') {
+        return job;
+      }
+      if (Date.now() >= deadline) {
+        throw new Error(`Render job ${jobId} did not finish in ${timeoutSeconds}s`);
+      }
+      await sleep(retryAfter || JOB_POLL_INTERVAL);
+    }
+  },
+
   // Get server-rendered HTML (same as export) as a string for preview embedding
   exportPortfolioHtml: async (portfolioId: number) => {
     try {